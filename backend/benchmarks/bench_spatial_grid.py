@@ -0,0 +1,80 @@
+"""
+SpatialGrid query benchmark.
+
+Measures the mean cost of `SpatialGrid.get_nearby` + exact distance filtering
+versus population and query radius, for the fixed default cell size and for
+the auto-tuned one (see `suggest_cell_size`).
+
+    python -m benchmarks.bench_spatial_grid [--json]
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from typing import List, Dict, Any, Optional
+
+from simulation.agents import Agent
+from simulation.spatial_grid import SpatialGrid, suggest_cell_size
+import config
+
+POPULATIONS = (1000, 10000, 50000)
+RADII = (config.NEIGHBOR_RADIUS, 60.0, 100.0)
+QUERIES = 2000
+
+
+def _query_cost(grid: SpatialGrid, points: List[tuple], radius: float) -> Dict[str, float]:
+    start = time.perf_counter()
+    found = 0
+    for x, y in points:
+        r2 = radius * radius
+        for other in grid.get_nearby(x, y, radius):
+            if (other.x - x) ** 2 + (other.y - y) ** 2 <= r2:
+                found += 1
+    elapsed = time.perf_counter() - start
+    return {"us_per_query": elapsed / len(points) * 1e6, "mean_hits": found / len(points)}
+
+
+def run(populations=POPULATIONS, radii=RADII, queries: int = QUERIES, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Run the benchmark grid.
+
+    Returns:
+        List[Dict[str, Any]]: One record per (population, radius, cell size).
+    """
+    rng = random.Random(seed)
+    width, height = config.SIMULATION_WIDTH, config.SIMULATION_HEIGHT
+    results = []
+    for population in populations:
+        agents = [Agent(rng.uniform(0, width), rng.uniform(0, height), "Fern") for _ in range(population)]
+        points = [(rng.uniform(0, width), rng.uniform(0, height)) for _ in range(queries)]
+        for radius in radii:
+            tuned = suggest_cell_size({radius: 1.0}, population, width, height)
+            for label, cell_size in (("default", config.SPATIAL_GRID_CELL_SIZE), ("tuned", tuned)):
+                grid = SpatialGrid(width, height, cell_size)
+                grid.rebuild(agents)
+                record = {"population": population, "radius": radius, "cell": label, "cell_size": cell_size}
+                record.update(_query_cost(grid, points, radius))
+                results.append(record)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark SpatialGrid radius queries.")
+    parser.add_argument("--queries", type=int, default=QUERIES)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run(queries=args.queries)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'population':>10} {'radius':>7} {'cell':>8} {'size':>5} {'us/query':>9} {'hits':>8}")
+        for r in results:
+            print(f"{r['population']:>10} {r['radius']:>7.0f} {r['cell']:>8} {r['cell_size']:>5} "
+                  f"{r['us_per_query']:>9.1f} {r['mean_hits']:>8.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,400 @@
+"""
+Simulation benchmark suite.
+
+Measures, from a fixed seed:
+
+- tick:      `Environment.update()` ticks/sec per population size, species mix
+             and backend (object / vectorized / parallel)
+- spatial:   `SpatialGrid.get_nearby` query cost (see bench_spatial_grid)
+- serialize: `get_state()` and `json.dumps` of the snapshot
+- save_load: `save_to_file` / `load_from_file` round trip, JSON and binary snapshot
+- memory:    bytes per live agent, per species and backend (traced allocations
+             of the agents and their registry, grid and store entries)
+
+Results are written as JSON ({"meta": ..., "results": [...]}) so runs of two
+versions can be compared; `--compare` exits non-zero when a metric got worse
+by more than `--threshold`.
+
+    python -m benchmarks.bench_suite --output results.json
+    python -m benchmarks.bench_suite --sizes 1000 --compare results.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Dict, Any, List, Optional, Sequence
+
+import numpy as np
+
+from simulation.environment import Environment
+from simulation import snapshot
+from simulation.headless import populate
+from simulation.species_config import SPECIES_DB
+from benchmarks import bench_spatial_grid
+
+SIZES = (1000, 10000, 50000)
+
+# Species ratios of the benchmarked populations
+MIXES = {
+    "plants": {"Fern": 1.0},
+    "balanced": {"Fern": 0.6, "Frog": 0.15, "Fish": 0.15, "Lizard": 0.1},
+    "animals": {"Fern": 0.2, "Frog": 0.3, "Fish": 0.3, "Lizard": 0.2},
+}
+
+# Backend name -> Environment keyword arguments
+MODES = {
+    "object": {},
+    "vectorized": {"vectorized": True},
+    "parallel": {"parallel": True},
+}
+
+BENCHMARKS = ("tick", "spatial", "serialize", "save_load", "memory")
+
+SAVE_FORMATS = ("json", "snapshot")
+
+TICKS = 10
+WARMUP_TICKS = 2
+REPEATS = 3
+SEED = 0
+THRESHOLD = 0.15
+
+# Metrics where a larger value is better; every other metric is a cost
+HIGHER_IS_BETTER = {"ticks_per_second"}
+
+# Non-timing metrics that are still compared between runs (lower is better)
+COMPARED_SIZES = {"bytes_per_agent"}
+
+
+def population_for(size: int, mix: Dict[str, float]) -> Dict[str, int]:
+    """
+    Split `size` agents between species according to `mix`.
+
+    Args:
+        size (int): Total number of agents.
+        mix (Dict[str, float]): Species name to ratio (ratios sum to 1).
+
+    Returns:
+        Dict[str, int]: Species name to count, summing to `size`.
+    """
+    counts = {species: int(size * ratio) for species, ratio in mix.items()}
+    first = next(iter(counts))
+    counts[first] += size - sum(counts.values())
+    return counts
+
+
+def _environment(size: int, mix: str, mode: str, seed: int) -> Environment:
+    env = Environment(seed=seed, **MODES[mode])
+    populate(env, population_for(size, MIXES[mix]))
+    # First tick flushes the spawn buffer
+    env.update()
+    return env
+
+
+def _close(env: Environment):
+    if env.parallel_system is not None:
+        env.parallel_system.close()
+
+
+def _best_ms(func, repeats: int) -> float:
+    """Fastest of `repeats` calls, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000.0
+
+
+def bench_tick(size: int, mix: str, mode: str, ticks: int = TICKS, seed: int = SEED) -> Dict[str, Any]:
+    """Ticks/sec of `Environment.update()` for one population."""
+    env = _environment(size, mix, mode, seed)
+    try:
+        for _ in range(WARMUP_TICKS):
+            env.update()
+        durations = []
+        for _ in range(ticks):
+            start = time.perf_counter()
+            env.update()
+            durations.append(time.perf_counter() - start)
+        durations = np.array(durations) * 1000.0
+        return {
+            "ticks_per_second": float(1000.0 / durations.mean()),
+            "tick_p50_ms": float(np.percentile(durations, 50)),
+            "tick_p95_ms": float(np.percentile(durations, 95)),
+            "final_agents": len(env.agents),
+        }
+    finally:
+        _close(env)
+
+
+def bench_serialize(size: int, mix: str, repeats: int = REPEATS, seed: int = SEED) -> Dict[str, Any]:
+    """Cost of building a broadcast snapshot and encoding it as JSON."""
+    env = _environment(size, mix, "object", seed)
+    state = env.get_state()
+    payload = json.dumps(state)
+    return {
+        "get_state_ms": _best_ms(env.get_state, repeats),
+        "json_dumps_ms": _best_ms(lambda: json.dumps(state), repeats),
+        "payload_bytes": len(payload),
+    }
+
+
+def bench_save_load(size: int, mix: str, save_format: str, repeats: int = REPEATS,
+                    seed: int = SEED) -> Dict[str, Any]:
+    """
+    Save/load round trip through the environment's save files.
+
+    `save_ms` is the time the caller is blocked; `written_ms` also waits
+    for background snapshot writes to finish.
+    """
+    env = _environment(size, mix, "object", seed)
+    loaded = Environment(seed=seed)
+    extension = snapshot.EXTENSION if save_format == "snapshot" else ".json"
+
+    def save_and_wait():
+        pending = env.save_to_file("bench", save_format)
+        if pending is not None:
+            pending.result()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        # Save files are written relative to the working directory
+        os.chdir(workdir)
+        try:
+            written_ms = _best_ms(save_and_wait, repeats)
+            save_ms = _best_ms(lambda: env.save_to_file("bench", save_format), repeats)
+            snapshot.wait_for_writes()
+            load_ms = _best_ms(lambda: loaded.load_from_file("bench"), repeats)
+            file_bytes = os.path.getsize(os.path.join("saves", "bench" + extension))
+        finally:
+            os.chdir(cwd)
+    return {"save_ms": save_ms, "written_ms": written_ms, "load_ms": load_ms, "file_bytes": file_bytes}
+
+
+def bench_memory(size: int, species: str, mode: str, seed: int = SEED) -> Dict[str, Any]:
+    """
+    Memory held per agent of one species, measured with tracemalloc.
+
+    Counts everything allocated while spawning `size` agents into an empty
+    environment and still alive afterwards: the agents, their components
+    and state, and their entries in the registry, spatial grid, population
+    counters and (columnar backends) store columns.
+    """
+    env = Environment(seed=seed, **MODES[mode])
+    env.spawn_batch(species, 1)  # Warm per-species caches outside the measurement
+    try:
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        env.spawn_batch(species, size)
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+        _close(env)
+    return {"bytes_per_agent": (after - before) / size}
+
+
+def bench_spatial(sizes: Sequence[int], seed: int = SEED) -> List[Dict[str, Any]]:
+    """SpatialGrid query cost, as records of this suite."""
+    results = []
+    for record in bench_spatial_grid.run(populations=sizes, queries=500, seed=seed):
+        results.append(_record(
+            "spatial",
+            {"population": record["population"], "radius": record["radius"], "cell": record["cell"]},
+            {"us_per_query": record["us_per_query"], "mean_hits": record["mean_hits"]},
+        ))
+    return results
+
+
+def _record(benchmark: str, params: Dict[str, Any], metrics: Dict[str, Any]) -> Dict[str, Any]:
+    return {"benchmark": benchmark, "params": params, "metrics": metrics}
+
+
+def record_key(record: Dict[str, Any]) -> str:
+    """Stable identity of a record across runs, e.g. "tick/mix=balanced,mode=object,population=1000"."""
+    params = ",".join(f"{k}={v}" for k, v in sorted(record["params"].items()))
+    return f"{record['benchmark']}/{params}"
+
+
+def run(
+    benchmarks: Sequence[str] = BENCHMARKS,
+    sizes: Sequence[int] = SIZES,
+    mixes: Sequence[str] = tuple(MIXES),
+    modes: Sequence[str] = ("object", "vectorized"),
+    ticks: int = TICKS,
+    seed: int = SEED,
+) -> List[Dict[str, Any]]:
+    """
+    Run the selected benchmarks.
+
+    Args:
+        benchmarks (Sequence[str]): Subset of BENCHMARKS.
+        sizes (Sequence[int]): Population sizes.
+        mixes (Sequence[str]): Species mixes (keys of MIXES).
+        modes (Sequence[str]): Tick backends (keys of MODES).
+        ticks (int): Timed ticks per tick benchmark.
+        seed (int): Environment seed.
+
+    Returns:
+        List[Dict[str, Any]]: Records {"benchmark", "params", "metrics"}.
+    """
+    results = []
+    if "tick" in benchmarks:
+        for size in sizes:
+            for mix in mixes:
+                for mode in modes:
+                    params = {"population": size, "mix": mix, "mode": mode}
+                    results.append(_record("tick", params, bench_tick(size, mix, mode, ticks, seed)))
+    if "spatial" in benchmarks:
+        results.extend(bench_spatial(sizes, seed))
+    if "serialize" in benchmarks:
+        for size in sizes:
+            params = {"population": size, "mix": "balanced"}
+            results.append(_record("serialize", params, bench_serialize(size, "balanced", seed=seed)))
+    if "save_load" in benchmarks:
+        for size in sizes:
+            for save_format in SAVE_FORMATS:
+                params = {"population": size, "mix": "balanced", "format": save_format}
+                results.append(_record("save_load", params, bench_save_load(size, "balanced", save_format, seed=seed)))
+    if "memory" in benchmarks:
+        for size in sizes:
+            for species in SPECIES_DB:
+                for mode in modes:
+                    params = {"population": size, "species": species, "mode": mode}
+                    results.append(_record("memory", params, bench_memory(size, species, mode, seed)))
+    return results
+
+
+def metadata() -> Dict[str, Any]:
+    """Machine and version information stored alongside the results."""
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        revision = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "revision": revision,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(baseline: List[Dict[str, Any]], current: List[Dict[str, Any]],
+            threshold: float = THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    Compare timing and memory metrics of two runs.
+
+    Only records and metrics present in both runs are compared. Sizes
+    (`*_bytes`), agent counts and hit counts are informational and skipped;
+    memory per agent (COMPARED_SIZES) is compared like a timing.
+
+    Args:
+        baseline (List[Dict[str, Any]]): Results of the reference run.
+        current (List[Dict[str, Any]]): Results of the new run.
+        threshold (float): Relative change counted as a regression (0.15 = 15%).
+
+    Returns:
+        List[Dict[str, Any]]: One entry per compared metric with "key",
+        "metric", "baseline", "current", "change" (positive = worse) and
+        "regression".
+    """
+    reference = {record_key(r): r["metrics"] for r in baseline}
+    rows = []
+    for record in current:
+        old_metrics = reference.get(record_key(record))
+        if old_metrics is None:
+            continue
+        for metric, value in record["metrics"].items():
+            old = old_metrics.get(metric)
+            if old is None or not (_is_timing(metric) or metric in COMPARED_SIZES) or old <= 0:
+                continue
+            if metric in HIGHER_IS_BETTER:
+                change = (old - value) / old
+            else:
+                change = (value - old) / old
+            rows.append({
+                "key": record_key(record),
+                "metric": metric,
+                "baseline": old,
+                "current": value,
+                "change": change,
+                "regression": change > threshold,
+            })
+    return rows
+
+
+def _is_timing(metric: str) -> bool:
+    return metric in HIGHER_IS_BETTER or metric.endswith("_ms") or metric.endswith("_per_query")
+
+
+def _print_results(results: List[Dict[str, Any]]):
+    for record in results:
+        metrics = " ".join(
+            f"{k}={v:.2f}" if isinstance(v, float) else f"{k}={v}" for k, v in record["metrics"].items()
+        )
+        print(f"{record_key(record):<60} {metrics}")
+
+
+def _csv(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the simulation benchmark suite.")
+    parser.add_argument("--benchmarks", type=_csv, default=list(BENCHMARKS),
+                        help="Comma separated subset of: " + ",".join(BENCHMARKS))
+    parser.add_argument("--sizes", type=lambda v: [int(s) for s in _csv(v)], default=list(SIZES))
+    parser.add_argument("--mixes", type=_csv, default=list(MIXES), help="Comma separated: " + ",".join(MIXES))
+    parser.add_argument("--modes", type=_csv, default=["object", "vectorized"],
+                        help="Comma separated: " + ",".join(MODES))
+    parser.add_argument("--ticks", type=int, default=TICKS)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Baseline results file to compare against")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="Relative slowdown reported as a regression (default 0.15)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    for name, allowed in (("benchmarks", BENCHMARKS), ("mixes", MIXES), ("modes", MODES)):
+        unknown = set(getattr(args, name)) - set(allowed)
+        if unknown:
+            parser.error(f"unknown {name}: {', '.join(sorted(unknown))}")
+
+    report = {
+        "meta": metadata(),
+        "results": run(args.benchmarks, args.sizes, args.mixes, args.modes, args.ticks, args.seed),
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_results(report["results"])
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows = compare(baseline["results"], report["results"], args.threshold)
+        regressions = [row for row in rows if row["regression"]]
+        print(f"\nCompared {len(rows)} metrics against {args.compare} "
+              f"(revision {baseline['meta'].get('revision')}): {len(regressions)} regression(s)")
+        for row in regressions:
+            print(f"  {row['key']} {row['metric']}: {row['baseline']:.3f} -> {row['current']:.3f} "
+                  f"({row['change'] * 100:+.1f}%)")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -43,5 +43,48 @@ TERRAIN_ROCK = 2
 MAX_NEIGHBORS = 4      # Max neighbors before reproduction stops
 NEIGHBOR_RADIUS = 30   # Radius to check for neighbors (pixels)
 MIN_SPAWN_DISTANCE = 15 # Min distance for new offspring
+
+# Spatial Grid
+SPATIAL_GRID_CELL_SIZE = 50     # Initial cell size (pixels)
+SPATIAL_GRID_AUTO_TUNE = True   # Re-pick the cell size from sensing radii and density
+SPATIAL_GRID_RETUNE_FACTOR = 2.0  # Re-tune when population changes by this factor
+SPATIAL_GRID_CELL_COST = 2.0    # Cost of visiting a cell, in distance-check units
+
+# Runner
+RUNNER_MODE = "async"          # "async" (tick on the event loop), "thread" or "process" worker
+
+# Broadcasting
+BROADCAST_INTERVAL = 0.05      # Seconds between state frames (20 Hz), shared by all clients
+DELTA_KEYFRAME_INTERVAL = 200  # Frames between keyframes in the delta protocol (0 = never)
+
+# Targeting
+USE_BATCHED_TARGETING = True  # Answer all TargetedMovement lookups per tick in one vectorized query
+
+# Agent Storage
+USE_COLUMNAR_STORE = False   # Keep hot agent state in NumPy columns (AgentStore)
+AGENT_STORE_CAPACITY = 1024  # Initial rows; the store doubles when full
+AGENT_POOL_SIZE = 0          # Removed agents each environment keeps per species for reuse (0 = off; opt in only if nothing holds removed agents)
+USE_VECTORIZED_SYSTEMS = False  # Update Growth/Photosynthesis/Heterotrophy as NumPy passes (implies columnar)
+
+# Parallel Tick
+USE_PARALLEL_TICK = False        # Two-phase tile-parallel agent update (implies vectorized)
+PARALLEL_WORKERS = 0             # Decide-phase process pool size (0 = one per CPU)
+PARALLEL_TILE_SIZE = 200.0       # Tile side in pixels
+PARALLEL_INLINE_THRESHOLD = 2000 # Below this many queries per tick, decide in-process
+
+# Stats History
+STATS_HISTORY_CAPACITY = 10000  # Full-resolution records (one per 10 ticks) kept in memory
+STATS_HISTORY_TIERS = ((600, 10080), (36000, 8760))  # (ticks per bucket, buckets kept): per minute for a week, per hour for a year at 10 TPS
+STATS_HISTORY_DIR = "stats_history"  # Server runner's append-only full-resolution log, reopened on restart (None = memory only)
+
+# Saves
+SAVE_FORMAT = "snapshot"          # "snapshot" (binary columns, background write) or "json"
+SNAPSHOT_COMPRESSION = "auto"     # "auto"/"none" (uncompressed, memory-mapped loads), "zstd", "lz4" or "zlib"
+SNAPSHOT_ZLIB_LEVEL = 1           # zlib fallback level (speed over ratio)
+
+# Profiling
+PROFILER_ENABLED = False  # Per-phase/per-component tick timings (see simulation.profiler)
+PROFILER_WINDOW = 300     # Ticks kept for the rolling percentiles
+
 # Logging
 LOG_LEVEL = "INFO" # DEBUG, INFO, WARNING, ERROR
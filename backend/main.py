@@ -1,14 +1,19 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi.responses import Response, StreamingResponse
+from typing import Optional
 from fastapi.middleware.cors import CORSMiddleware
 import asyncio
 import json
-import random
 import config
 import time
 from logger import setup_logger
 
 from simulation.runner import SimulationRunner
-from simulation.factory import AgentFactory
+from simulation.delta import PROTOCOL_FULL
+from simulation.binary_frame import ENCODING_JSON
+from simulation.history_export import (
+    FORMATS, FORMAT_CSV, FORMAT_COLUMNAR, FORMAT_JSON, csv_chunks, encode_columnar, to_records,
+)
 
 # Setup Logger
 logger = setup_logger("Main")
@@ -34,10 +39,10 @@ async def startup_event():
     Initializes and starts the SimulationRunner.
     """
     logger.info("Starting Simulation Runner...")
-    runner.start()
-    # Populate default agents if empty
+    # Populate default agents if empty (before a worker takes the environment over)
     if not runner.environment.agents:
         runner.environment._populate_default_agents()
+    runner.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
@@ -67,7 +72,86 @@ async def get_stats():
     Returns:
         dict: Current agent count.
     """
-    return {"agent_count": len(runner.environment.agents)}
+    return {"agent_count": runner.agent_count()}
+
+@app.get("/api/profile")
+async def get_profile():
+    """
+    Get rolling per-phase and per-component tick timings.
+
+    Returns:
+        dict: Whether profiling is on, and p50/p95/p99/mean (ms) per phase.
+    """
+    try:
+        return await asyncio.to_thread(runner.get_profile)
+    except TimeoutError:
+        raise HTTPException(status_code=503, detail="Simulation worker did not answer")
+
+@app.post("/api/profile")
+async def set_profile(enabled: bool):
+    """
+    Turn the tick profiler on or off.
+
+    Args:
+        enabled (bool): Query parameter, e.g. `/api/profile?enabled=true`.
+
+    Returns:
+        dict: The requested profiler state.
+    """
+    runner.set_profiling(enabled)
+    return {"enabled": enabled}
+
+@app.get("/api/history")
+async def get_history(start: Optional[int] = None, end: Optional[int] = None,
+                      species: Optional[str] = None, points: Optional[int] = None,
+                      format: str = FORMAT_JSON):
+    """
+    Export stats history for a tick range.
+
+    The simulation picks the coarsest stored resolution that covers the
+    range and averages it down to `points` samples, so a long run's graph
+    can be loaded without shipping every sample.
+
+    Args:
+        start (Optional[int]): First tick (inclusive, default: oldest kept).
+        end (Optional[int]): Last tick (inclusive, default: latest).
+        species (Optional[str]): Comma separated columns, e.g. "Fern,Frog" (default: all).
+        points (Optional[int]): Maximum number of samples.
+        format (str): "json" (list of records), "csv" (streamed) or
+            "columnar" (see simulation.history_export.encode_columnar).
+
+    Returns:
+        The encoded history.
+    """
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(FORMATS)}")
+    if points is not None and points < 1:
+        raise HTTPException(status_code=400, detail="points must be positive")
+    columns = [name.strip() for name in species.split(",") if name.strip()] if species else None
+    try:
+        result = await asyncio.to_thread(runner.query_history, start, end, columns, points)
+    except TimeoutError:
+        raise HTTPException(status_code=503, detail="Simulation worker did not answer")
+
+    if format == FORMAT_CSV:
+        return StreamingResponse(csv_chunks(result), media_type="text/csv",
+                                 headers={"Content-Disposition": "attachment; filename=stats_history.csv"})
+    if format == FORMAT_COLUMNAR:
+        return Response(encode_columnar(result), media_type="application/octet-stream")
+    return to_records(result)
+
+@app.get("/history")
+async def get_history_records(points: int = config.STATS_HISTORY_CAPACITY):
+    """
+    Recent stats history as a list of records (used by the stats panel).
+
+    Args:
+        points (int): Maximum number of samples.
+
+    Returns:
+        list: {"time": ..., species: count} records, oldest first.
+    """
+    return await get_history(points=points)
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
@@ -79,6 +163,13 @@ async def websocket_endpoint(websocket: WebSocket):
     - Receiving commands (spawn, pause, speed, etc.).
     - Broadcasting simulation state.
 
+    State frames come from the runner's shared BroadcastHub, which encodes
+    each frame once for all clients. Clients connecting with
+    `?protocol=delta` receive one keyframe followed by deltas (see
+    simulation.delta.DeltaEncoder); the default is a full snapshot per frame.
+    Clients connecting with `?encoding=binary` receive packed binary frames
+    instead (see simulation.binary_frame.BinaryFrameEncoder).
+
     Args:
         websocket (WebSocket): The WebSocket connection.
     """
@@ -88,6 +179,9 @@ async def websocket_endpoint(websocket: WebSocket):
     
     last_heartbeat = time.time()
     HEARTBEAT_INTERVAL = 5.0
+
+    subscription = runner.hub.subscribe(websocket.query_params.get("protocol", PROTOCOL_FULL),
+                                        websocket.query_params.get("encoding", ENCODING_JSON))
     
     # Reader Task Function
     async def listen_for_messages():
@@ -98,68 +192,16 @@ async def websocket_endpoint(websocket: WebSocket):
                 
                 if message.get("type") == "pong":
                     pass 
+
+                elif message.get("type") == "request_keyframe":
+                    subscription.needs_keyframe = True
                     
-                elif message.get("type") == "spawn":
-                    agent_type = message["payload"]["agent_type"]
-                    species_map = {
-                        "plant": "Fern",
-                        "animal": "Frog",
-                        "Fish": "Fish",
-                        "Lizard": "Lizard"
-                    }
-                    species = species_map.get(agent_type, "Fern")
-                    new_agent = AgentFactory.create(
-                        species, 
-                        random.randint(0, config.SIMULATION_WIDTH), 
-                        random.randint(0, config.SIMULATION_HEIGHT)
-                    )
-                    if new_agent:
-                        runner.environment.add_agent(new_agent)
-                        logger.info(f"Spawned {species} via WebSocket")
-                        
                 elif message.get("type") == "set_speed":
                     new_speed = message["payload"]["speed"]
                     runner.set_speed(new_speed)
-                    
-                elif message.get("type") == "set_light_mode":
-                    mode = message["payload"]["mode"]
-                    if mode in ["cycle", "always_on"]:
-                        runner.environment.equipment["lights"].mode = mode
-                        logger.info(f"Light mode set to {mode}")
-                        
-                elif message.get("type") == "spawn_batch":
-                    agent_type = message["payload"]["type"]
-                    count = message["payload"]["count"]
-                    species_map = {
-                        "plant": "Fern",
-                        "animal": "Frog",
-                        "Fish": "Fish",
-                        "Lizard": "Lizard"
-                    }
-                    species = species_map.get(agent_type, "Fern")
-                    logger.info(f"Spawning batch of {count} {species}s")
-                    for _ in range(count):
-                        new_agent = AgentFactory.create(
-                            species,
-                            random.randint(0, config.SIMULATION_WIDTH),
-                            random.randint(0, config.SIMULATION_HEIGHT)
-                        )
-                        if new_agent:
-                            runner.environment.add_agent(new_agent)
-                            
-                elif message.get("type") == "save_state":
-                    filename = message["payload"].get("filename", "save1")
-                    logger.info(f"Saving state to {filename}")
-                    runner.environment.save_to_file(filename)
-                    
-                elif message.get("type") == "load_state":
-                    filename = message["payload"].get("filename", "save1")
-                    logger.info(f"Loading state from {filename}")
-                    runner.environment.load_from_file(filename)
-                    
-                elif message.get("type") == "reset":
-                    logger.info("Resetting simulation")
-                    runner.environment.reset()
+
+                else:
+                    runner.submit(message)
                     
         except Exception as e:
             if "disconnect" not in str(e).lower() and "closed" not in str(e).lower():
@@ -182,21 +224,22 @@ async def websocket_endpoint(websocket: WebSocket):
                 except Exception:
                     break
 
-            # Broadcast State
+            # Forward the latest shared frame (older undelivered frames are coalesced)
             try:
-                state = runner.get_state()
-                await websocket.send_text(json.dumps(state))
+                frame = await subscription.get(timeout=HEARTBEAT_INTERVAL)
+                if isinstance(frame, bytes):
+                    await websocket.send_bytes(frame)
+                elif frame is not None:
+                    await websocket.send_text(frame)
             except Exception as e:
                 if "disconnect" in str(e).lower() or "closed" in str(e).lower():
                     break
                 logger.error(f"Broadcast error: {e}")
                 await asyncio.sleep(1.0)
-                
-            # Throttle broadcast rate (e.g., 10Hz or 20Hz independent of simulation TPS)
-            await asyncio.sleep(0.05) # 20 FPS broadcast
 
     except Exception as e:
         logger.info(f"Client disconnected: {client_info} ({e})")
     finally:
         reader_task.cancel()
+        runner.hub.unsubscribe(subscription)
         logger.info(f"Connection handler finished for {client_info}")
@@ -0,0 +1,325 @@
+from typing import Dict, Any, List, Optional, Iterator
+from collections.abc import MutableMapping
+import numpy as np
+import config
+
+# State keys backed by float64 columns. NaN marks "key not set" for that agent
+# (e.g. plants have no "hunger").
+COLUMN_KEYS = ("energy", "hunger", "size", "max_energy")
+
+
+class AgentStore:
+    """
+    Structure-of-arrays storage for the hot per-agent state.
+
+    Agents attached to the store keep their `Agent`/`Component` API, but their
+    position, alive flag, species and the keys in COLUMN_KEYS live in
+    contiguous NumPy arrays, so bulk passes can operate on whole columns.
+
+    Attributes:
+        x, y (np.ndarray): Positions (float64).
+        alive (np.ndarray): Alive flags (bool). False for free rows.
+        species_id (np.ndarray): Index into `species_names` (int16, -1 if free).
+        tags (np.ndarray): Component capability bitmasks (int64, see Agent.tags).
+        energy, hunger, size, max_energy (np.ndarray): State columns (float64).
+        params (Dict[str, np.ndarray]): Component parameter columns, filled by
+            `Component.bind_store` (NaN where the agent lacks the component).
+        serial (np.ndarray): Attach serial of each row (int64, unique per
+            attach, 0 for free rows): a row whose serial changed holds a
+            different agent.
+        revision (np.ndarray): Per-row counter (int64) bumped whenever state
+            outside the columns (keys other than COLUMN_KEYS) or the
+            agent's component list changes, so consumers can detect those
+            changes without reading every agent.
+        agents (List[Optional[Agent]]): Row -> attached agent.
+        end (int): High-water mark; rows >= end have never been used.
+        version (int): Bumped whenever rows are attached or detached.
+    """
+    def __init__(self, capacity: int = config.AGENT_STORE_CAPACITY):
+        self.capacity = 0
+        self.end = 0
+        self.version = 0
+        self.count = 0
+        self._next_serial = 1
+        self.species_names: List[str] = []
+        self._species_index: Dict[str, int] = {}
+        self._free: List[int] = []
+        self.agents: List[Optional[Any]] = []
+        self.params: Dict[str, np.ndarray] = {}
+        self.x = np.zeros(0)
+        self.y = np.zeros(0)
+        self.alive = np.zeros(0, dtype=bool)
+        self.species_id = np.zeros(0, dtype=np.int16)
+        self.tags = np.zeros(0, dtype=np.int64)
+        self.serial = np.zeros(0, dtype=np.int64)
+        self.revision = np.zeros(0, dtype=np.int64)
+        for key in COLUMN_KEYS:
+            setattr(self, key, np.zeros(0))
+        self._grow(max(1, capacity))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _grow(self, capacity: int):
+        """Reallocate every column to `capacity` rows, keeping existing data."""
+        def resized(arr, fill):
+            new = np.full(capacity, fill, dtype=arr.dtype)
+            new[:self.capacity] = arr
+            return new
+
+        self.x = resized(self.x, 0.0)
+        self.y = resized(self.y, 0.0)
+        self.alive = resized(self.alive, False)
+        self.species_id = resized(self.species_id, -1)
+        self.tags = resized(self.tags, 0)
+        self.serial = resized(self.serial, 0)
+        self.revision = resized(self.revision, 0)
+        for key in COLUMN_KEYS:
+            setattr(self, key, resized(getattr(self, key), np.nan))
+        self.columns: Dict[str, np.ndarray] = {key: getattr(self, key) for key in COLUMN_KEYS}
+        for name, column in self.params.items():
+            self.params[name] = resized(column, np.nan)
+        self.agents.extend([None] * (capacity - self.capacity))
+        self.capacity = capacity
+
+    def param_column(self, name: str) -> np.ndarray:
+        """Return the parameter column `name`, creating it (NaN filled) if needed."""
+        column = self.params.get(name)
+        if column is None:
+            column = np.full(self.capacity, np.nan)
+            self.params[name] = column
+        return column
+
+    def species_code(self, species: str) -> int:
+        """Return the integer id for a species name, registering it if new."""
+        code = self._species_index.get(species)
+        if code is None:
+            code = len(self.species_names)
+            self.species_names.append(species)
+            self._species_index[species] = code
+        return code
+
+    def reserve(self, count: int):
+        """Grow (once) so that `count` more agents can be attached without reallocating."""
+        needed = self.end + max(0, count - len(self._free))
+        if needed > self.capacity:
+            capacity = self.capacity
+            while capacity < needed:
+                capacity *= 2
+            self._grow(capacity)
+
+    def _allocate_row(self) -> int:
+        if self._free:
+            return self._free.pop()
+        if self.end >= self.capacity:
+            self._grow(self.capacity * 2)
+        row = self.end
+        self.end += 1
+        return row
+
+    def attach(self, agent) -> int:
+        """
+        Move an agent's hot state into a store row and turn it into a view.
+
+        Args:
+            agent (Agent): A detached agent.
+
+        Returns:
+            int: The allocated row.
+        """
+        row = self._allocate_row()
+        state = agent.state
+        self.x[row] = agent.x
+        self.y[row] = agent.y
+        self.alive[row] = agent.alive
+        self.species_id[row] = self.species_code(state.get("species", "Unknown"))
+        self.tags[row] = agent.tags
+        self.serial[row] = self._next_serial
+        self._next_serial += 1
+        extra = {}
+        for key, value in state.items():
+            if key in self.columns:
+                self.columns[key][row] = value
+            elif key != "species":
+                extra[key] = value
+        self.agents[row] = agent
+        self.count += 1
+        self.version += 1
+        agent._bind(self, row, StateView(self, row, extra))
+        for component in agent.components:
+            component.bind_store(self, row)
+        return row
+
+    def attach_many(self, agents: List[Any]) -> np.ndarray:
+        """
+        `attach` for many agents, writing the per-row columns in one pass.
+
+        Rows are allocated in the same order as repeated `attach` calls.
+
+        Args:
+            agents (List[Agent]): Detached agents.
+
+        Returns:
+            np.ndarray: The allocated rows, one per agent.
+        """
+        count = len(agents)
+        self.reserve(count)
+        reused = min(count, len(self._free))
+        rows = self._free[len(self._free) - reused:][::-1]
+        del self._free[len(self._free) - reused:]
+        rows = np.array(rows + list(range(self.end, self.end + count - reused)), dtype=np.intp)
+        self.end += count - reused
+
+        # Detached agents keep their position and alive flag in plain attributes
+        self.x[rows] = [agent._x for agent in agents]
+        self.y[rows] = [agent._y for agent in agents]
+        self.alive[rows] = [agent._alive for agent in agents]
+        self.tags[rows] = [agent.tags for agent in agents]
+        self.serial[rows] = np.arange(self._next_serial, self._next_serial + count)
+        self._next_serial += count
+        columns, slots, species_index = self.columns, self.agents, self._species_index
+        species_ids = []
+        bindings: Dict[type, Any] = {}  # Component class -> (rows, components)
+        for agent, row in zip(agents, rows.tolist()):
+            extra = {}
+            species = "Unknown"
+            for key, value in agent.state.items():
+                column = columns.get(key)
+                if column is not None:
+                    column[row] = value
+                elif key == "species":
+                    species = value
+                else:
+                    extra[key] = value
+            code = species_index.get(species)
+            species_ids.append(code if code is not None else self.species_code(species))
+            slots[row] = agent
+            agent._bind(self, row, StateView(self, row, extra))
+            for component in agent.components:
+                binding = bindings.get(type(component))
+                if binding is None:
+                    binding = bindings[type(component)] = ([], [])
+                binding[0].append(row)
+                binding[1].append(component)
+        self.species_id[rows] = species_ids
+        for component_cls, (component_rows, components) in bindings.items():
+            component_cls.bind_store_many(self, component_rows, components)
+        self.count += count
+        self.version += 1
+        return rows
+
+    def detach(self, agent):
+        """
+        Copy an agent's state back into plain attributes and free its row.
+
+        Args:
+            agent (Agent): An agent attached to this store.
+        """
+        row = agent._row
+        state = agent.state.copy()
+        agent._unbind(self.x.item(row), self.y.item(row), bool(self.alive[row]), state)
+        self.alive[row] = False
+        self.species_id[row] = -1
+        self.tags[row] = 0
+        self.serial[row] = 0
+        for key in COLUMN_KEYS:
+            self.columns[key][row] = np.nan
+        for column in self.params.values():
+            column[row] = np.nan
+        self.agents[row] = None
+        self._free.append(row)
+        self.count -= 1
+        self.version += 1
+
+    def clear(self):
+        """Detach every agent."""
+        for agent in self.agents[:self.end]:
+            if agent is not None:
+                self.detach(agent)
+
+    def touch(self, row: int):
+        """Record a change of a row's non-column state (see `revision`)."""
+        self.revision[row] += 1
+
+    def live_rows(self) -> np.ndarray:
+        """Indices of rows holding live agents."""
+        return np.flatnonzero(self.alive[:self.end])
+
+    def rows_for_species(self, species: str) -> np.ndarray:
+        """Indices of rows holding live agents of the given species."""
+        code = self._species_index.get(species)
+        if code is None:
+            return np.zeros(0, dtype=np.intp)
+        return np.flatnonzero(self.alive[:self.end] & (self.species_id[:self.end] == code))
+
+
+class StateView(MutableMapping):
+    """
+    Dict-like view of an attached agent's state.
+
+    Keys in COLUMN_KEYS and "species" read/write the store columns; any other
+    key lives in a small per-agent dict.
+    """
+    __slots__ = ("_store", "_row", "_extra")
+
+    def __init__(self, store: AgentStore, row: int, extra: Dict[str, Any]):
+        self._store = store
+        self._row = row
+        self._extra = extra
+
+    def __getitem__(self, key: str) -> Any:
+        column = self._store.columns.get(key)
+        if column is not None:
+            value = column.item(self._row)
+            if value != value:  # NaN: not set
+                raise KeyError(key)
+            return value
+        if key == "species":
+            return self._store.species_names[self._store.species_id.item(self._row)]
+        return self._extra[key]
+
+    def __setitem__(self, key: str, value: Any):
+        column = self._store.columns.get(key)
+        if column is not None:
+            column[self._row] = value
+            return
+        if key == "species":
+            self._store.species_id[self._row] = self._store.species_code(value)
+        else:
+            self._extra[key] = value
+        self._store.revision[self._row] += 1
+
+    def __delitem__(self, key: str):
+        column = self._store.columns.get(key)
+        if column is not None:
+            if column.item(self._row) != column.item(self._row):
+                raise KeyError(key)
+            column[self._row] = np.nan
+        elif key == "species":
+            raise KeyError("species is required for attached agents")
+        else:
+            del self._extra[key]
+            self._store.revision[self._row] += 1
+
+    def __iter__(self) -> Iterator[str]:
+        yield "species"
+        for key in COLUMN_KEYS:
+            value = self._store.columns[key].item(self._row)
+            if value == value:
+                yield key
+        yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    @property
+    def extra(self) -> Dict[str, Any]:
+        """The keys not backed by store columns (the live dict: do not modify)."""
+        return self._extra
+
+    def copy(self) -> Dict[str, Any]:
+        """Return a plain dict snapshot of the state."""
+        return dict(self.items())
+
+    def __repr__(self) -> str:
+        return f"StateView({self.copy()!r})"
@@ -1,18 +1,45 @@
 from typing import Tuple, Dict, Any, List
-import uuid
+import itertools
+from .components import Component, component_bit
+
+# Provisional ids for agents not (yet) in an environment; see Environment.add_agent
+_provisional_ids = itertools.count(-1, -1)
 
 class Agent:
     """
     Generic Agent container.
     Behavior is defined by attached Components.
+
+    Position, alive flag and state are either plain attributes or, when the
+    agent is attached to an `AgentStore`, views into the store's columns.
+
+    `id` is a sequential integer assigned by the environment the agent is
+    added to (negative provisional ids before that).
+
+    `tags` is a capability bitmask with one bit per attached component class
+    (see components.component_bit), used to evaluate target criteria.
+
+    Fields are `__slots__`; anything else about an agent goes in `state`.
     """
+    __slots__ = ("id", "_store", "_row", "_population", "_counted", "_x", "_y", "_alive",
+                 "components", "tags", "_component_index", "state")
+
     def __init__(self, x: int, y: int, species: str):
-        self.id = str(uuid.uuid4())
+        self.id = next(_provisional_ids)
+        self._store = None
+        self._row = -1
+        # Set while an environment counts this agent (see PopulationCounters)
+        self._population = None
+        self._counted = False
         self.x = x
         self.y = y
         self.alive = True
         self.components: List['Component'] = []
-        
+        self.tags = 0
+        # Component class (and its Component base classes) -> index of the first
+        # instance; shared by the agents of a species (see factory.SpeciesTemplate)
+        self._component_index: Dict[type, int] = {}
+
         # Generic state dictionary
         self.state: Dict[str, Any] = {
             "species": species,
@@ -20,14 +47,78 @@ class Agent:
             "size": 5.0
         }
 
+    @property
+    def x(self) -> float:
+        if self._store is None:
+            return self._x
+        return self._store.x.item(self._row)
+
+    @x.setter
+    def x(self, value: float):
+        if self._store is None:
+            self._x = value
+        else:
+            self._store.x[self._row] = value
+
+    @property
+    def y(self) -> float:
+        if self._store is None:
+            return self._y
+        return self._store.y.item(self._row)
+
+    @y.setter
+    def y(self, value: float):
+        if self._store is None:
+            self._y = value
+        else:
+            self._store.y[self._row] = value
+
+    @property
+    def alive(self) -> bool:
+        if self._store is None:
+            return self._alive
+        return self._store.alive.item(self._row)
+
+    @alive.setter
+    def alive(self, value: bool):
+        if self._store is None:
+            self._alive = value
+        else:
+            self._store.alive[self._row] = value
+        if self._population is not None:
+            self._population.alive_changed(self, value)
+
+    def _bind(self, store, row: int, state):
+        """Turn this agent into a view over `store` row `row` (see AgentStore.attach)."""
+        self._store = store
+        self._row = row
+        self.state = state
+
+    def _unbind(self, x: float, y: float, alive: bool, state: Dict[str, Any]):
+        """Restore plain attributes after leaving a store (see AgentStore.detach)."""
+        self._store = None
+        self._row = -1
+        self.x = x
+        self.y = y
+        self.alive = alive
+        self.state = state
+
     def add_component(self, component: 'Component'):
+        index = dict(self._component_index)  # Copy: the index may be shared
+        for cls in component.__class__.__mro__:
+            if issubclass(cls, Component):
+                index.setdefault(cls, len(self.components))
+        self._component_index = index
         self.components.append(component)
+        self.tags |= component_bit(component.__class__.__name__)
+        if self._store is not None:
+            self._store.tags[self._row] = self.tags
+            self._store.touch(self._row)
 
     def get_component(self, component_type: type):
-        for c in self.components:
-            if isinstance(c, component_type):
-                return c
-        return None
+        """Return the first component that is an instance of component_type (O(1))."""
+        index = self._component_index.get(component_type)
+        return self.components[index] if index is not None else None
 
     def update(self, environment: 'Environment'):
         """
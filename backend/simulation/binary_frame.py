@@ -0,0 +1,232 @@
+import json
+import struct
+from typing import Dict, Any, List, Optional
+import numpy as np
+
+# Broadcast encodings a WebSocket client can negotiate (`?encoding=...`)
+ENCODING_JSON = "json"      # Text frames (full or delta protocol)
+ENCODING_BINARY = "binary"  # Packed binary frames, see BinaryFrameEncoder
+ENCODINGS = (ENCODING_JSON, ENCODING_BINARY)
+
+MAGIC = b"PSIM"
+VERSION = 1
+FLAG_TERRAIN = 0x01  # Frame carries the terrain grid
+
+# magic, version, flags, reserved, agent count, metadata length
+_HEADER = struct.Struct("<4sBBHII")
+
+# Per-agent arrays in frame order: (name, dtype)
+_COLUMNS = (
+    ("index", "<u4"),
+    ("x", "<f4"),
+    ("y", "<f4"),
+    ("size", "<f4"),
+    ("species", "u1"),
+    ("type", "u1"),
+    ("color", "u1"),
+)
+
+
+class _CodeTable:
+    """Maps strings to uint8 codes for one frame."""
+    def __init__(self):
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def code(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            if code > 255:
+                raise ValueError("More than 256 distinct values in a uint8 code table")
+            self._codes[value] = code
+            self.values.append(value)
+        return code
+
+
+class BinaryFrameEncoder:
+    """
+    Packs `get_state()` snapshots into compact binary frames.
+
+    Frame layout (little-endian):
+        header      magic "PSIM", u8 version, u8 flags, u16 reserved,
+                    u32 agent count N, u32 metadata length M
+        metadata    M bytes of UTF-8 JSON, zero-padded to a 4-byte boundary:
+                    {"environment": {...}, "species": [...], "types": [...],
+                     "colors": [...]}
+        columns     u32 index[N], f32 x[N], f32 y[N], f32 size[N],
+                    u8 species[N], u8 type[N], u8 color[N]
+
+    Species, type and color are codes into the metadata tables. Agent ids
+    are replaced by a small integer index that stays the same for an agent
+    for as long as it lives (indices of removed agents are reused).
+    The environment omits "terrain" unless the frame has FLAG_TERRAIN.
+
+    Given the live environment of a columnar run, the columns are copied
+    straight from its AgentStore: the index is the store row, species codes
+    are the store's species ids, and the type and color codes of a row are
+    only looked up again when its agent or its revision changed.
+    """
+    def __init__(self):
+        self._indices: Dict[Any, int] = {}
+        self._free: List[int] = []
+        # Store path: type/color tables kept across frames, and the codes of
+        # each row, valid while the row's (serial, revision) is unchanged
+        self._types = _CodeTable()
+        self._colors = _CodeTable()
+        self._row_codes = np.zeros((0, 2), dtype="u1")
+        self._row_keys = np.zeros((0, 2), dtype=np.int64)
+        self._row_store = None
+
+    def _index_agents(self, agents: List[Dict[str, Any]]) -> List[int]:
+        current = {agent["id"] for agent in agents}
+        for agent_id in [i for i in self._indices if i not in current]:
+            self._free.append(self._indices.pop(agent_id))
+        indices = []
+        for agent in agents:
+            index = self._indices.get(agent["id"])
+            if index is None:
+                index = self._free.pop() if self._free else len(self._indices)
+                self._indices[agent["id"]] = index
+            indices.append(index)
+        return indices
+
+    def encode(self, state: Dict[str, Any], include_terrain: bool = True,
+               environment: Optional['Environment'] = None) -> bytes:
+        """
+        Encode a snapshot.
+
+        Args:
+            state (Dict[str, Any]): A `get_state()` snapshot. May omit
+                "agents" when `environment` has a store.
+            include_terrain (bool): Whether to embed the terrain grid.
+            environment (Optional[Environment]): The live environment the
+                snapshot was just taken from, to read its AgentStore.
+
+        Returns:
+            bytes: The binary frame.
+        """
+        if environment is not None and environment.store is not None:
+            columns, species, types, colors = self._store_columns(environment.store)
+            return _frame(state, include_terrain, columns, species, types, colors)
+
+        agents = state["agents"]
+        count = len(agents)
+        species, types, colors = _CodeTable(), _CodeTable(), _CodeTable()
+        columns = {
+            "index": np.array(self._index_agents(agents), dtype="<u4"),
+            "x": np.fromiter((a["position"]["x"] for a in agents), dtype="<f4", count=count),
+            "y": np.fromiter((a["position"]["y"] for a in agents), dtype="<f4", count=count),
+            "size": np.fromiter((a["state"].get("size", 0.0) for a in agents), dtype="<f4", count=count),
+            "species": np.fromiter((species.code(a["state"].get("species", "")) for a in agents),
+                                   dtype="u1", count=count),
+            "type": np.fromiter((types.code(a["type"]) for a in agents), dtype="u1", count=count),
+            "color": np.fromiter((colors.code(a["state"].get("color", "#ffffff")) for a in agents),
+                                 dtype="u1", count=count),
+        }
+        return _frame(state, include_terrain, columns, species.values, types.values, colors.values)
+
+    def _store_columns(self, store: 'AgentStore'):
+        """Frame columns and code tables read from an AgentStore."""
+        if len(store.species_names) > 256:
+            raise ValueError("More than 256 distinct values in a uint8 code table")
+        rows = np.flatnonzero(store.serial[:store.end] != 0)
+        if self._row_store is not store:
+            self._row_store = store
+            self._row_codes = np.zeros((0, 2), dtype="u1")
+            self._row_keys = np.zeros((0, 2), dtype=np.int64)
+        if len(self._row_keys) < store.end:
+            extra = store.end - len(self._row_keys)
+            self._row_codes = np.concatenate([self._row_codes, np.zeros((extra, 2), dtype="u1")])
+            self._row_keys = np.concatenate([self._row_keys, np.zeros((extra, 2), dtype=np.int64)])
+        keys = np.column_stack([store.serial[rows], store.revision[rows]])
+        try:
+            self._code_rows(store, rows[(self._row_keys[rows] != keys).any(axis=1)])
+        except ValueError:
+            # The persistent tables overflowed: start them over from this frame
+            self._types, self._colors = _CodeTable(), _CodeTable()
+            self._code_rows(store, rows)
+        self._row_keys[rows] = keys
+        size = store.size[rows]
+        columns = {
+            "index": rows.astype("<u4"),
+            "x": store.x[rows].astype("<f4"),
+            "y": store.y[rows].astype("<f4"),
+            "size": np.where(np.isnan(size), 0.0, size).astype("<f4"),
+            "species": store.species_id[rows].astype("u1"),
+            "type": self._row_codes[rows, 0],
+            "color": self._row_codes[rows, 1],
+        }
+        return columns, store.species_names, self._types.values, self._colors.values
+
+    def _code_rows(self, store: 'AgentStore', rows: np.ndarray):
+        """Look the type and color codes of `rows` up again."""
+        agents, types, colors = store.agents, self._types, self._colors
+        for row in rows.tolist():
+            state = agents[row].state
+            self._row_codes[row] = (types.code(state.get("visual_tag", "unknown")),
+                                    colors.code(state.get("color", "#ffffff")))
+
+
+def _frame(state: Dict[str, Any], include_terrain: bool, columns: Dict[str, np.ndarray],
+           species: List[str], types: List[str], colors: List[str]) -> bytes:
+    """Assemble header, metadata and columns into a frame."""
+    environment = dict(state["environment"])
+    if not include_terrain:
+        environment.pop("terrain", None)
+    metadata = json.dumps({
+        "environment": environment,
+        "species": species,
+        "types": types,
+        "colors": colors,
+    }).encode("utf-8")
+    metadata += b"\0" * (-len(metadata) % 4)
+
+    flags = FLAG_TERRAIN if include_terrain else 0
+    count = len(columns["index"])
+    parts = [_HEADER.pack(MAGIC, VERSION, flags, 0, count, len(metadata)), metadata]
+    parts.extend(columns[name].tobytes() for name, _ in _COLUMNS)
+    return b"".join(parts)
+
+
+def decode_frame(data: bytes, view: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Decode a binary frame back into a snapshot (client-side logic).
+
+    Args:
+        data (bytes): A frame produced by BinaryFrameEncoder.
+        view (Optional[Dict[str, Any]]): The previous snapshot, used for the
+            terrain when the frame does not carry it.
+
+    Returns:
+        Dict[str, Any]: `{"environment": ..., "agents": [...]}` where each
+        agent has "id" (the integer index), "type", "position" and a
+        "state" with species, color and size.
+    """
+    magic, version, flags, _, count, meta_len = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a version %d simulation frame" % VERSION)
+    offset = _HEADER.size
+    metadata = json.loads(data[offset:offset + meta_len].rstrip(b"\0"))
+    offset += meta_len
+
+    columns = {}
+    for name, dtype in _COLUMNS:
+        columns[name] = np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+        offset += columns[name].nbytes
+
+    environment = metadata["environment"]
+    if not flags & FLAG_TERRAIN:
+        environment["terrain"] = view["environment"].get("terrain") if view else None
+
+    species, types, colors = metadata["species"], metadata["types"], metadata["colors"]
+    agents = [
+        {
+            "id": index,
+            "type": types[t],
+            "position": {"x": x, "y": y},
+            "state": {"species": species[s], "color": colors[c], "size": size},
+        }
+        for index, x, y, size, s, t, c in zip(*(columns[name].tolist() for name, _ in _COLUMNS))
+    ]
+    return {"environment": environment, "agents": agents}
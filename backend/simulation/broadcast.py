@@ -0,0 +1,175 @@
+import asyncio
+import json
+import logging
+from typing import Callable, Dict, Any, Optional, Set, Union
+from .delta import DeltaEncoder, keyframe_message, PROTOCOL_FULL, PROTOCOL_DELTA, PROTOCOLS
+from .binary_frame import BinaryFrameEncoder, ENCODING_JSON, ENCODING_BINARY, ENCODINGS
+import config
+
+logger = logging.getLogger("BroadcastHub")
+
+
+class Subscription:
+    """
+    One client's mailbox in a BroadcastHub.
+
+    Holds at most one undelivered frame: when a new frame arrives before the
+    client took the previous one, the old frame is dropped (coalesced), so a
+    slow client never queues up work or stalls the hub.
+
+    Attributes:
+        protocol (str): PROTOCOL_FULL or PROTOCOL_DELTA (JSON encoding only).
+        encoding (str): ENCODING_JSON (text frames) or ENCODING_BINARY (bytes).
+        needs_keyframe (bool): Delta and binary clients must (re)sync with a
+            keyframe (for binary: a frame that carries the terrain).
+        dropped (int): Frames coalesced away for this client.
+    """
+    def __init__(self, protocol: str, encoding: str = ENCODING_JSON):
+        self.protocol = protocol
+        self.encoding = encoding
+        self.needs_keyframe = protocol == PROTOCOL_DELTA or encoding == ENCODING_BINARY
+        self.dropped = 0
+        self._frame: Optional[Union[str, bytes]] = None
+        self._ready = asyncio.Event()
+
+    @property
+    def pending(self) -> bool:
+        return self._frame is not None
+
+    def offer(self, frame: Union[str, bytes]):
+        """Deliver a frame, replacing any undelivered one."""
+        if self._frame is not None:
+            self.dropped += 1
+        self._frame = frame
+        self._ready.set()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Union[str, bytes]]:
+        """
+        Wait for the next frame.
+
+        Args:
+            timeout (Optional[float]): Seconds to wait (None = forever).
+
+        Returns:
+            Optional[Union[str, bytes]]: The encoded frame, or None on timeout.
+        """
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        frame, self._frame = self._frame, None
+        self._ready.clear()
+        return frame
+
+
+class BroadcastHub:
+    """
+    Fans one encoded frame per broadcast interval out to every subscriber.
+
+    The state snapshot is taken and JSON-encoded once per `publish()` per
+    protocol in use, however many clients are connected. Delta subscribers
+    share a single DeltaEncoder; a delta client that joins, asks for a
+    resync, or has a frame coalesced away receives the (shared) keyframe of
+    the current snapshot instead of a delta. Binary subscribers work the same
+    way, with the terrain-carrying frame playing the role of the keyframe.
+
+    `state_provider` returns a `get_state()` snapshot. The optional
+    `environment_provider` returns the environment those snapshots come
+    from when it may be read in this thread between ticks (else None). For
+    a live columnar environment, delta and binary frames are encoded from
+    its AgentStore, and the state provider is called with
+    `include_agents=False` unless full-snapshot clients need the agent list.
+
+    Attributes:
+        frames_published (int): Number of publish() calls that encoded a frame.
+    """
+    def __init__(self, state_provider: Callable[..., Dict[str, Any]],
+                 environment_provider: Optional[Callable[[], Optional['Environment']]] = None):
+        self._state_provider = state_provider
+        self._environment_provider = environment_provider
+        self._subscribers: Set[Subscription] = set()
+        self._delta_encoder = DeltaEncoder()
+        self._binary_encoder = BinaryFrameEncoder()
+        self._binary_terrain_version = None
+        self.frames_published = 0
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, protocol: str = PROTOCOL_FULL, encoding: str = ENCODING_JSON) -> Subscription:
+        """Register a client. Unknown protocols/encodings fall back to full JSON."""
+        subscription = Subscription(protocol if protocol in PROTOCOLS else PROTOCOL_FULL,
+                                    encoding if encoding in ENCODINGS else ENCODING_JSON)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscribers.discard(subscription)
+
+    def publish(self):
+        """Snapshot, encode once per protocol, and offer the frames to all subscribers."""
+        if not self._subscribers:
+            return
+        environment = self._environment_provider() if self._environment_provider is not None else None
+        if environment is not None and environment.store is None:
+            environment = None
+        if environment is None or any(s.encoding == ENCODING_JSON and s.protocol == PROTOCOL_FULL
+                                      for s in self._subscribers):
+            state = self._state_provider()
+        else:
+            state = self._state_provider(include_agents=False)
+        self.frames_published += 1
+
+        full_frame = None
+        delta_frame = None
+        keyframe = None
+        binary_frames: Dict[bool, bytes] = {}
+        terrain_version = state["environment"].get("terrain_version")
+        terrain_changed = terrain_version != self._binary_terrain_version
+        for subscription in self._subscribers:
+            if subscription.encoding == ENCODING_BINARY:
+                self._binary_terrain_version = terrain_version
+                with_terrain = terrain_changed or subscription.needs_keyframe or subscription.pending
+                if with_terrain not in binary_frames:
+                    binary_frames[with_terrain] = self._binary_encoder.encode(state, with_terrain, environment)
+                subscription.needs_keyframe = False
+                subscription.offer(binary_frames[with_terrain])
+                continue
+
+            if subscription.protocol == PROTOCOL_FULL:
+                if full_frame is None:
+                    full_frame = json.dumps(state)
+                subscription.offer(full_frame)
+                continue
+
+            if delta_frame is None:
+                message = self._delta_encoder.encode(state, environment)
+                delta_frame = json.dumps(message)
+                if message["type"] == "keyframe":
+                    keyframe = delta_frame
+            if subscription.needs_keyframe or subscription.pending:
+                if keyframe is None:
+                    if "agents" not in state:
+                        state = dict(state, agents=[agent.to_dict() for agent in environment.agents])
+                    keyframe = json.dumps(keyframe_message(state, self._delta_encoder.seq))
+                subscription.needs_keyframe = False
+                subscription.offer(keyframe)
+            else:
+                subscription.offer(delta_frame)
+
+    def stats(self) -> Dict[str, Any]:
+        """Telemetry: subscriber counts and coalesced frames."""
+        return {
+            "subscribers": len(self._subscribers),
+            "frames_published": self.frames_published,
+            "frames_dropped": sum(s.dropped for s in self._subscribers),
+        }
+
+    async def run(self, interval: float = config.BROADCAST_INTERVAL):
+        """Publish every `interval` seconds until cancelled."""
+        while True:
+            try:
+                self.publish()
+            except Exception as e:
+                logger.error(f"Broadcast error: {e}")
+            await asyncio.sleep(interval)
@@ -0,0 +1,75 @@
+import logging
+from typing import Dict, Any
+from .rng import STREAM_COMMANDS
+
+logger = logging.getLogger("Commands")
+
+# WebSocket agent types -> species
+SPECIES_MAP = {
+    "plant": "Fern",
+    "animal": "Frog",
+    "Fish": "Fish",
+    "Lizard": "Lizard"
+}
+
+
+def apply_command(environment: 'Environment', message: Dict[str, Any]) -> bool:
+    """
+    Apply a client command to an environment.
+
+    Commands are the WebSocket messages `{"type": ..., "payload": {...}}`
+    that modify the simulation: spawn, spawn_batch, set_light_mode,
+    set_profiling, save_state, load_state and reset. They are plain dicts so they can be
+    queued to a simulation worker thread or process.
+
+    Args:
+        environment (Environment): The environment to modify.
+        message (Dict[str, Any]): The command message.
+
+    Returns:
+        bool: True if the command was recognized.
+    """
+    kind = message.get("type")
+    payload = message.get("payload", {})
+
+    if kind == "spawn":
+        species = SPECIES_MAP.get(payload["agent_type"], "Fern")
+        if environment.spawn_batch(species, 1, stream=STREAM_COMMANDS):
+            logger.info(f"Spawned {species}")
+
+    elif kind == "spawn_batch":
+        species = SPECIES_MAP.get(payload["type"], "Fern")
+        count = payload["count"]
+        region = payload.get("region")  # Optional [x_min, y_min, x_max, y_max]
+        logger.info(f"Spawning batch of {count} {species}s")
+        environment.spawn_batch(species, count, tuple(region) if region else None, stream=STREAM_COMMANDS)
+
+    elif kind == "set_light_mode":
+        mode = payload["mode"]
+        if mode in ["cycle", "always_on"]:
+            environment.equipment["lights"].mode = mode
+            logger.info(f"Light mode set to {mode}")
+
+    elif kind == "set_profiling":
+        environment.profiler.enabled = bool(payload["enabled"])
+        if not environment.profiler.enabled:
+            environment.profiler.reset()
+        logger.info(f"Profiling {'enabled' if environment.profiler.enabled else 'disabled'}")
+
+    elif kind == "save_state":
+        filename = payload.get("filename", "save1")
+        logger.info(f"Saving state to {filename}")
+        environment.save_to_file(filename)
+
+    elif kind == "load_state":
+        filename = payload.get("filename", "save1")
+        logger.info(f"Loading state from {filename}")
+        environment.load_from_file(filename)
+
+    elif kind == "reset":
+        logger.info("Resetting simulation")
+        environment.reset()
+
+    else:
+        return False
+    return True
@@ -1,7 +1,32 @@
-from typing import Dict, Any, Optional, List
-import random
+from typing import Dict, Any, Optional, List, Iterable, Tuple
 import math
-import config
+from .rng import entity_key, STREAM_MOVEMENT, STREAM_REPRODUCTION
+
+# Component class name -> capability bit (assigned on first use)
+_COMPONENT_BITS: Dict[str, int] = {}
+
+def component_bit(name: str) -> int:
+    """
+    Return the capability bit for a component class name.
+
+    Args:
+        name (str): Component class name (e.g. "Photosynthesis").
+
+    Returns:
+        int: A single-bit mask, stable for the lifetime of the process.
+    """
+    bit = _COMPONENT_BITS.get(name)
+    if bit is None:
+        bit = 1 << len(_COMPONENT_BITS)
+        _COMPONENT_BITS[name] = bit
+    return bit
+
+def component_mask(names: Iterable[str]) -> int:
+    """Return the OR of the capability bits of several component class names."""
+    mask = 0
+    for name in names:
+        mask |= component_bit(name)
+    return mask
 
 class Component:
     """
@@ -10,9 +35,14 @@ class Component:
     Components define specific behaviors or attributes of an agent,
     such as movement, metabolism, or reproduction.
 
+    Components keep their parameters in `__slots__` (no per-instance
+    `__dict__`); subclasses should declare theirs too.
+
     Attributes:
         agent (Agent): The agent this component is attached to.
     """
+    __slots__ = ("agent",)
+
     def __init__(self, agent: 'Agent'):
         self.agent = agent
 
@@ -25,6 +55,35 @@ class Component:
         """
         pass
 
+    def bind_store(self, store: 'AgentStore', row: int):
+        """
+        Publish per-agent parameters as AgentStore columns.
+
+        Called when the agent is attached to a columnar store. Components that
+        have a vectorized system pass (see simulation.systems) override this.
+
+        Args:
+            store (AgentStore): The store the agent was attached to.
+            row (int): The agent's row in the store.
+        """
+        pass
+
+    @classmethod
+    def bind_store_many(cls, store: 'AgentStore', rows: List[int], components: List['Component']):
+        """
+        `bind_store` for many components of exactly this class.
+
+        Components that override `bind_store` may override this too, to
+        write each parameter column in one assignment.
+
+        Args:
+            store (AgentStore): The store the agents were attached to.
+            rows (List[int]): The agents' rows, one per component.
+            components (List[Component]): Instances of `cls`.
+        """
+        for component, row in zip(components, rows):
+            component.bind_store(store, row)
+
     def to_dict(self) -> Dict[str, Any]:
         """
         Return serializable state of the component.
@@ -43,6 +102,8 @@ class Locomotion(Component):
     Attributes:
         speed (float): Movement speed in pixels per tick.
     """
+    __slots__ = ("speed",)
+
     def __init__(self, agent: 'Agent', speed: float = 1.0):
         super().__init__(agent)
         self.speed = speed
@@ -63,20 +124,27 @@ class Locomotion(Component):
         habitat = self.agent.state.get("habitat")
         if not habitat:
             return True # No habitat constraint
-            
-        terrain_type = environment.get_terrain_at(x, y)
-        
-        if habitat == config.HABITAT_AQUATIC:
-            return terrain_type == config.TERRAIN_WATER
-        elif habitat == config.HABITAT_TERRESTRIAL:
-            return terrain_type != config.TERRAIN_WATER
-        
-        return True
+        return environment.terrain_map.is_passable(habitat, x, y)
 
     def update(self, environment: 'Environment'):
         # Base update for locomotion (can be overridden)
         pass
 
+    def random_step(self, environment: 'Environment') -> Tuple[float, float]:
+        """
+        Random (dx, dy) for this tick, drawn from the agent's movement stream.
+
+        Args:
+            environment (Environment): The simulation environment.
+
+        Returns:
+            Tuple[float, float]: Displacement, each axis in [-speed, speed).
+        """
+        rng, key, tick = environment.rng, entity_key(self.agent.id), environment.total_ticks
+        dx = rng.uniform(-1, 1, STREAM_MOVEMENT, key, tick, 0) * self.speed
+        dy = rng.uniform(-1, 1, STREAM_MOVEMENT, key, tick, 1) * self.speed
+        return dx, dy
+
     def move(self, dx: float, dy: float, env: 'Environment'):
         """
         Move the agent by (dx, dy), respecting boundaries and terrain.
@@ -96,9 +164,12 @@ class Locomotion(Component):
         if self.is_valid_position(new_x, new_y, env):
             self.agent.x = new_x
             self.agent.y = new_y
+            env.spatial_grid.move(self.agent)
 
 class StaticMovement(Locomotion):
     """Agent does not move."""
+    __slots__ = ()
+
     def __init__(self, agent: 'Agent', speed: float = 0.0):
         super().__init__(agent, speed)
 
@@ -106,11 +177,51 @@ class RandomMovement(Locomotion):
     """
     Moves the agent in a random direction each tick.
     """
+    __slots__ = ()
+
     def update(self, environment: 'Environment'):
-        dx = random.uniform(-1, 1) * self.speed
-        dy = random.uniform(-1, 1) * self.speed
+        dx, dy = self.random_step(environment)
         self.move(dx, dy, environment)
 
+def criteria_key(criteria: Dict[str, Any]) -> Tuple:
+    """Hashable key identifying a target_criteria dict."""
+    return tuple(sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in criteria.items()))
+
+_MISSING = object()
+
+class CompiledCriteria:
+    """
+    TargetedMovement criteria compiled to a capability bitmask test.
+
+    "has_component" names become a mask tested against `Agent.tags`; every
+    other key is an exact state match.
+
+    Attributes:
+        mask (int): Required capability bits.
+        state_items (Tuple): (key, value) pairs the target state must contain.
+        key (Tuple): Hashable identity of the source criteria (see criteria_key).
+    """
+    __slots__ = ("mask", "state_items", "key")
+
+    def __init__(self, criteria: Dict[str, Any]):
+        self.key = criteria_key(criteria)
+        self.mask = 0
+        state_items = []
+        for key, value in criteria.items():
+            if key == "has_component":
+                self.mask |= component_mask(value)
+            else:
+                state_items.append((key, value))
+        self.state_items = tuple(state_items)
+
+    def matches(self, other: 'Agent') -> bool:
+        if other.tags & self.mask != self.mask:
+            return False
+        for key, value in self.state_items:
+            if other.state.get(key, _MISSING) != value:
+                return False
+        return True
+
 class TargetedMovement(Locomotion):
     """
     Moves the agent towards a target satisfying criteria.
@@ -118,9 +229,12 @@ class TargetedMovement(Locomotion):
     Attributes:
         target_criteria (Dict): Criteria to select a target (e.g., specific component).
     """
+    __slots__ = ("target_criteria", "compiled_criteria")
+
     def __init__(self, agent: 'Agent', speed: float = 1.0, target_criteria: Dict[str, Any] = None):
         super().__init__(agent, speed)
         self.target_criteria = target_criteria or {}
+        self.compiled_criteria = CompiledCriteria(self.target_criteria)
 
     def update(self, environment: 'Environment'):
         # Check hunger
@@ -129,41 +243,7 @@ class TargetedMovement(Locomotion):
         
         target = None
         if hunger > 20:
-            visible = environment.get_visible_agents(self.agent, vision_radius)
-            min_dist = float('inf')
-            
-            for other in visible:
-                if not other.alive: continue
-                
-                # Check criteria
-                match = True
-                for key, value in self.target_criteria.items():
-                    # Check state
-                    if key in other.state:
-                        if other.state[key] != value:
-                            match = False
-                            break
-                    # Check components (by class name string for now, or use a tag)
-                    elif key == "has_component":
-                        # Value is a list of component names
-                        for comp_name in value:
-                            has_it = False
-                            for c in other.components:
-                                if c.__class__.__name__ == comp_name:
-                                    has_it = True
-                                    break
-                            if not has_it:
-                                match = False
-                                break
-                    else:
-                        match = False # Key not found
-                        break
-                
-                if match:
-                    dist = ((other.x - self.agent.x)**2 + (other.y - self.agent.y)**2)**0.5
-                    if dist < min_dist:
-                        min_dist = dist
-                        target = other
+            target, min_dist = environment.find_target(self.agent, self.compiled_criteria, vision_radius)
         
         dx, dy = 0, 0
         if target:
@@ -180,8 +260,7 @@ class TargetedMovement(Locomotion):
                 return # Stop moving this tick if ate
         else:
             # Random wander
-            dx = random.uniform(-1, 1) * self.speed
-            dy = random.uniform(-1, 1) * self.speed
+            dx, dy = self.random_step(environment)
 
         self.move(dx, dy, environment)
 
@@ -194,6 +273,8 @@ class Growth(Component):
         max_size (float): Maximum size the agent can reach.
         energy_cost (float): Energy cost per growth step.
     """
+    __slots__ = ("growth_rate", "max_size", "energy_cost")
+
     def __init__(self, agent: 'Agent', growth_rate: float = 0.01, max_size: float = 20.0, energy_cost: float = 0.0):
         super().__init__(agent)
         self.growth_rate = growth_rate
@@ -217,6 +298,17 @@ class Growth(Component):
             if self.energy_cost > 0:
                 self.agent.state["energy"] -= self.energy_cost
 
+    def bind_store(self, store: 'AgentStore', row: int):
+        store.param_column("growth.rate")[row] = self.growth_rate
+        store.param_column("growth.max_size")[row] = self.max_size
+        store.param_column("growth.energy_cost")[row] = self.energy_cost
+
+    @classmethod
+    def bind_store_many(cls, store: 'AgentStore', rows: List[int], components: List['Component']):
+        store.param_column("growth.rate")[rows] = [c.growth_rate for c in components]
+        store.param_column("growth.max_size")[rows] = [c.max_size for c in components]
+        store.param_column("growth.energy_cost")[rows] = [c.energy_cost for c in components]
+
 # --- Metabolism Components ---
 
 class Metabolism(Component):
@@ -227,6 +319,8 @@ class Metabolism(Component):
         energy (float): Current energy level.
         max_energy (float): Maximum energy capacity.
     """
+    __slots__ = ()
+
     def __init__(self, agent: 'Agent', energy: float = 100.0, max_energy: float = 100.0):
         super().__init__(agent)
         self.agent.state["energy"] = energy
@@ -239,6 +333,8 @@ class Photosynthesis(Metabolism):
     Attributes:
         efficiency (float): Energy gained per unit of light.
     """
+    __slots__ = ("growth_rate",)
+
     def __init__(self, agent: 'Agent', growth_rate: float = 0.1, energy: float = 100.0, max_energy: float = 100.0):
         super().__init__(agent, energy, max_energy)
         self.growth_rate = growth_rate # Using growth_rate as efficiency here for compatibility
@@ -249,6 +345,13 @@ class Photosynthesis(Metabolism):
             gain = self.growth_rate * environment.light_level
             self.agent.state["energy"] = min(self.agent.state["max_energy"], self.agent.state["energy"] + gain)
 
+    def bind_store(self, store: 'AgentStore', row: int):
+        store.param_column("photosynthesis.rate")[row] = self.growth_rate
+
+    @classmethod
+    def bind_store_many(cls, store: 'AgentStore', rows: List[int], components: List['Component']):
+        store.param_column("photosynthesis.rate")[rows] = [c.growth_rate for c in components]
+
 class Heterotrophy(Metabolism):
     """
     Consumes other agents for energy.
@@ -256,6 +359,8 @@ class Heterotrophy(Metabolism):
     Attributes:
         decay_rate (float): Energy loss per tick.
     """
+    __slots__ = ("decay_rate",)
+
     def __init__(self, agent: 'Agent', decay_rate: float = 0.1, energy: float = 100.0, max_energy: float = 100.0):
         super().__init__(agent, energy, max_energy)
         self.decay_rate = decay_rate
@@ -269,6 +374,13 @@ class Heterotrophy(Metabolism):
             self.agent.alive = False
             environment.remove_agent(self.agent.id)
 
+    def bind_store(self, store: 'AgentStore', row: int):
+        store.param_column("heterotrophy.decay_rate")[row] = self.decay_rate
+
+    @classmethod
+    def bind_store_many(cls, store: 'AgentStore', rows: List[int], components: List['Component']):
+        store.param_column("heterotrophy.decay_rate")[rows] = [c.decay_rate for c in components]
+
 # --- Reproduction Components ---
 
 class Reproduction(Component):
@@ -280,6 +392,8 @@ class Reproduction(Component):
         cost (float): Energy cost of reproduction.
         threshold (float): Energy threshold required to reproduce.
     """
+    __slots__ = ("cost", "threshold")
+
     def __init__(self, agent: 'Agent', cost: float = 30.0, threshold: float = 80.0):
         super().__init__(agent)
         self.cost = cost
@@ -289,17 +403,13 @@ class AsexualReproduction(Reproduction):
     """
     Clones the agent when conditions are met.
     """
+    __slots__ = ()
+
     def update(self, environment: 'Environment'):
         if self.agent.state["energy"] > self.threshold:
-             # Density Check: Don't reproduce if crowded
-             import config
-             neighbors = environment.get_nearby_agents(self.agent, config.NEIGHBOR_RADIUS)
-             same_species_neighbors = [n for n in neighbors if n.state.get("species") == self.agent.state.get("species")]
-             
-             if len(same_species_neighbors) >= config.MAX_NEIGHBORS:
-                 return # Too crowded, save energy
-
-             if random.random() < 0.01: # Chance to reproduce
+             rng, key, tick = environment.rng, entity_key(self.agent.id), environment.total_ticks
+             # Chance to reproduce, then the density check (don't reproduce if crowded)
+             if rng.random(STREAM_REPRODUCTION, key, tick, 0) < 0.01 and not environment.is_crowded(self.agent):
                 self.agent.state["energy"] -= self.cost
                 
                 # Local import to avoid circular dependency
@@ -313,25 +423,27 @@ class AsexualReproduction(Reproduction):
                 min_dist = size * 3.0
                 max_dist = size * 5.0
                 
-                angle = random.uniform(0, 2 * math.pi)
-                dist = random.uniform(min_dist, max_dist)
+                angle = rng.uniform(0, 2 * math.pi, STREAM_REPRODUCTION, key, tick, 1)
+                dist = rng.uniform(min_dist, max_dist, STREAM_REPRODUCTION, key, tick, 2)
                 new_x = max(0, min(environment.width, self.agent.x + math.cos(angle) * dist))
                 new_y = max(0, min(environment.height, self.agent.y + math.sin(angle) * dist))
                 
-                new_agent = AgentFactory.create(species, new_x, new_y)
+                new_agent = AgentFactory.create(species, new_x, new_y, environment.agent_pool)
                 environment.add_agent(new_agent)
 
 class SexualReproduction(Reproduction):
     """
     Requires a mate to reproduce.
     """
+    __slots__ = ()
+
     def update(self, environment: 'Environment'):
          if self.agent.state["energy"] > self.threshold and self.agent.state.get("hunger", 0) < 20:
-             if random.random() < 0.005:
+             if environment.rng.random(STREAM_REPRODUCTION, entity_key(self.agent.id), environment.total_ticks) < 0.005:
                 self.agent.state["energy"] -= self.cost
                 
                 from .factory import AgentFactory
                 
                 species = self.agent.state.get("species", "Unknown")
-                new_agent = AgentFactory.create(species, self.agent.x, self.agent.y)
+                new_agent = AgentFactory.create(species, self.agent.x, self.agent.y, environment.agent_pool)
                 environment.add_agent(new_agent)
@@ -0,0 +1,281 @@
+from typing import Dict, Any, List, Optional
+import numpy as np
+from .agent_store import AgentStore, COLUMN_KEYS
+import config
+
+# Broadcast protocols a WebSocket client can negotiate
+PROTOCOL_FULL = "full"    # Every frame is a complete get_state() snapshot
+PROTOCOL_DELTA = "delta"  # One keyframe, then only changes
+PROTOCOLS = (PROTOCOL_FULL, PROTOCOL_DELTA)
+
+
+class DeltaEncoder:
+    """
+    Encodes successive `get_state()` snapshots as a keyframe followed by deltas.
+
+    Keyframe message:
+        {"type": "keyframe", "seq": n, "environment": {...}, "agents": [...]}
+
+    Delta message:
+        {"type": "delta", "seq": n, "environment": {...},
+         "spawned": [agent dicts], "removed": [ids],
+         "updated": [{"id": ..., "position": {...}?, "state": {changed keys}?,
+                      "type": ...?, "components": [...]?}]}
+
+    Delta environments omit "terrain" unless its `terrain_version` changed.
+    A keyframe is re-sent every `keyframe_interval` frames (0 = never) so
+    clients that join a shared stream or miss frames can resynchronize.
+
+    Given the live environment of a columnar run, agents are diffed from its
+    AgentStore instead of the snapshot's agent list: positions and state
+    columns are compared with the last sent copies as whole arrays, the
+    store's attach serials give spawned and removed agents, and its per-row
+    revisions flag changes to the rest of the state and to the component
+    list. Only new and changed agents are read individually.
+    """
+    def __init__(self, keyframe_interval: int = config.DELTA_KEYFRAME_INTERVAL):
+        self.keyframe_interval = keyframe_interval
+        self.seq = 0
+        self._frames_since_keyframe = 0
+        self._terrain_version = None
+        # Agent id -> (position, state, type, components) as last sent
+        self._agents: Optional[Dict[Any, tuple]] = None
+        # Store diffed in columnar mode, and its columns as last sent
+        self._store: Optional[AgentStore] = None
+        self._sent: Optional[Dict[str, Any]] = None
+
+    def reset(self):
+        """Forget the client-side view; the next frame will be a keyframe."""
+        self._agents = None
+        self._sent = None
+
+    def encode(self, state: Dict[str, Any], environment: Optional['Environment'] = None) -> Dict[str, Any]:
+        """
+        Encode the next snapshot.
+
+        Args:
+            state (Dict[str, Any]): A `get_state()` snapshot. May omit
+                "agents" when `environment` has a store.
+            environment (Optional[Environment]): The live environment the
+                snapshot was just taken from, to diff its AgentStore.
+
+        Returns:
+            Dict[str, Any]: A keyframe or delta message.
+        """
+        self.seq += 1
+        store = environment.store if environment is not None else None
+        synced = self._agents is not None if store is None else (self._sent is not None and self._store is store)
+        if not synced or (self.keyframe_interval and self._frames_since_keyframe >= self.keyframe_interval):
+            return self._keyframe(state, environment)
+
+        self._frames_since_keyframe += 1
+        environment_state = dict(state["environment"])
+        terrain_version = environment_state.get("terrain_version")
+        if terrain_version == self._terrain_version:
+            environment_state.pop("terrain", None)
+        self._terrain_version = terrain_version
+
+        if store is None:
+            spawned, removed, updated = self._diff_snapshot(state["agents"])
+        else:
+            spawned, removed, updated = self._diff_store()
+        return {
+            "type": "delta",
+            "seq": self.seq,
+            "environment": environment_state,
+            "spawned": spawned,
+            "removed": removed,
+            "updated": updated,
+        }
+
+    def _diff_snapshot(self, agents: List[Dict[str, Any]]):
+        previous = self._agents
+        current: Dict[Any, tuple] = {}
+        spawned: List[Dict[str, Any]] = []
+        updated: List[Dict[str, Any]] = []
+        for agent in agents:
+            agent_id = agent["id"]
+            position, agent_state = agent["position"], agent["state"]
+            current[agent_id] = sent = (position, agent_state, agent["type"], agent["components"])
+            before = previous.get(agent_id)
+            if before is None:
+                spawned.append(agent)
+                continue
+            change = {"id": agent_id}
+            if before[0] != position:
+                change["position"] = position
+            if before[1] != agent_state:
+                if any(k not in agent_state for k in before[1]):
+                    # Keys were dropped: send the full state instead of a patch
+                    change["state"] = agent_state
+                    change["replace_state"] = True
+                else:
+                    change["state"] = {k: v for k, v in agent_state.items() if before[1].get(k) != v}
+            if before[2] != sent[2]:
+                change["type"] = sent[2]
+            if before[3] != sent[3]:
+                change["components"] = sent[3]
+            if len(change) > 1:
+                updated.append(change)
+
+        removed = [agent_id for agent_id in previous if agent_id not in current]
+        self._agents = current
+        return spawned, removed, updated
+
+    def _diff_store(self):
+        store, sent = self._store, self._sent
+        end = store.end
+        serial = store.serial[:end]
+        before = _padded(sent["serial"], end)
+        present = serial != 0
+        same = present & (serial == before)
+
+        replugged = np.flatnonzero(serial != before)
+        removed = [sent["ids"][row] for row in np.flatnonzero((serial != before) & (before != 0)).tolist()]
+        spawned = [store.agents[row].to_dict() for row in np.flatnonzero(present & ~same).tolist()]
+
+        x, y = store.x[:end], store.y[:end]
+        moved = same & ((x != _padded(sent["x"], end)) | (y != _padded(sent["y"], end)))
+        # Revised rows (and dropped column keys) resend type, components and the whole state
+        replaced = same & (store.revision[:end] != _padded(sent["revision"], end))
+        patched = {}
+        for key in COLUMN_KEYS:
+            column, last = store.columns[key][:end], _padded(sent[key], end)
+            unset = np.isnan(column)
+            last_unset = np.isnan(last)
+            replaced |= same & unset & ~last_unset
+            patched[key] = same & (column != last) & ~(unset & last_unset)
+        changed = moved | replaced
+        for rows in patched.values():
+            changed |= rows
+
+        rows = np.flatnonzero(changed)
+        moved_rows, replaced_rows = moved[rows].tolist(), replaced[rows].tolist()
+        xs, ys = x[rows].tolist(), y[rows].tolist()
+        patches = [(key, patched[key][rows].tolist(), store.columns[key][rows].tolist()) for key in COLUMN_KEYS]
+        updated = []
+        for i, row in enumerate(rows.tolist()):
+            agent = store.agents[row]
+            change = {"id": agent.id}
+            if moved_rows[i]:
+                change["position"] = {"x": xs[i], "y": ys[i]}
+            if replaced_rows[i]:
+                data = agent.to_dict()
+                change["state"] = data["state"]
+                change["replace_state"] = True
+                change["type"] = data["type"]
+                change["components"] = data["components"]
+            else:
+                change["state"] = {key: values[i] for key, flags, values in patches if flags[i]}
+                if not change["state"]:
+                    del change["state"]
+            updated.append(change)
+
+        self._sent = _sent_columns(store, sent["ids"], replugged)
+        return spawned, removed, updated
+
+    def _keyframe(self, state: Dict[str, Any], environment: Optional['Environment'] = None) -> Dict[str, Any]:
+        self._frames_since_keyframe = 0
+        self._terrain_version = state["environment"].get("terrain_version")
+        store = environment.store if environment is not None else None
+        if store is None:
+            self._agents = {a["id"]: (a["position"], a["state"], a["type"], a["components"])
+                            for a in state["agents"]}
+            self._store = self._sent = None
+        else:
+            if "agents" not in state:
+                state = dict(state, agents=[agent.to_dict() for agent in environment.agents])
+            self._store = store
+            self._sent = _sent_columns(store)
+            self._agents = None
+        return keyframe_message(state, self.seq)
+
+
+def _padded(column: np.ndarray, length: int) -> np.ndarray:
+    """A last-sent column extended with zeros to the store's current `end`."""
+    if len(column) >= length:
+        return column[:length]
+    return np.concatenate([column, np.zeros(length - len(column), dtype=column.dtype)])
+
+
+def _sent_columns(store: AgentStore, ids: Optional[List[Any]] = None,
+                  rows: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """
+    Copy the store columns a delta is diffed against, and the id of every row.
+
+    Args:
+        store (AgentStore): The diffed store.
+        ids (Optional[List[Any]]): Row ids as last sent, updated in place.
+        rows (Optional[np.ndarray]): Rows whose agent changed since `ids`
+            (None = all rows).
+    """
+    end = store.end
+    sent = {name: getattr(store, name)[:end].copy() for name in ("serial", "revision", "x", "y")}
+    for key in COLUMN_KEYS:
+        sent[key] = store.columns[key][:end].copy()
+    ids = ids if ids is not None else []
+    ids.extend([None] * (end - len(ids)))
+    agents = store.agents
+    for row in (range(end) if rows is None else rows.tolist()):
+        agent = agents[row]
+        ids[row] = agent.id if agent is not None else None
+    sent["ids"] = ids
+    return sent
+
+
+def keyframe_message(state: Dict[str, Any], seq: int) -> Dict[str, Any]:
+    """
+    Build a keyframe message for a snapshot.
+
+    Args:
+        state (Dict[str, Any]): A `get_state()` snapshot.
+        seq (int): Sequence number of the frame.
+
+    Returns:
+        Dict[str, Any]: The keyframe message.
+    """
+    return {
+        "type": "keyframe",
+        "seq": seq,
+        "environment": state["environment"],
+        "agents": state["agents"],
+    }
+
+
+def apply_frame(view: Optional[Dict[str, Any]], message: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reconstruct a full snapshot from a keyframe/delta message (client-side logic).
+
+    Args:
+        view (Optional[Dict[str, Any]]): The previously reconstructed snapshot.
+        message (Dict[str, Any]): A message produced by DeltaEncoder.
+
+    Returns:
+        Dict[str, Any]: The snapshot as `{"environment": ..., "agents": [...]}`.
+    """
+    if message["type"] == "keyframe":
+        return {"environment": message["environment"], "agents": list(message["agents"])}
+
+    environment = dict(message["environment"])
+    if "terrain" not in environment:
+        environment["terrain"] = view["environment"].get("terrain")
+
+    removed = set(message["removed"])
+    agents = {a["id"]: a for a in view["agents"] if a["id"] not in removed}
+    for change in message["updated"]:
+        agent = dict(agents[change["id"]])
+        if "position" in change:
+            agent["position"] = change["position"]
+        if "type" in change:
+            agent["type"] = change["type"]
+        if "components" in change:
+            agent["components"] = change["components"]
+        if "state" in change:
+            if change.get("replace_state"):
+                agent["state"] = change["state"]
+            else:
+                agent["state"] = {**agent["state"], **change["state"]}
+        agents[change["id"]] = agent
+    for agent in message["spawned"]:
+        agents[agent["id"]] = agent
+    return {"environment": environment, "agents": list(agents.values())}
@@ -1,12 +1,41 @@
-from typing import List, Dict
+from typing import List, Dict, Any, Optional, Set, Tuple, Union
 from .agents import Agent
 from .equipment import LightingSystem
-from .spatial_grid import SpatialGrid
-from .factory import AgentFactory
+from .spatial_grid import SpatialGrid, suggest_cell_size
+from .species_config import SPECIES_DB, get_sensing_radii
+from .target_index import TargetIndex
+from .components import CompiledCriteria
+from .factory import AgentFactory, AgentPool
+from .agent_store import AgentStore, COLUMN_KEYS
+from .registry import AgentRegistry
+from .systems import MetabolismSystem
+from .parallel import ParallelTickSystem
+from .rng import RandomStreams, STREAM_PLACEMENT
+from .profiler import TickProfiler
+from .stats_history import StatsHistory
+from .population import PopulationCounters
+from .terrain import TerrainMap
+from . import snapshot
+import numpy as np
 import config
+import contextlib
+import gc
 import math
+import random
 import time
 
+@contextlib.contextmanager
+def _gc_paused():
+    """Suspend the cyclic garbage collector (bulk allocations of agents)."""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
 class Environment:
     """
     The central container for the simulation state.
@@ -17,18 +46,56 @@ class Environment:
     Attributes:
         width (int): Simulation width in pixels.
         height (int): Simulation height in pixels.
-        agents (List[Agent]): List of active agents.
+        agents (AgentRegistry): Active agents, indexed by id.
+        dead_agents (Set[int]): Ids scheduled for removal at the end of the tick.
         spatial_grid (SpatialGrid): Optimization structure for neighbor lookups.
-        terrain (List[List[int]]): 2D grid representing terrain types.
+        store (Optional[AgentStore]): Columnar agent storage (columnar mode only).
+        metabolism_system (Optional[MetabolismSystem]): Vectorized Growth/
+            Photosynthesis/Heterotrophy pass (vectorized mode only).
+        parallel_system (Optional[ParallelTickSystem]): Two-phase tile-parallel
+            agent update (parallel mode only).
+        terrain_map (TerrainMap): uint8 terrain raster with per-habitat
+            passability masks.
+        terrain (List[List[int]]): Read-only nested-list view of the raster
+            (assign to replace the terrain).
+        terrain_version (int): Bumped whenever the terrain is replaced or edited.
         time (int): Cyclic time of day (0-DAY_DURATION_TICKS).
         total_ticks (int): Monotonic tick counter.
+        seed (int): Root seed of `rng`.
+        rng (RandomStreams): Seeded random streams; every random decision in
+            the simulation draws from it, so a seed reproduces a run.
+        profiler (TickProfiler): Per-phase/per-component tick timings (off by default).
+        history (StatsHistory): Population counts over time (also exposed as
+            the list-like `stats_history`). Kept in memory, plus an on-disk
+            log in `history_directory` if one is given; an existing log there
+            is reopened and the tick count continues after it.
+        population (PopulationCounters): Live agents per species, kept up
+            to date on insertion, removal and death.
+        agent_pool (Optional[AgentPool]): Removed agents recycled for new
+            ones (only if `agent_pool_size` > 0).
     """
-    def __init__(self, width: int = config.SIMULATION_WIDTH, height: int = config.SIMULATION_HEIGHT):
+    def __init__(self, width: int = config.SIMULATION_WIDTH, height: int = config.SIMULATION_HEIGHT,
+                 columnar: bool = config.USE_COLUMNAR_STORE,
+                 vectorized: bool = config.USE_VECTORIZED_SYSTEMS,
+                 parallel: bool = config.USE_PARALLEL_TICK,
+                 seed: Optional[int] = None,
+                 agent_pool_size: int = config.AGENT_POOL_SIZE,
+                 history_directory: Optional[str] = None):
         self.width = width
         self.height = height
-        self.agents: List[Agent] = []
+        # Unseeded environments derive their seed from the random module
+        self.seed = seed if seed is not None else random.getrandbits(64)
+        self.rng = RandomStreams(self.seed)
+        self._next_agent_id = 0
+        self.profiler = TickProfiler()
+        self.agents = AgentRegistry()
+        self.population = PopulationCounters()
+        self._aggregates_key = None
+        self._aggregates: Dict[str, Dict[str, float]] = {}
         self.new_agents: List[Agent] = []
-        self.dead_agents: List[str] = []
+        self.dead_agents: Set[int] = set()
+        # Removed agents recycled by AgentFactory.create (opt-in)
+        self.agent_pool = AgentPool(agent_pool_size) if agent_pool_size > 0 else None
         
         # Global environment state
         self.temperature = config.DEFAULT_TEMPERATURE
@@ -46,89 +113,177 @@ class Environment:
         self.equipment["lights"].update(self)
         
         # Spatial Grid
-        self.spatial_grid = SpatialGrid(self.width, self.height, cell_size=50)
+        self.spatial_grid = SpatialGrid(self.width, self.height, cell_size=config.SPATIAL_GRID_CELL_SIZE)
+        self.auto_tune_grid = config.SPATIAL_GRID_AUTO_TUNE
+        self._grid_tuned_population = 0
+
+        # Batched nearest-target lookups for TargetedMovement
+        self.target_index = TargetIndex(self) if config.USE_BATCHED_TARGETING else None
+
+        # Columnar agent storage (agents become views into NumPy columns)
+        # Vectorized system passes need the columnar store; the parallel tick needs both
+        vectorized = vectorized or parallel
+        self.store = AgentStore() if columnar or vectorized else None
+        self.metabolism_system = MetabolismSystem(self.store) if vectorized else None
+        self.parallel_system = ParallelTickSystem(self) if parallel else None
 
         # Terrain Grid (2D array: [y][x])
         self.grid_width = self.width // config.TERRAIN_GRID_SIZE
         self.grid_height = self.height // config.TERRAIN_GRID_SIZE
-        self.terrain = []
-        # Stats History
-        self.stats_history = []
+        self.terrain_map = TerrainMap(self.grid_width, self.grid_height)
+        # Stats History (memory only unless given a log directory)
+        self.history = StatsHistory(directory=history_directory)
+        if self.history.last_time is not None:
+            # Reopened log: continue its timeline so new records extend it
+            self.total_ticks = self.history.last_time + 1
         self._generate_default_terrain()
 
     def _populate_default_agents(self):
         """Spawns a default set of agents for testing/demo purposes."""
-        import random
-        from .factory import AgentFactory
-        
-        # Spawn 20 Ferns - Scattered
-        for _ in range(20):
-            x = random.randint(0, self.width)
-            y = random.randint(0, self.height)
-            agent = AgentFactory.create("Fern", x, y)
-            if agent:
-                self.agents.append(agent)
-                self.spatial_grid.add(agent)
-
-        # Spawn 5 Frogs - Scattered
-        for _ in range(5):
-            x = random.randint(0, self.width)
-            y = random.randint(0, self.height)
-            agent = AgentFactory.create("Frog", x, y)
-            if agent:
-                self.agents.append(agent)
-                self.spatial_grid.add(agent)
-
-        # Spawn 5 Fish - Left side (Water)
-        water_width = int(self.width * 0.4)
-        for _ in range(5):
-            x = random.randint(0, water_width - 10)
-            y = random.randint(0, self.height)
-            agent = AgentFactory.create("Fish", x, y)
-            if agent:
-                self.agents.append(agent)
-                self.spatial_grid.add(agent)
-
-        # Spawn 5 Lizards - Right side (Land)
-        for _ in range(5):
-            x = random.randint(water_width + 10, self.width)
-            y = random.randint(0, self.height)
-            agent = AgentFactory.create("Lizard", x, y)
-            if agent:
-                self.agents.append(agent)
-                self.spatial_grid.add(agent)
+        # Ferns and Frogs anywhere; Fish only in water, Lizards only on land
+        for species, count in (("Fern", 20), ("Frog", 5), ("Fish", 5), ("Lizard", 5)):
+            self.spawn_batch(species, count)
+
+    def spawn_batch(self, species: str, count: int,
+                    region: Optional[Tuple[float, float, float, float]] = None,
+                    stream: int = STREAM_PLACEMENT, deferred: bool = False) -> List[Agent]:
+        """
+        Create `count` agents of a species at random valid positions and
+        insert them in bulk.
+
+        Positions are uniform over the part of `region` where the species'
+        habitat is passable, drawn in one batch from a sequential stream.
+
+        Args:
+            species (str): Species name (see SPECIES_DB).
+            count (int): Number of agents.
+            region (Optional[Tuple[float, float, float, float]]):
+                (x_min, y_min, x_max, y_max) in pixels, clipped to the tank
+                (None = whole tank).
+            stream (int): Sequential random stream for the positions.
+            deferred (bool): Queue the agents like `add_agent` (inserted at the
+                start of the next update) instead of inserting them now,
+                which is only safe between ticks.
+
+        Returns:
+            List[Agent]: The new agents (empty for an unknown species or if
+            the region has no passable area).
+        """
+        if count <= 0 or species not in SPECIES_DB:
+            return []
+        x_min, y_min, x_max, y_max = region if region is not None else (0, 0, self.width, self.height)
+        region = (max(0, x_min), max(0, y_min), min(self.width, x_max), min(self.height, y_max))
+        habitat = SPECIES_DB[species]["params"].get("habitat")
+        draws = self.rng.draw_array(stream, count * 3).reshape(count, 3)
+        positions = self.terrain_map.sample_positions(habitat, draws, region)
+        if positions is None:
+            return []
+        agents = [AgentFactory.create(species, x, y, self.agent_pool) for x, y in positions.tolist()]
+        for agent in agents:
+            self._assign_id(agent)
+        if deferred:
+            self.new_agents.extend(agents)
+        else:
+            self._insert_agents(agents)
+        return agents
 
     def _generate_default_terrain(self):
         """Generates the default terrain (Water on left, Soil on right)."""
         # Default: Shoreline (Left 40% Water, Right 60% Soil)
         water_limit = int(self.grid_width * 0.4)
-        
-        for y in range(self.grid_height):
-            row = []
-            for x in range(self.grid_width):
-                if x < water_limit:
-                    row.append(config.TERRAIN_WATER)
-                else:
-                    row.append(config.TERRAIN_SOIL)
-            self.terrain.append(row)
+        cells = np.full((self.grid_height, self.grid_width), config.TERRAIN_SOIL, dtype=np.uint8)
+        cells[:, :water_limit] = config.TERRAIN_WATER
+        self.terrain_map.set(cells)
+
+    @property
+    def terrain(self) -> List[List[int]]:
+        return self.terrain_map.to_list()
+
+    @terrain.setter
+    def terrain(self, cells):
+        self.terrain_map.set(cells)
+
+    @property
+    def terrain_version(self) -> int:
+        return self.terrain_map.version
+
+    def _insert_agent(self, agent: Agent):
+        """Immediately register an agent in the agent list, grid and store."""
+        self.agents.append(agent)
+        self.population.insert(agent)
+        self.spatial_grid.add(agent)
+        if self.store is not None:
+            self.store.attach(agent)
+
+    def _insert_agents(self, agents: List[Agent]):
+        """`_insert_agent` for many agents, with one pass per structure."""
+        self.agents.extend(agents)
+        population = self.population
+        for agent in agents:
+            population.insert(agent)
+        self.spatial_grid.add_many(agents)
+        if self.store is not None:
+            self.store.attach_many(agents)
+
+    def _assign_id(self, agent: Agent):
+        """Give an agent the next sequential id of this environment."""
+        agent.id = self._next_agent_id
+        self._next_agent_id += 1
 
     def add_agent(self, agent: Agent):
         """
         Schedule an agent to be added to the simulation.
-        
+
+        The agent receives its sequential id here.
+
         Args:
             agent (Agent): The agent to add.
         """
+        self._assign_id(agent)
         self.new_agents.append(agent)
 
-    def remove_agent(self, agent_id: str):
+    def remove_agent(self, agent_id: int):
         """
         Schedule an agent to be removed from the simulation.
+
+        Removing the same agent twice in a tick is harmless.
         
         Args:
-            agent_id (str): The UUID of the agent to remove.
+            agent_id (int): The id of the agent to remove.
         """
-        self.dead_agents.append(agent_id)
+        self.dead_agents.add(agent_id)
+
+    def rebuild_spatial_grid(self):
+        """
+        Re-index every live agent.
+
+        The grid is kept in sync by Locomotion.move() and the add/remove
+        buffers; call this after repositioning agents by other means.
+        """
+        self.spatial_grid.rebuild(self.agents)
+
+    def tune_spatial_grid(self):
+        """
+        Re-pick the spatial grid cell size for the current population.
+
+        Weighs each species' sensing radii (see get_sensing_radii) by its
+        population and minimizes the expected query cost.
+        """
+        radii: Dict[float, float] = {}
+        for species, count in self._calculate_stats().items():
+            for radius in get_sensing_radii(species):
+                radii[radius] = radii.get(radius, 0) + count
+        cell_size = suggest_cell_size(radii, len(self.agents), self.width, self.height)
+        self.spatial_grid.resize(cell_size)
+        self._grid_tuned_population = len(self.agents)
+
+    def _maybe_tune_spatial_grid(self):
+        """Re-tune the grid when the population changed by SPATIAL_GRID_RETUNE_FACTOR."""
+        population = len(self.agents)
+        tuned = self._grid_tuned_population
+        factor = config.SPATIAL_GRID_RETUNE_FACTOR
+        if population and (tuned == 0 or population >= tuned * factor or population * factor <= tuned):
+            self.tune_spatial_grid()
 
     def get_nearby_agents(self, agent: Agent, radius: float) -> List[Agent]:
         """
@@ -153,6 +308,50 @@ class Environment:
                 nearby.append(other)
         return nearby
 
+    def local_density(self, x: float, y: float, species: str, radius: float = config.NEIGHBOR_RADIUS) -> int:
+        """
+        Upper bound on the agents of a species within `radius` of (x, y),
+        read from the spatial grid's density field in O(radius / cell size).
+
+        Args:
+            x (float): X coordinate.
+            y (float): Y coordinate.
+            species (str): Species name.
+            radius (float): Search radius.
+
+        Returns:
+            int: At least the number of such agents (never an undercount).
+        """
+        return self.spatial_grid.density_bound(x, y, radius, species)
+
+    def is_crowded(self, agent: Agent, radius: float = config.NEIGHBOR_RADIUS,
+                   limit: int = config.MAX_NEIGHBORS) -> bool:
+        """
+        Whether at least `limit` other live agents of the agent's species are
+        within `radius` (the same count as filtering `get_nearby_agents`).
+
+        The density field's upper bound answers "no" for most calls. Otherwise
+        the same-species agents of the cells that hold the species are counted
+        exactly, stopping at `limit`; cells without the species are skipped.
+        This is the same count the parallel tick computes.
+
+        Args:
+            agent (Agent): The center agent.
+            radius (float): Search radius.
+            limit (int): Neighbor count that counts as crowded.
+
+        Returns:
+            bool: True if crowded.
+        """
+        species = agent.state.get("species")
+        x, y = agent.x, agent.y
+        bound = self.spatial_grid.density_bound(x, y, radius, species)
+        if agent in self.spatial_grid:
+            bound -= 1  # The agent itself
+        if bound < limit:
+            return False
+        return self.spatial_grid.count_species_within(x, y, radius, species, limit, exclude=agent) >= limit
+
     def get_visible_agents(self, agent: Agent, radius: float) -> List[Agent]:
         """
         Get agents within the vision radius of the given agent.
@@ -166,6 +365,37 @@ class Environment:
         """
         return self.get_nearby_agents(agent, radius)
 
+    def find_target(self, agent: Agent, criteria: Union[Dict[str, Any], CompiledCriteria],
+                    radius: float) -> Tuple[Optional[Agent], float]:
+        """
+        Find the closest live agent matching TargetedMovement criteria.
+
+        Uses the batched TargetIndex when enabled, otherwise scans the
+        visible agents.
+
+        Args:
+            agent (Agent): The searching agent.
+            criteria (Union[Dict, CompiledCriteria]): Target criteria (see CompiledCriteria).
+            radius (float): Vision radius.
+
+        Returns:
+            Tuple[Optional[Agent], float]: The target (or None) and its distance.
+        """
+        if not isinstance(criteria, CompiledCriteria):
+            criteria = CompiledCriteria(criteria)
+        if self.target_index is not None:
+            return self.target_index.find(agent, criteria, radius)
+
+        target = None
+        min_dist = float('inf')
+        for other in self.get_visible_agents(agent, radius):
+            if criteria.matches(other):
+                dist = ((other.x - agent.x)**2 + (other.y - agent.y)**2)**0.5
+                if dist < min_dist:
+                    min_dist = dist
+                    target = other
+        return target, min_dist
+
     def get_terrain_at(self, x: float, y: float) -> int:
         """
         Get the terrain type at the given coordinates.
@@ -177,16 +407,22 @@ class Environment:
         Returns:
             int: The terrain type ID (see config.TERRAIN_*).
         """
-        grid_x = int(x // config.TERRAIN_GRID_SIZE)
-        grid_y = int(y // config.TERRAIN_GRID_SIZE)
-        
-        # Boundary checks
-        if grid_x < 0: grid_x = 0
-        if grid_x >= self.grid_width: grid_x = self.grid_width - 1
-        if grid_y < 0: grid_y = 0
-        if grid_y >= self.grid_height: grid_y = self.grid_height - 1
-        
-        return self.terrain[grid_y][grid_x]
+        return self.terrain_map.type_at(x, y)
+
+    def validate_positions(self, habitats, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """
+        Check N candidate positions against habitat constraints in one call.
+
+        Args:
+            habitats: One config.HABITAT_* name (or None) for all positions,
+                or an array of `terrain.habitat_code` codes, one per position.
+            xs (np.ndarray): X coordinates.
+            ys (np.ndarray): Y coordinates.
+
+        Returns:
+            np.ndarray: bool array, True where the position is valid.
+        """
+        return self.terrain_map.validate_positions(habitats, xs, ys)
 
     def update(self):
         """
@@ -195,12 +431,17 @@ class Environment:
         This method:
         1. Updates global variables (time, light).
         2. Updates equipment.
-        3. Rebuilds the spatial grid.
-        4. Calls update() on all agents.
-        5. Processes agent addition/removal buffers.
-        6. Records statistics.
+        3. Calls update() on all agents (movers keep the spatial grid in sync).
+        4. Processes agent addition/removal buffers.
+        5. Records statistics.
+
+        When `profiler.enabled`, each phase (equipment, agents, buffers,
+        grid, stats) and each component class is timed.
         """
         start_time = time.perf_counter()
+        profiler = self.profiler if self.profiler.enabled else None
+        if profiler:
+            profiler.begin_tick()
 
         # 1. Update global environment (Day/Night Cycle)
         self.time = (self.time + 1) % config.DAY_DURATION_TICKS
@@ -209,28 +450,46 @@ class Environment:
         # Update Equipment
         for system in self.equipment.values():
             system.update(self)
-
-        # Rebuild Spatial Grid
-        self.spatial_grid.clear()
-        for agent in self.agents:
-            if agent.alive:
-                self.spatial_grid.add(agent)
+        if profiler:
+            profiler.lap("equipment")
 
         # 2. Update all agents
-        for agent in self.agents:
-            if agent.alive:
-                agent.update(self)
+        if self.parallel_system is not None:
+            self.parallel_system.update_agents(self, profiler)
+        elif self.metabolism_system is not None:
+            self.metabolism_system.update_agents(self, profiler)
+        elif profiler:
+            self._update_agents_profiled(profiler)
+        else:
+            for agent in self.agents:
+                if agent.alive:
+                    agent.update(self)
+        if profiler:
+            profiler.lap("agents")
 
         # 3. Process buffers
         # Remove dead agents
         if self.dead_agents:
-            self.agents = [a for a in self.agents if a.id not in self.dead_agents]
-            self.dead_agents = []
+            for a in self.agents.remove_ids(self.dead_agents):
+                self.population.remove(a)
+                self.spatial_grid.remove(a)
+                if self.store is not None:
+                    self.store.detach(a)
+                if self.agent_pool is not None:
+                    self.agent_pool.release(a)
+            self.dead_agents = set()
         
         # Add new agents
         if self.new_agents:
-            self.agents.extend(self.new_agents)
+            self._insert_agents(self.new_agents)
             self.new_agents = []
+        if profiler:
+            profiler.lap("buffers")
+
+        if self.auto_tune_grid:
+            self._maybe_tune_spatial_grid()
+        if profiler:
+            profiler.lap("grid")
 
         # 4. Record Stats History (Every 10 ticks / 1 second)
         if self.time % 10 == 0:
@@ -238,36 +497,103 @@ class Environment:
             # Add timestamp (ticks) to stats
             # Use total_ticks for monotonic time to prevent graph looping
             current_stats["time"] = self.total_ticks
-            self.stats_history.append(current_stats)
-            # Limit history to avoid memory issues
-            if len(self.stats_history) > 10000:
-                self.stats_history.pop(0)
-        
+            self.history.append(current_stats)
+        if profiler:
+            profiler.lap("stats")
+            profiler.end_tick()
+
         # End profiling
         self.last_tick_duration = (time.perf_counter() - start_time) * 1000 # ms
 
-    def _calculate_stats(self):
-        """Calculates population counts per species."""
-        stats = {}
+    @property
+    def stats_history(self) -> StatsHistory:
+        """Recent full-resolution stats records (a bounded, list-like view of `history`)."""
+        return self.history
+
+    @stats_history.setter
+    def stats_history(self, records):
+        self.history.clear()
+        self.history.extend(records)
+
+    def _update_agents_profiled(self, profiler: TickProfiler):
+        """Object-path agent update, timing each component class."""
+        perf_counter = time.perf_counter
         for agent in self.agents:
             if agent.alive:
-                species = agent.state.get("species", "Unknown")
-                stats[species] = stats.get(species, 0) + 1
-        return stats
+                for component in agent.components:
+                    start = perf_counter()
+                    component.update(self)
+                    profiler.record("component." + component.__class__.__name__, perf_counter() - start)
+
+    def _calculate_stats(self):
+        """Population counts per species (live agents only), from the incremental counters."""
+        return self.population.snapshot()
+
+    def species_aggregates(self) -> Dict[str, Dict[str, float]]:
+        """
+        Per-species totals of live agents, computed at most once per tick.
+
+        Returns:
+            Dict[str, Dict[str, float]]: Species -> {"count", "energy",
+            "biomass"}, where biomass is the summed agent size.
+        """
+        key = (self.total_ticks, self.population.version)
+        if key == self._aggregates_key:
+            return self._aggregates
+
+        aggregates = {}
+        if self.store is not None:
+            store = self.store
+            rows = store.live_rows()
+            codes = store.species_id[rows]
+            n = len(store.species_names)
+            counts = np.bincount(codes, minlength=n)
+            energy = np.bincount(codes, weights=np.nan_to_num(store.energy[rows]), minlength=n)
+            biomass = np.bincount(codes, weights=np.nan_to_num(store.size[rows]), minlength=n)
+            for code in np.flatnonzero(counts).tolist():
+                aggregates[store.species_names[code]] = {
+                    "count": int(counts[code]), "energy": float(energy[code]), "biomass": float(biomass[code]),
+                }
+        else:
+            for agent in self.agents:
+                if agent.alive:
+                    state = agent.state
+                    species = state.get("species", "Unknown")
+                    totals = aggregates.get(species)
+                    if totals is None:
+                        totals = aggregates[species] = {"count": 0, "energy": 0.0, "biomass": 0.0}
+                    totals["count"] += 1
+                    totals["energy"] += state.get("energy", 0.0)
+                    totals["biomass"] += state.get("size", 0.0)
+
+        self._aggregates_key = key
+        self._aggregates = aggregates
+        return aggregates
+
+    def close(self):
+        """
+        Release background resources: the parallel tick's process pool and
+        the stats history log.
+
+        The environment stays usable: the pool is started again on demand
+        and later stats are kept in memory only.
+        """
+        if self.parallel_system is not None:
+            self.parallel_system.close()
+        self.history.close()
 
     def reset(self):
         """Clear all agents and reset state."""
-        self.agents = []
-        self.spatial_grid.clear()
-        self.dead_agents = []
+        self._clear_agents()
+        self.dead_agents = set()
         self.new_agents = []
         self.time = 0
         self.total_ticks = 0
-        self.stats_history = []
+        self.history.clear()
 
-    def to_dict(self):
-        """Serialize environment state."""
-        return {
+    def to_dict(self, include_agents: bool = True):
+        """Serialize environment state (without the agent list if `include_agents` is False)."""
+        data = {
             "width": self.width,
             "height": self.height,
             "globals": {
@@ -275,7 +601,9 @@ class Environment:
                 "humidity": self.humidity,
                 "time": self.time,
                 "total_ticks": self.total_ticks,
-                "light_level": self.light_level
+                "light_level": self.light_level,
+                "seed": self.seed,
+                "rng_counters": self.rng.counters()
             },
             "equipment": {
                 "lights": {
@@ -284,11 +612,13 @@ class Environment:
                 }
             },
             "terrain": self.terrain,
-            "agents": [agent.to_dict() for agent in self.agents]
         }
+        if include_agents:
+            data["agents"] = [agent.to_dict() for agent in self.agents]
+        return data
 
-    def from_dict(self, data):
-        """Deserialize environment state."""
+    def _load_header(self, data):
+        """Restore everything but the agents from a `to_dict()`-shaped dict."""
         self.width = data["width"]
         self.height = data["height"]
         
@@ -297,7 +627,12 @@ class Environment:
         self.humidity = data["globals"]["humidity"]
         self.time = data["globals"]["time"]
         self.total_ticks = data["globals"]["total_ticks"]
+        # Stats recorded after the loaded tick belong to a discarded future
+        self.history.rewind(self.total_ticks + 1)
         self.light_level = data["globals"]["light_level"]
+        if "seed" in data["globals"]:
+            self.seed = data["globals"]["seed"]
+            self.rng = RandomStreams(self.seed, data["globals"].get("rng_counters"))
         
         # Equipment
         if "equipment" in data:
@@ -306,11 +641,35 @@ class Environment:
             
         # Terrain
         self.terrain = data["terrain"]
-        
-        # Agents
-        self.agents = []
+        self.grid_height, self.grid_width = self.terrain_map.cells.shape
+
+    def _clear_agents(self):
+        # Reset and load: workers holding the old population are not reused
+        if self.parallel_system is not None:
+            self.parallel_system.close()
+        for agent in self.agents:
+            self.population.remove(agent)
+        self.population.clear()
+        self.agents.clear()
         self.spatial_grid.clear()
-        
+        if self.store is not None:
+            self.store.clear()
+
+    def _restore_agent(self, species: str, agent_id, x: float, y: float, state: Dict[str, Any]):
+        agent = AgentFactory.create(species, x, y)
+        if agent:
+            agent.id = agent_id
+            if isinstance(agent_id, int):
+                self._next_agent_id = max(self._next_agent_id, agent_id + 1)
+            # Restore state (overwriting factory defaults)
+            agent.state.update(state)
+            self._insert_agent(agent)
+
+    def from_dict(self, data):
+        """Deserialize environment state."""
+        self._load_header(data)
+        self._clear_agents()
+
         for agent_data in data["agents"]:
             # Reconstruct using Factory based on species in state
             species = agent_data["state"].get("species")
@@ -320,42 +679,114 @@ class Environment:
                 elif agent_data["type"] == "animal": species = "Frog"
             
             if species:
-                agent = AgentFactory.create(species, agent_data["position"]["x"], agent_data["position"]["y"])
-                if agent:
-                    agent.id = agent_data["id"]
-                    # Restore state (overwriting factory defaults)
-                    agent.state.update(agent_data["state"])
-                    self.agents.append(agent)
-                    self.spatial_grid.add(agent)
-
-    def save_to_file(self, filename: str):
-        """Save state to a JSON file."""
+                self._restore_agent(species, agent_data["id"], agent_data["position"]["x"],
+                                    agent_data["position"]["y"], agent_data["state"])
+
+    def load_snapshot(self, data: Dict[str, Any]):
+        """
+        Restore a binary snapshot loaded with `snapshot.read()`.
+
+        Agents are created from their species templates and inserted in one
+        batch; with a store, the column keys and parameter columns are then
+        written as whole columns instead of agent by agent.
+
+        Args:
+            data (Dict[str, Any]): {"meta", "arrays"} as returned by snapshot.read.
+        """
+        header = dict(data["meta"], terrain=data["arrays"]["terrain"])
+        self._load_header(header)
+        self._clear_agents()
+        columns = {}
+        if self.store is not None:
+            for key in COLUMN_KEYS:
+                column = snapshot.numeric_column(data, key)
+                if column is not None:
+                    columns[key] = column
+        states = snapshot.agent_states(data, skip=columns)
+        ids = snapshot.agent_ids(data)
+        xs, ys = data["arrays"]["x"].tolist(), data["arrays"]["y"].tolist()
+        # ~5 objects per agent: collector passes over the growing heap would
+        # dominate the load time
+        with _gc_paused():
+            by_species: Dict[str, List[int]] = {}
+            for index, state in enumerate(states):
+                by_species.setdefault(state.get("species"), []).append(index)
+            slots: List[Optional[Agent]] = [None] * len(states)
+            for species, indices in by_species.items():
+                if not species:
+                    continue
+                created = AgentFactory.create_many(species, [(xs[i], ys[i]) for i in indices],
+                                                   [states[i] for i in indices])
+                for index, agent in zip(indices, created):
+                    agent.id = ids[index]
+                    slots[index] = agent
+            kept = [index for index, agent in enumerate(slots) if agent is not None]
+            agents = [slots[index] for index in kept]
+            self._insert_agents(agents)
+        if not agents:
+            return
+        int_ids = [agent.id for agent in agents if isinstance(agent.id, int)]
+        if int_ids:
+            self._next_agent_id = max(self._next_agent_id, max(int_ids) + 1)
+        if self.store is not None:
+            rows = np.fromiter((agent._row for agent in agents), dtype=np.intp, count=len(agents))
+            kept = slice(None) if len(kept) == data["meta"]["agent_count"] else np.array(kept)
+            for key, column in columns.items():
+                self.store.columns[key][rows] = column[kept]
+            for name, column in snapshot.param_columns(data).items():
+                self.store.param_column(name)[rows] = column[kept]
+
+    def save_to_file(self, filename: str, save_format: str = config.SAVE_FORMAT):
+        """
+        Save state to `saves/<filename>`.
+
+        Args:
+            filename (str): Save name, without extension.
+            save_format (str): "snapshot" (binary, written on a background
+                thread, see simulation.snapshot) or "json".
+
+        Returns:
+            Optional[Future]: For snapshots, completes when the file is written.
+        """
         import json
         import os
         
         if not os.path.exists("saves"):
             os.makedirs("saves")
+
+        if save_format == "snapshot":
+            return snapshot.save(self, os.path.join("saves", filename + snapshot.EXTENSION))
             
         filepath = os.path.join("saves", f"{filename}.json")
         with open(filepath, "w") as f:
             json.dump(self.to_dict(), f)
             
     def load_from_file(self, filename: str):
-        """Load state from a JSON file."""
+        """Load `saves/<filename>`, from the most recently written of its snapshot and JSON files."""
         import json
         import os
         
-        filepath = os.path.join("saves", f"{filename}.json")
-        if os.path.exists(filepath):
+        snapshot_path = os.path.join("saves", filename + snapshot.EXTENSION)
+        snapshot.wait_for_writes(snapshot_path)
+        candidates = [p for p in (snapshot_path, os.path.join("saves", f"{filename}.json")) if os.path.exists(p)]
+        if not candidates:
+            print(f"Save file {filename} not found.")
+            return
+        filepath = max(candidates, key=os.path.getmtime)
+        if filepath == snapshot_path:
+            self.load_snapshot(snapshot.read(filepath))
+        else:
             with open(filepath, "r") as f:
                 data = json.load(f)
                 self.from_dict(data)
-        else:
-            print(f"Save file {filename} not found.")
 
-    def get_state(self):
+    def get_state(self, include_agents: bool = True):
         """
         Get the current state dict for frontend broadcasting.
+
+        Args:
+            include_agents (bool): Whether to build the agent list (encoders
+                reading the AgentStore directly only need the environment).
         
         Returns:
             Dict: A dictionary containing environment globals, terrain, stats, and agent list.
@@ -364,7 +795,7 @@ class Environment:
         stats = self._calculate_stats()
         stats["time"] = self.total_ticks # Use total_ticks for frontend graph
 
-        return {
+        state = {
             "environment": {
                 "temperature": self.temperature,
                 "humidity": self.humidity,
@@ -374,8 +805,14 @@ class Environment:
                 "total_ticks": self.total_ticks, # Add monotonic time
                 "last_tick_duration": self.last_tick_duration,
                 "terrain": self.terrain,
+                "terrain_version": self.terrain_version,
                 "grid_size": config.TERRAIN_GRID_SIZE,
-                "stats": stats
+                "stats": stats,
+                "aggregates": self.species_aggregates(),
             },
-            "agents": [agent.to_dict() for agent in self.agents]
         }
+        if include_agents:
+            state["agents"] = [agent.to_dict() for agent in self.agents]
+        if self.profiler.enabled:
+            state["environment"]["profile"] = self.profiler.summary()
+        return state
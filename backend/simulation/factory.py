@@ -1,30 +1,259 @@
-from typing import Optional
-from .agents import Agent
+from typing import Optional, Dict, Any, Iterable, List, Tuple
+from .agents import Agent, _provisional_ids
+from .components import Component, component_mask
 from .species_config import SPECIES_DB
 from logger import setup_logger
+import config
 
 logger = setup_logger("Factory")
 
+
+def _component_fields(component: Component) -> List[Tuple[str, Any]]:
+    """(name, value) of every attribute of a component except `agent`."""
+    names = []
+    for cls in type(component).__mro__:
+        slots = cls.__dict__.get("__slots__", ())
+        names.extend((slots,) if isinstance(slots, str) else slots)
+    fields = [(name, getattr(component, name)) for name in names
+              if name not in ("agent", "__dict__", "__weakref__") and hasattr(component, name)]
+    fields.extend(getattr(component, "__dict__", {}).items())
+    return fields
+
+
+class SpeciesTemplate:
+    """
+    A species definition compiled into a prototype agent.
+
+    The prototype is built once through the component constructors; new
+    agents copy its state dict and component attributes instead of running
+    the constructors again, and share its component type index.
+
+    Attributes:
+        name (str): Species name.
+        state (Dict[str, Any]): Initial state of every agent of the species.
+        components (List[Component]): Prototype components, in update order.
+        tags (int): Capability bitmask of the component list.
+    """
+    def __init__(self, name: str, definition: Dict[str, Any]):
+        self.name = name
+        prototype = Agent(0, 0, name)
+        prototype.state.update(definition["params"])
+        for component_cls, kwargs in definition["components"]:
+            prototype.add_component(component_cls(prototype, **kwargs))
+        self.state = prototype.state
+        self.components = prototype.components
+        self.tags = prototype.tags
+        self._component_index = prototype._component_index
+        # Attribute values copied into every new component
+        self._component_fields = [(type(c), _component_fields(c)) for c in self.components]
+
+    def _reset_components(self, agent: Agent):
+        for component, (_, fields) in zip(agent.components, self._component_fields):
+            for name, value in fields:
+                setattr(component, name, value)
+
+    def instantiate(self, x: float, y: float, pool: Optional['AgentPool'] = None) -> Agent:
+        """
+        A new agent of this species at (x, y): a recycled one from `pool`
+        if it holds one, otherwise a copy of the prototype.
+        """
+        agent = pool.acquire(self.name) if pool is not None else None
+        if agent is not None:
+            agent.id = next(_provisional_ids)
+            agent._x = x
+            agent._y = y
+            agent._alive = True
+            agent.state = self.state.copy()
+            self._reset_components(agent)
+            return agent
+
+        agent = Agent.__new__(Agent)
+        agent.id = next(_provisional_ids)
+        agent._store = None
+        agent._row = -1
+        agent._population = None
+        agent._counted = False
+        agent._x = x
+        agent._y = y
+        agent._alive = True
+        agent.tags = self.tags
+        agent._component_index = self._component_index
+        agent.state = self.state.copy()
+        components = []
+        for component_cls, fields in self._component_fields:
+            component = object.__new__(component_cls)
+            component.agent = agent
+            for name, value in fields:
+                setattr(component, name, value)
+            components.append(component)
+        agent.components = components
+        return agent
+
+    def instantiate_many(self, positions: Iterable[Tuple[float, float]],
+                         states: Optional[Iterable[Dict[str, Any]]] = None) -> List[Agent]:
+        """
+        New agents of this species, one per (x, y), copied from the prototype
+        in one loop (no agents are recycled). `states`, if given, are used as
+        the agents' state dicts instead of copies of the prototype state.
+        """
+        new_agent, new_component = Agent.__new__, object.__new__
+        state, tags, component_index = self.state, self.tags, self._component_index
+        component_fields = self._component_fields
+        agents = []
+        states = iter(states) if states is not None else None
+        for x, y in positions:
+            agent = new_agent(Agent)
+            agent.id = next(_provisional_ids)
+            agent._store = None
+            agent._row = -1
+            agent._population = None
+            agent._counted = False
+            agent._x = x
+            agent._y = y
+            agent._alive = True
+            agent.tags = tags
+            agent._component_index = component_index
+            agent.state = state.copy() if states is None else next(states)
+            components = []
+            for component_cls, fields in component_fields:
+                component = new_component(component_cls)
+                component.agent = agent
+                for name, value in fields:
+                    setattr(component, name, value)
+                components.append(component)
+            agent.components = components
+            agents.append(agent)
+        return agents
+
+
+
+class AgentPool:
+    """
+    Removed agents of one environment, kept per species for reuse by
+    `AgentFactory.create`.
+
+    Recycling is opt-in (see config.AGENT_POOL_SIZE): a pooled agent object
+    is handed out again as a different agent, so it must only be enabled
+    when nothing outside the environment keeps references to removed agents.
+
+    Attributes:
+        size (int): Maximum agents kept per species.
+    """
+    def __init__(self, size: int = config.AGENT_POOL_SIZE):
+        self.size = size
+        self._free: Dict[str, List[Agent]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(agents) for agents in self._free.values())
+
+    def release(self, agent: Agent) -> bool:
+        """
+        Keep a removed agent for reuse.
+
+        Only agents that left their environment (no store row, not counted)
+        and still have their species' component layout are pooled.
+
+        Args:
+            agent (Agent): The removed agent. The caller must not use it
+                afterwards.
+
+        Returns:
+            bool: True if the agent was pooled.
+        """
+        species = agent.state.get("species")
+        template = AgentFactory.templates.get(species)
+        free = self._free.setdefault(species, [])
+        if (template is None or len(free) >= self.size or agent._store is not None
+                or agent._population is not None or len(agent.components) != len(template.components)):
+            return False
+        free.append(agent)
+        return True
+
+    def acquire(self, species: str) -> Optional[Agent]:
+        """Take a pooled agent of `species` (None if there is none)."""
+        free = self._free.get(species)
+        return free.pop() if free else None
+
+    def clear(self):
+        """Drop every pooled agent."""
+        self._free.clear()
+
+
+def _validate(name: str, definition: Any):
+    if not isinstance(definition, dict) or not isinstance(definition.get("params"), dict):
+        raise ValueError(f"Species {name!r}: definition needs a 'params' dict")
+    components = definition.get("components")
+    if not isinstance(components, (list, tuple)):
+        raise ValueError(f"Species {name!r}: definition needs a 'components' list")
+    for entry in components:
+        if (not isinstance(entry, (list, tuple)) or len(entry) != 2 or not isinstance(entry[0], type)
+                or not issubclass(entry[0], Component) or not isinstance(entry[1], dict)):
+            raise ValueError(f"Species {name!r}: invalid component entry {entry!r}")
+
+
+def compile_species(species_db: Dict[str, Dict[str, Any]]) -> Dict[str, SpeciesTemplate]:
+    """
+    Validate species definitions and compile them into templates.
+
+    Args:
+        species_db (Dict[str, Dict[str, Any]]): Species name -> definition
+            (see species_config.SPECIES_DB).
+
+    Returns:
+        Dict[str, SpeciesTemplate]: Species name -> template.
+
+    Raises:
+        ValueError: If a definition is malformed or its components reject
+            their parameters.
+    """
+    templates = {}
+    for name, definition in species_db.items():
+        _validate(name, definition)
+        try:
+            templates[name] = SpeciesTemplate(name, definition)
+        except (TypeError, KeyError, ValueError) as e:
+            raise ValueError(f"Species {name!r}: {e}") from e
+    return templates
+
+
 class AgentFactory:
+    # Species name -> compiled template (see compile_species)
+    templates: Dict[str, SpeciesTemplate] = compile_species(SPECIES_DB)
+
+    @staticmethod
+    def reload():
+        """Recompile the templates after SPECIES_DB changed."""
+        AgentFactory.templates = compile_species(SPECIES_DB)
+
+    @staticmethod
+    def species_tags(species_name: str) -> int:
+        """Capability bitmask for a species, computed once from its component list."""
+        template = AgentFactory.templates.get(species_name)
+        if template is not None:
+            return template.tags
+        return component_mask(cls.__name__ for cls, _ in SPECIES_DB[species_name]["components"])
+
     @staticmethod
-    def create(species_name: str, x: float, y: float) -> Optional[Agent]:
+    def create(species_name: str, x: float, y: float, pool: Optional[AgentPool] = None) -> Optional[Agent]:
         """
-        Creates an agent of the given species at (x, y).
+        Creates an agent of the given species at (x, y), recycling one from
+        `pool` (an environment's `agent_pool`) when given and non-empty.
         """
-        if species_name not in SPECIES_DB:
+        template = AgentFactory.templates.get(species_name)
+        if template is None:
             logger.warning(f"Unknown species: {species_name}")
             return None
-            
-        config = SPECIES_DB[species_name]
-        
-        # Create base agent
-        agent = Agent(x, y, species_name)
-        
-        # Initialize state from params
-        agent.state.update(config["params"])
-        
-        # Add components
-        for component_cls, kwargs in config["components"]:
-            agent.add_component(component_cls(agent, **kwargs))
-            
-        return agent
+        return template.instantiate(x, y, pool)
+
+    @staticmethod
+    def create_many(species_name: str, positions: Iterable[Tuple[float, float]],
+                    states: Optional[Iterable[Dict[str, Any]]] = None) -> List[Agent]:
+        """
+        Creates one agent of the given species per (x, y) position (none if
+        the species is unknown), optionally with the given state dicts.
+        """
+        template = AgentFactory.templates.get(species_name)
+        if template is None:
+            logger.warning(f"Unknown species: {species_name}")
+            return []
+        return template.instantiate_many(positions, states)
@@ -0,0 +1,152 @@
+"""
+Headless batch runner.
+
+Drives `Environment.update()` back to back with no throttling, no WebSocket
+and no `SimulationRunner`. Usable as a library (`run_headless`) or from the
+command line:
+
+    python -m simulation.headless --ticks 5000 --seed 42 --population Fern=200,Frog=20
+"""
+import argparse
+import json
+import sys
+import time
+from typing import Dict, Any, Optional, List
+
+from .environment import Environment
+from .species_config import SPECIES_DB
+
+DEFAULT_POPULATION = {"Fern": 20, "Frog": 5, "Fish": 5, "Lizard": 5}
+
+
+def parse_population(spec: str) -> Dict[str, int]:
+    """
+    Parse a population spec such as "Fern=200,Frog=20".
+
+    Args:
+        spec (str): Comma separated `Species=count` pairs.
+
+    Returns:
+        Dict[str, int]: Species name to initial count.
+
+    Raises:
+        ValueError: If the spec is malformed or names an unknown species.
+    """
+    population = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, sep, count = item.partition("=")
+        name = name.strip()
+        if not sep or name not in SPECIES_DB:
+            raise ValueError(f"Invalid population entry: {item!r}")
+        population[name] = int(count)
+    return population
+
+
+def populate(environment: Environment, population: Dict[str, int]):
+    """
+    Spawn the initial population at random habitat-compatible positions,
+    drawn from the environment's placement stream (see `Environment.spawn_batch`).
+    The agents are queued and join the simulation on the next update.
+
+    Args:
+        environment (Environment): The environment to populate.
+        population (Dict[str, int]): Species name to count.
+    """
+    for species, count in population.items():
+        environment.spawn_batch(species, count, deferred=True)
+
+
+def run_headless(
+    ticks: int,
+    seed: Optional[int] = None,
+    population: Optional[Dict[str, int]] = None,
+    environment: Optional[Environment] = None,
+) -> Dict[str, Any]:
+    """
+    Run the simulation for a fixed number of ticks as fast as possible.
+
+    Args:
+        ticks (int): Number of ticks to run.
+        seed (Optional[int]): Seed of the environment created here (None = unseeded).
+        population (Optional[Dict[str, int]]): Initial population. Ignored when
+            an already populated environment is passed in.
+        environment (Optional[Environment]): Environment to drive. A fresh
+            one is created if omitted.
+
+    Returns:
+        Dict[str, Any]: Run report (ticks, the environment's seed, elapsed
+        seconds, ticks/sec, final stats).
+    """
+    env = environment if environment is not None else Environment(seed=seed)
+    try:
+        if not env.agents and not env.new_agents:
+            populate(env, population if population is not None else DEFAULT_POPULATION)
+
+        start = time.perf_counter()
+        for _ in range(ticks):
+            env.update()
+        elapsed = time.perf_counter() - start
+
+        return {
+            "ticks": ticks,
+            "seed": env.seed,
+            "elapsed": elapsed,
+            "ticks_per_second": ticks / elapsed if elapsed > 0 else 0.0,
+            "agent_count": len(env.agents),
+            "stats": env._calculate_stats(),
+        }
+    finally:
+        if environment is None:
+            env.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command line entry point.
+
+    Args:
+        argv (Optional[List[str]]): Arguments (defaults to sys.argv[1:]).
+
+    Returns:
+        int: Process exit code.
+    """
+    parser = argparse.ArgumentParser(description="Run the paludarium simulation headless at max speed.")
+    parser.add_argument("--ticks", type=int, default=1000, help="Number of ticks to run")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed")
+    parser.add_argument(
+        "--population",
+        type=parse_population,
+        default=None,
+        help="Initial population, e.g. Fern=200,Frog=20 (default: demo tank)",
+    )
+    parser.add_argument("--columnar", action="store_true", help="Use the columnar AgentStore")
+    parser.add_argument("--vectorized", action="store_true", help="Use vectorized system passes (implies --columnar)")
+    parser.add_argument("--parallel", action="store_true",
+                        help="Use the two-phase tile-parallel tick (implies --vectorized)")
+    parser.add_argument("--workers", type=int, default=None, help="Parallel tick process count (default: one per CPU)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    env = Environment(columnar=args.columnar, vectorized=args.vectorized, parallel=args.parallel, seed=args.seed)
+    if env.parallel_system is not None and args.workers is not None:
+        env.parallel_system.workers = args.workers
+    try:
+        report = run_headless(args.ticks, seed=args.seed, population=args.population, environment=env)
+    finally:
+        env.close()
+
+    if args.json:
+        print(json.dumps(report))
+    else:
+        print(f"Ran {report['ticks']} ticks in {report['elapsed']:.3f}s ({report['ticks_per_second']:.1f} ticks/s)")
+        print(f"Final agent count: {report['agent_count']}")
+        for species, count in sorted(report["stats"].items()):
+            print(f"  {species}: {count}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+import json
+import struct
+from typing import Dict, Any, Iterator, List
+import numpy as np
+
+# Export formats of the /api/history endpoint
+FORMAT_JSON = "json"          # List of {"time": ..., species: ...} records
+FORMAT_CSV = "csv"            # Header row plus one row per sample, streamed in chunks
+FORMAT_COLUMNAR = "columnar"  # Packed arrays, see encode_columnar
+FORMATS = (FORMAT_JSON, FORMAT_CSV, FORMAT_COLUMNAR)
+
+MAGIC = b"PSHS"
+VERSION = 1
+
+# magic, version, reserved, row count, metadata length
+_HEADER = struct.Struct("<4sBxxxII")
+
+CSV_CHUNK_ROWS = 1000
+
+
+def _format(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else f"{value:.6g}"
+
+
+def to_records(result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Rows of a `StatsHistory.query()` result, in the shape of `stats_history` records.
+
+    Args:
+        result (Dict[str, Any]): A query result.
+
+    Returns:
+        List[Dict[str, Any]]: One {"time": ..., column: value} dict per sample.
+    """
+    names = list(result["columns"])
+    columns = [result["columns"][name].tolist() for name in names]
+    records = []
+    for i, time in enumerate(result["time"].tolist()):
+        record = {"time": time}
+        for name, values in zip(names, columns):
+            value = values[i]
+            record[name] = int(value) if value.is_integer() else value
+        records.append(record)
+    return records
+
+
+def csv_chunks(result: Dict[str, Any], rows_per_chunk: int = CSV_CHUNK_ROWS) -> Iterator[str]:
+    """
+    Encode a query result as CSV, `rows_per_chunk` rows per yielded string.
+
+    Args:
+        result (Dict[str, Any]): A `StatsHistory.query()` result.
+        rows_per_chunk (int): Rows per chunk.
+
+    Yields:
+        str: The header line first, then blocks of rows.
+    """
+    names = list(result["columns"])
+    yield ",".join(["time"] + names) + "\n"
+    times = result["time"]
+    for start in range(0, times.size, rows_per_chunk):
+        stop = start + rows_per_chunk
+        columns = [times[start:stop].tolist()] + [result["columns"][n][start:stop].tolist() for n in names]
+        yield "".join(
+            ",".join([str(row[0])] + [_format(v) for v in row[1:]]) + "\n" for row in zip(*columns)
+        )
+
+
+def encode_columnar(result: Dict[str, Any]) -> bytes:
+    """
+    Pack a query result into one binary blob.
+
+    Layout (little-endian): magic "PSHS", u8 version, 3 reserved bytes,
+    u32 row count N, u32 metadata length M; M bytes of UTF-8 JSON
+    {"columns": [...], "source": ...} zero-padded to a 4-byte boundary
+    (then to 8 bytes before the times); i64 time[N]; f32 values[N] per
+    column, in metadata order.
+
+    Args:
+        result (Dict[str, Any]): A `StatsHistory.query()` result.
+
+    Returns:
+        bytes: The encoded blob.
+    """
+    names = list(result["columns"])
+    count = int(result["time"].size)
+    metadata = json.dumps({"columns": names, "source": result.get("source")}).encode("utf-8")
+    # Align the i64 times to 8 bytes (the header is 16 bytes)
+    metadata += b"\0" * (-len(metadata) % 8)
+    parts = [_HEADER.pack(MAGIC, VERSION, count, len(metadata)), metadata,
+             result["time"].astype("<i8").tobytes()]
+    parts.extend(result["columns"][name].astype("<f4").tobytes() for name in names)
+    return b"".join(parts)
+
+
+def decode_columnar(data: bytes) -> Dict[str, Any]:
+    """
+    Reverse of `encode_columnar`.
+
+    Returns:
+        Dict[str, Any]: {"source", "time", "columns"} like a query result.
+    """
+    magic, version, count, meta_len = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a version %d stats history blob" % VERSION)
+    offset = _HEADER.size
+    metadata = json.loads(data[offset:offset + meta_len].rstrip(b"\0"))
+    offset += meta_len
+    times = np.frombuffer(data, dtype="<i8", count=count, offset=offset)
+    offset += times.nbytes
+    columns = {}
+    for name in metadata["columns"]:
+        columns[name] = np.frombuffer(data, dtype="<f4", count=count, offset=offset)
+        offset += columns[name].nbytes
+    return {"source": metadata["source"], "time": times, "columns": columns}
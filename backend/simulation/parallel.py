@@ -0,0 +1,494 @@
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+from .components import (
+    StaticMovement, RandomMovement, TargetedMovement,
+    AsexualReproduction, SexualReproduction
+)
+from .systems import VECTORIZED_COMPONENTS
+from .rng import entity_key, STREAM_MOVEMENT, STREAM_REPRODUCTION
+from .terrain import habitat_code
+import config
+
+# Locomotion kinds handled by the kernels (-1 = agent runs per object)
+KIND_OBJECT = -1
+KIND_STATIC = 0
+KIND_RANDOM = 1
+KIND_TARGETED = 2
+
+
+# Component types the parallel kernels reproduce (exact types only)
+PARALLEL_COMPONENTS: Tuple[type, ...] = VECTORIZED_COMPONENTS + (
+    StaticMovement, RandomMovement, TargetedMovement, AsexualReproduction, SexualReproduction)
+
+# Same thresholds as TargetedMovement / AsexualReproduction / SexualReproduction
+HUNGER_THRESHOLD = 20.0
+EAT_DISTANCE = 5.0
+ASEXUAL_CHANCE = 0.01
+SEXUAL_CHANCE = 0.005
+
+try:  # Optional: KD-tree neighborhood queries when SciPy is installed
+    from scipy.spatial import cKDTree
+except ImportError:  # pragma: no cover - exercised when SciPy is absent
+    cKDTree = None
+
+# Queriers per distance block in the brute-force kernels
+_QUERY_CHUNK = 256
+# Neighbors fetched per nearest-target query (the querier itself plus ties)
+_TREE_K = 3
+
+
+def _nearest(points: np.ndarray, radii: np.ndarray, masks: np.ndarray, own: np.ndarray,
+             cand_xy: np.ndarray, cand_tags: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Nearest matching candidate within radius (ties -> lowest candidate index)."""
+    if cKDTree is None:
+        return _nearest_brute_force(points, radii, masks, own, cand_xy, cand_tags)
+    nearest = np.full(len(points), -1)
+    dist = np.full(len(points), np.inf)
+    for mask in np.unique(masks).tolist():
+        queriers = np.flatnonzero(masks == mask)
+        matching = np.flatnonzero((cand_tags & mask) == mask)
+        if matching.size == 0:
+            continue
+        tree = cKDTree(cand_xy[matching])
+        k = min(_TREE_K, matching.size)
+        # The bound is exclusive: pad it, the exact radius test follows
+        bound = float(radii[queriers].max()) * (1 + 1e-9) + 1e-9
+        _, idx = tree.query(points[queriers], k=k, distance_upper_bound=bound)
+        idx = idx.reshape(len(queriers), k)
+        found = idx < matching.size
+        cand = np.where(found, matching[np.minimum(idx, matching.size - 1)], -1)
+        delta = points[queriers, None, :] - cand_xy[np.maximum(cand, 0)]
+        d2 = np.einsum("ijk,ijk->ij", delta, delta)
+        d2[~found | (cand == own[queriers, None])] = np.inf
+        order = np.lexsort((np.where(np.isinf(d2), len(cand_xy), cand), d2))
+        rows = np.arange(len(queriers))
+        best = cand[rows, order[:, 0]]
+        best_d2 = d2[rows, order[:, 0]]
+        # All k neighbors as close as the best: more ties may lie beyond them
+        overflow = found[:, -1] & (d2[:, -1] == best_d2) & np.isfinite(best_d2)
+        for i in np.flatnonzero(overflow).tolist():
+            ball = matching[tree.query_ball_point(points[queriers[i]], np.sqrt(best_d2[i]) * (1 + 1e-9))]
+            ball = ball[ball != own[queriers[i]]]
+            ball_delta = points[queriers[i]] - cand_xy[ball]
+            ball_d2 = np.einsum("jk,jk->j", ball_delta, ball_delta)
+            best[i] = ball[ball_d2 == ball_d2.min()].min()
+            best_d2[i] = ball_d2.min()
+        ok = best_d2 <= radii[queriers] ** 2
+        nearest[queriers] = np.where(ok, best, -1)
+        dist[queriers] = np.where(ok, np.sqrt(best_d2), np.inf)
+    return nearest, dist
+
+
+def _nearest_brute_force(points, radii, masks, own, cand_xy, cand_tags):
+    nearest = np.full(len(points), -1)
+    dist = np.full(len(points), np.inf)
+    for start in range(0, len(points), _QUERY_CHUNK):
+        stop = start + _QUERY_CHUNK
+        delta = points[start:stop, None, :] - cand_xy[None, :, :]
+        d2 = np.einsum("ijk,ijk->ij", delta, delta)
+        mask = masks[start:stop, None]
+        d2[(cand_tags[None, :] & mask) != mask] = np.inf
+        rows = np.arange(d2.shape[0])
+        block_own = own[start:stop]
+        d2[rows[block_own >= 0], block_own[block_own >= 0]] = np.inf
+        best = d2.argmin(axis=1)
+        best_d2 = d2[rows, best]
+        ok = best_d2 <= radii[start:stop] ** 2
+        nearest[start:stop] = np.where(ok, best, -1)
+        dist[start:stop] = np.where(ok, np.sqrt(best_d2), np.inf)
+    return nearest, dist
+
+
+def _crowding(points: np.ndarray, species: np.ndarray, own: np.ndarray,
+              cand_xy: np.ndarray, cand_species: np.ndarray, radius: float) -> np.ndarray:
+    """Same-species candidates within radius of each point (excluding itself)."""
+    if cKDTree is None:
+        return _crowding_brute_force(points, species, own, cand_xy, cand_species, radius)
+    counts = np.zeros(len(points), dtype=np.int64)
+    for species_id in np.unique(species).tolist():
+        queriers = np.flatnonzero(species == species_id)
+        tree = cKDTree(cand_xy[cand_species == species_id])
+        counts[queriers] = tree.query_ball_point(points[queriers], radius, return_length=True)
+    # A querier inside the snapshot counts itself
+    return counts - (own >= 0)
+
+
+def _crowding_brute_force(points, species, own, cand_xy, cand_species, radius):
+    counts = np.zeros(len(points), dtype=np.int64)
+    for start in range(0, len(points), _QUERY_CHUNK):
+        stop = start + _QUERY_CHUNK
+        delta = points[start:stop, None, :] - cand_xy[None, :, :]
+        d2 = np.einsum("ijk,ijk->ij", delta, delta)
+        near = (d2 <= radius * radius) & (cand_species[None, :] == species[start:stop, None])
+        rows = np.arange(near.shape[0])
+        block_own = own[start:stop]
+        near[rows[block_own >= 0], block_own[block_own >= 0]] = False
+        counts[start:stop] = near.sum(axis=1)
+    return counts
+
+
+def decide_tile(task: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Decide phase for one tile: pure NumPy over a read-only snapshot.
+
+    Runs in the process pool. Indices refer to the tile's candidate arrays
+    (the live agents inside the tile plus its halo, in store row order), so
+    the answers do not depend on how the world was tiled.
+
+    Args:
+        task (Dict[str, Any]): Candidate arrays ("xy", "tags", "species"),
+            hunter arrays ("hunter_xy", "hunter_radius", "hunter_mask",
+            "hunter_own") and breeder arrays ("breeder_xy", "breeder_species",
+            "breeder_own"); "*_own" is the querier's own candidate index.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: Each hunter's target
+        candidate index (-1 = none) and distance, and each breeder's count
+        of same-species neighbors within config.NEIGHBOR_RADIUS.
+    """
+    targets, dists = _nearest(task["hunter_xy"], task["hunter_radius"], task["hunter_mask"],
+                              task["hunter_own"], task["xy"], task["tags"])
+    crowding = _crowding(task["breeder_xy"], task["breeder_species"], task["breeder_own"],
+                         task["xy"], task["species"], config.NEIGHBOR_RADIUS)
+    return targets, dists, crowding
+
+
+class ParallelTickSystem:
+    """
+    Two-phase agent update over spatial tiles, decided on a process pool.
+
+    1. Decide: the world is cut into square tiles (`tile_size` pixels,
+       aligned with the SpatialGrid origin). For every tile, the kernel gets
+       the tile's queriers plus a read-only snapshot of the live agents in the
+       tile and a halo as wide as the largest sensing radius, and answers the
+       expensive neighborhood questions: each hungry TargetedMovement agent's
+       nearest matching target and each AsexualReproduction candidate's
+       crowding count. Tiles run on the pool (inline for small batches).
+    2. Apply: in the main process, in a fixed order, the intents are applied:
+       eats (a contested target goes to the closest eater, ties to the lowest
+       store row; losers hold still), moves (boundary and habitat checks,
+       incremental grid updates, so cross-tile moves need no special case),
+       reproduction, then the vectorized metabolism pass.
+
+    All decisions read the tick-start snapshot (a synchronous update), so
+    a seeded run is NOT bit-identical to the serial per-agent or vectorized
+    modes with the same seed: there, an agent already sees the moves, meals
+    and deaths of the agents updated before it in the same tick. What is
+    guaranteed is that, for a given seed, results are identical whatever the
+    number of workers, the tile size, and whether tiles are decided inline or
+    on the pool. Random draws are made in batch in the main process from the
+    environment's counter-based streams, with the same (stream, agent, tick,
+    slot) keys as the per-object components. Neighborhood queries use SciPy
+    KD-trees when available and brute-force distance blocks otherwise, with
+    the same answers (ties go to the lowest candidate index).
+
+    Agents with components outside PARALLEL_COMPONENTS, or with state-based
+    target criteria, keep their per-object updates.
+
+    Attributes:
+        store (AgentStore): The columnar store holding the agents.
+        workers (int): Pool size (<= 1 decides inline).
+        tile_size (float): Tile side in pixels.
+    """
+    def __init__(self, environment: 'Environment', workers: int = config.PARALLEL_WORKERS,
+                 tile_size: float = config.PARALLEL_TILE_SIZE):
+        self.store = environment.store
+        self.metabolism_system = environment.metabolism_system
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.tile_size = tile_size
+        self.inline_threshold = config.PARALLEL_INLINE_THRESHOLD
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # Row -> owning agent (and its id: pooled agents are reused) and its kernel profile
+        self._owners: List[Any] = []
+        self._owner_ids: List[Any] = []
+        self._kind = np.zeros(0, dtype=np.int8)
+        self._speed = np.zeros(0)
+        self._vision = np.zeros(0)
+        self._mask = np.zeros(0, dtype=np.int64)
+        self._entity = np.zeros(0, dtype=np.uint64)
+        self._habitat = np.zeros(0, dtype=np.int8)
+        self._asexual = np.zeros((0, 2))
+        self._sexual = np.zeros((0, 2))
+
+    def close(self):
+        """Shut the process pool down."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    # --- Profiles ---
+
+    def _ensure_capacity(self):
+        capacity = self.store.capacity
+        if len(self._owners) >= capacity:
+            return
+        extra = capacity - len(self._owners)
+        self._owners.extend([None] * extra)
+        self._owner_ids.extend([None] * extra)
+        self._kind = np.concatenate([self._kind, np.full(extra, KIND_OBJECT, dtype=np.int8)])
+        self._speed = np.concatenate([self._speed, np.zeros(extra)])
+        self._vision = np.concatenate([self._vision, np.zeros(extra)])
+        self._mask = np.concatenate([self._mask, np.zeros(extra, dtype=np.int64)])
+        self._entity = np.concatenate([self._entity, np.zeros(extra, dtype=np.uint64)])
+        self._habitat = np.concatenate([self._habitat, np.zeros(extra, dtype=np.int8)])
+        self._asexual = np.concatenate([self._asexual, np.full((extra, 2), np.nan)])
+        self._sexual = np.concatenate([self._sexual, np.full((extra, 2), np.nan)])
+
+    def _profile(self, agent, row: int):
+        """Record the kernel parameters of the agent owning `row`."""
+        self._owners[row] = agent
+        self._owner_ids[row] = agent.id
+        self._entity[row] = entity_key(agent.id)
+        kind = KIND_STATIC
+        self._asexual[row] = np.nan
+        self._sexual[row] = np.nan
+        for component in agent.components:
+            component_type = type(component)
+            if component_type not in PARALLEL_COMPONENTS:
+                kind = KIND_OBJECT
+                break
+            if component_type is RandomMovement:
+                kind = KIND_RANDOM
+            elif component_type is TargetedMovement:
+                if component.compiled_criteria.state_items:
+                    kind = KIND_OBJECT
+                    break
+                kind = KIND_TARGETED
+                self._mask[row] = component.compiled_criteria.mask
+            elif component_type is AsexualReproduction:
+                self._asexual[row] = (component.cost, component.threshold)
+            elif component_type is SexualReproduction:
+                self._sexual[row] = (component.cost, component.threshold)
+            if component_type in (StaticMovement, RandomMovement, TargetedMovement):
+                self._speed[row] = component.speed
+        self._kind[row] = kind
+        self._vision[row] = agent.state.get("vision_radius", 100)
+        self._habitat[row] = habitat_code(agent.state.get("habitat"))
+
+    def _rows(self, environment: 'Environment') -> np.ndarray:
+        """Live rows in `environment.agents` order, refreshing stale profiles."""
+        self._ensure_capacity()
+        owners, owner_ids = self._owners, self._owner_ids
+        alive = self.store.alive
+        rows = []
+        for agent in environment.agents:
+            row = agent._row
+            if alive.item(row):
+                if owners[row] is not agent or owner_ids[row] != agent.id:
+                    self._profile(agent, row)
+                rows.append(row)
+        return np.array(rows, dtype=np.intp)
+
+    # --- Decide ---
+
+    def _decide(self, hunters: np.ndarray, breeders: np.ndarray):
+        """Run the decide kernel per tile; returns target rows, distances and crowding counts."""
+        store = self.store
+        end = store.end
+        cand_rows = np.flatnonzero(store.alive[:end])
+        cand_x, cand_y = store.x[cand_rows], store.y[cand_rows]
+
+        halo = 0.0
+        if hunters.size:
+            halo = float(self._vision[hunters].max())
+        if breeders.size:
+            halo = max(halo, float(config.NEIGHBOR_RADIUS))
+
+        queriers = np.concatenate([hunters, breeders])
+        is_hunter = np.arange(len(queriers)) < len(hunters)
+        tiles_x = np.floor(store.x[queriers] / self.tile_size).astype(np.int64)
+        tiles_y = np.floor(store.y[queriers] / self.tile_size).astype(np.int64)
+        keys = tiles_y * (1 << 20) + tiles_x
+
+        # Bucket queriers and candidates by tile once; each tile then only scans
+        # the candidate buckets its halo reaches
+        querier_order = np.argsort(keys, kind="stable")
+        tile_keys, tile_starts = np.unique(keys[querier_order], return_index=True)
+        tile_stops = np.append(tile_starts[1:], len(queriers))
+        cand_tx = np.floor(cand_x / self.tile_size).astype(np.int64)
+        cand_ty = np.floor(cand_y / self.tile_size).astype(np.int64)
+        cand_keys = cand_ty * (1 << 20) + cand_tx
+        cand_order = np.argsort(cand_keys, kind="stable")
+        bucket_keys, bucket_starts = np.unique(cand_keys[cand_order], return_index=True)
+        bucket_stops = np.append(bucket_starts[1:], len(cand_rows))
+        bucket_tx, bucket_ty = bucket_keys % (1 << 20), bucket_keys // (1 << 20)
+        reach = math.ceil(halo / self.tile_size)
+
+        tasks = []
+        members = []
+        for key, start, stop in zip(tile_keys.tolist(), tile_starts.tolist(), tile_stops.tolist()):
+            in_tile = np.sort(querier_order[start:stop])
+            tx, ty = key % (1 << 20), key // (1 << 20)
+            x0, y0 = tx * self.tile_size - halo, ty * self.tile_size - halo
+            x1, y1 = (tx + 1) * self.tile_size + halo, (ty + 1) * self.tile_size + halo
+            near = np.flatnonzero((np.abs(bucket_tx - tx) <= reach) & (np.abs(bucket_ty - ty) <= reach))
+            # Back in candidate (store row) order: kernel ties go to the lowest index
+            nearby = np.sort(np.concatenate(
+                [cand_order[bucket_starts[i]:bucket_stops[i]] for i in near.tolist()] or [np.zeros(0, np.intp)]))
+            near_x, near_y = cand_x[nearby], cand_y[nearby]
+            local = nearby[(near_x >= x0) & (near_x <= x1) & (near_y >= y0) & (near_y <= y1)]
+            local_rows = cand_rows[local]
+
+            tile_hunters = queriers[in_tile[is_hunter[in_tile]]]
+            tile_breeders = queriers[in_tile[~is_hunter[in_tile]]]
+            # Queriers lie inside their own tile, so each finds itself among the sorted local rows
+            tasks.append({
+                "xy": np.column_stack([store.x[local_rows], store.y[local_rows]]),
+                "tags": store.tags[local_rows],
+                "species": store.species_id[local_rows],
+                "hunter_xy": np.column_stack([store.x[tile_hunters], store.y[tile_hunters]]),
+                "hunter_radius": self._vision[tile_hunters],
+                "hunter_mask": self._mask[tile_hunters],
+                "hunter_own": np.searchsorted(local_rows, tile_hunters),
+                "breeder_xy": np.column_stack([store.x[tile_breeders], store.y[tile_breeders]]),
+                "breeder_species": store.species_id[tile_breeders],
+                "breeder_own": np.searchsorted(local_rows, tile_breeders),
+            })
+            members.append((local_rows, in_tile[is_hunter[in_tile]], in_tile[~is_hunter[in_tile]] - len(hunters)))
+
+        if self.workers > 1 and len(queriers) >= self.inline_threshold and len(tasks) > 1:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+            results = self._pool.map(decide_tile, tasks)
+        else:
+            results = map(decide_tile, tasks)
+
+        target_rows = np.full(len(hunters), -1)
+        target_dist = np.full(len(hunters), np.inf)
+        crowding = np.zeros(len(breeders), dtype=np.int64)
+        for (local_rows, hunter_slots, breeder_slots), (targets, dists, counts) in zip(members, results):
+            found = targets >= 0
+            target_rows[hunter_slots[found]] = local_rows[targets[found]]
+            target_dist[hunter_slots] = dists
+            crowding[breeder_slots] = counts
+        return target_rows, target_dist, crowding
+
+    # --- Apply ---
+
+    def update_agents(self, environment: 'Environment', profiler: Optional['TickProfiler'] = None):
+        """
+        Decide and apply one tick for every live agent.
+
+        Args:
+            environment (Environment): The simulation environment.
+            profiler (Optional[TickProfiler]): Times the decide phase
+                ("parallel.decide") when given.
+        """
+        store = self.store
+        rows = self._rows(environment)
+        kernel = rows[self._kind[rows] != KIND_OBJECT]
+        others = rows[self._kind[rows] == KIND_OBJECT]
+
+        kind = self._kind[kernel]
+        energy = np.nan_to_num(store.energy[kernel], nan=0.0)
+        hunger = np.nan_to_num(store.hunger[kernel], nan=0.0)
+        hungry = (kind == KIND_TARGETED) & (hunger > HUNGER_THRESHOLD)
+        # Batched draws: wander dx, wander dy, reproduction roll, spawn angle, spawn distance
+        rng, tick = environment.rng, environment.total_ticks
+        draws = np.hstack([rng.random_array(STREAM_MOVEMENT, self._entity[kernel], tick, 2),
+                           rng.random_array(STREAM_REPRODUCTION, self._entity[kernel], tick, 3)])
+
+        asexual = self._asexual[kernel]
+        # Only budders that won the roll need the crowding count
+        may_bud = (energy > asexual[:, 1]) & (draws[:, 2] < ASEXUAL_CHANCE)  # NaN threshold -> False
+
+        hunter_slots = np.flatnonzero(hungry)
+        breeder_slots = np.flatnonzero(may_bud)
+        decide_start = time.perf_counter()
+        target_rows, target_dist, crowding = self._decide(kernel[hunter_slots], kernel[breeder_slots])
+        if profiler is not None:
+            profiler.record("parallel.decide", time.perf_counter() - decide_start)
+
+        # Eat and chase intents
+        eat = np.zeros(len(kernel), dtype=bool)
+        dx = (-1 + 2 * draws[:, 0]) * self._speed[kernel]
+        dy = (-1 + 2 * draws[:, 1]) * self._speed[kernel]
+        has_target = target_rows >= 0
+        chasers = hunter_slots[has_target]
+        targets = target_rows[has_target]
+        angle = np.arctan2(store.y[targets] - store.y[kernel[chasers]], store.x[targets] - store.x[kernel[chasers]])
+        dx[chasers] = np.cos(angle) * self._speed[kernel[chasers]]
+        dy[chasers] = np.sin(angle) * self._speed[kernel[chasers]]
+        eat[chasers] = target_dist[has_target] <= EAT_DISTANCE
+        self._resolve_eating(environment, kernel, eat, hunter_slots, target_rows, target_dist)
+
+        # Moves
+        movers = np.flatnonzero((kind != KIND_STATIC) & ~eat & store.alive[kernel])
+        mover_rows = kernel[movers]
+        new_x = np.clip(store.x[mover_rows] + dx[movers], 0, environment.width)
+        new_y = np.clip(store.y[mover_rows] + dy[movers], 0, environment.height)
+        valid = environment.validate_positions(self._habitat[mover_rows], new_x, new_y)
+        mover_rows = mover_rows[valid]
+        store.x[mover_rows] = new_x[valid]
+        store.y[mover_rows] = new_y[valid]
+        grid = environment.spatial_grid
+        for row in mover_rows.tolist():
+            grid.move(store.agents[row])
+
+        self._reproduce(environment, kernel, energy, hunger, breeder_slots, crowding, draws)
+
+        # Agents the kernels do not cover, around the vectorized metabolism pass
+        plans = [self.metabolism_system._plan(row) for row in others.tolist()]
+        for plan in plans:
+            if plan[0].alive:
+                for update in plan[1]:
+                    update(environment)
+        self.metabolism_system.update(environment)
+        for plan in plans:
+            if plan[0].alive:
+                for update in plan[2]:
+                    update(environment)
+
+    def _resolve_eating(self, environment, kernel, eat, hunter_slots, target_rows, target_dist):
+        """Apply eat intents; a contested target goes to the closest eater (then lowest row)."""
+        store = self.store
+        eaters = np.flatnonzero(eat[hunter_slots])
+        if eaters.size == 0:
+            return
+        eater_rows = kernel[hunter_slots[eaters]]
+        order = np.lexsort((eater_rows, target_dist[eaters]))
+        for i in order.tolist():
+            row = eater_rows.item(i)
+            target = target_rows.item(eaters.item(i))
+            if not store.alive.item(row) or not store.alive.item(target):
+                continue  # Eater was eaten, or another eater got there first
+            store.alive[target] = False
+            environment.remove_agent(store.agents[target].id)
+            store.energy[row] = min(100.0, np.nan_to_num(store.energy[row]) + 20.0)
+            store.hunger[row] = max(0.0, np.nan_to_num(store.hunger[row]) - 30.0)
+
+    def _reproduce(self, environment, kernel, energy, hunger, breeder_slots, crowding, draws):
+        """Apply AsexualReproduction / SexualReproduction with the batched draws."""
+        from .factory import AgentFactory
+        store = self.store
+        alive = store.alive[kernel]
+
+        budding = np.zeros(len(kernel), dtype=bool)
+        budding[breeder_slots[crowding < config.MAX_NEIGHBORS]] = True
+        budding &= alive & (draws[:, 2] < ASEXUAL_CHANCE)
+        for i in np.flatnonzero(budding).tolist():
+            row = kernel.item(i)
+            agent = store.agents[row]
+            store.energy[row] -= self._asexual[row, 0]
+            size = agent.state.get("size", 5.0)
+            min_dist, max_dist = size * 3.0, size * 5.0
+            angle = (2 * math.pi) * draws[i, 3]
+            dist = min_dist + (max_dist - min_dist) * draws[i, 4]
+            new_x = max(0, min(environment.width, agent.x + math.cos(angle) * dist))
+            new_y = max(0, min(environment.height, agent.y + math.sin(angle) * dist))
+            environment.add_agent(AgentFactory.create(agent.state.get("species", "Unknown"), new_x, new_y,
+                                                    environment.agent_pool))
+
+        sexual = self._sexual[kernel]
+        mating = alive & (energy > sexual[:, 1]) & (hunger < HUNGER_THRESHOLD) & (draws[:, 2] < SEXUAL_CHANCE)
+        for i in np.flatnonzero(mating).tolist():
+            row = kernel.item(i)
+            agent = store.agents[row]
+            store.energy[row] -= self._sexual[row, 0]
+            environment.add_agent(AgentFactory.create(agent.state.get("species", "Unknown"), agent.x, agent.y,
+                                                    environment.agent_pool))
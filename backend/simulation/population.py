@@ -0,0 +1,57 @@
+from typing import Dict
+
+
+class PopulationCounters:
+    """
+    Live agent counts per species, maintained incrementally.
+
+    The environment registers agents on insertion and unregisters them on
+    removal; while registered, an agent reports alive/dead flips from its
+    `alive` setter. Reading the counts is O(species).
+
+    Vectorized passes that clear `AgentStore.alive` directly (bypassing the
+    setter) always schedule the agent for removal, so such agents stop being
+    counted when the removal buffer is processed at the end of the tick.
+
+    An agent's species is read when it is counted in or out; changing
+    `state["species"]` of a registered agent is not tracked.
+
+    Attributes:
+        counts (Dict[str, int]): Species -> live agents (may hold zeros).
+        version (int): Bumped on every change.
+    """
+    def __init__(self):
+        self.counts: Dict[str, int] = {}
+        self.version = 0
+
+    def _adjust(self, agent, delta: int):
+        species = agent.state.get("species", "Unknown")
+        self.counts[species] = self.counts.get(species, 0) + delta
+        agent._counted = delta > 0
+        self.version += 1
+
+    def insert(self, agent):
+        """Start tracking an agent (counted if alive)."""
+        agent._population = self
+        agent._counted = False
+        if agent.alive:
+            self._adjust(agent, 1)
+
+    def remove(self, agent):
+        """Stop tracking an agent."""
+        if agent._counted:
+            self._adjust(agent, -1)
+        agent._population = None
+
+    def alive_changed(self, agent, alive: bool):
+        """Called by `Agent.alive` when a tracked agent is killed or revived."""
+        if bool(alive) != agent._counted:
+            self._adjust(agent, 1 if alive else -1)
+
+    def snapshot(self) -> Dict[str, int]:
+        """Species with at least one live agent -> count."""
+        return {species: count for species, count in self.counts.items() if count > 0}
+
+    def clear(self):
+        self.counts = {}
+        self.version += 1
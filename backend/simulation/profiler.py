@@ -0,0 +1,84 @@
+import time
+from collections import deque
+from typing import Dict, Any, Deque
+import numpy as np
+import config
+
+
+class TickProfiler:
+    """
+    Per-phase and per-component tick timings with rolling percentiles.
+
+    Usage inside a tick (only when `enabled`, so a disabled profiler costs
+    one attribute check per tick):
+
+        profiler.begin_tick()
+        ...                          # equipment
+        profiler.lap("equipment")    # time since the previous lap
+        profiler.record("component.Growth", seconds)   # accumulated per tick
+        profiler.end_tick()          # also records "total"
+
+    Each name keeps the per-tick totals of the last `window` ticks it
+    appeared in.
+
+    Attributes:
+        enabled (bool): Whether Environment.update() feeds the profiler.
+        window (int): Number of ticks kept per name.
+    """
+    def __init__(self, enabled: bool = config.PROFILER_ENABLED, window: int = config.PROFILER_WINDOW):
+        self.enabled = enabled
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._current: Dict[str, float] = {}
+        self._tick_start = 0.0
+        self._last = 0.0
+
+    def begin_tick(self):
+        self._current = {}
+        self._tick_start = self._last = time.perf_counter()
+
+    def lap(self, name: str):
+        """Record the time since the previous lap (or the tick start) under `name`."""
+        now = time.perf_counter()
+        self.record(name, now - self._last)
+        self._last = now
+
+    def record(self, name: str, seconds: float):
+        """Add `seconds` to this tick's total for `name`."""
+        self._current[name] = self._current.get(name, 0.0) + seconds
+
+    def end_tick(self):
+        self.record("total", time.perf_counter() - self._tick_start)
+        for name, seconds in self._current.items():
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+            samples.append(seconds)
+        self._current = {}
+
+    def reset(self):
+        self._samples = {}
+        self._current = {}
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Rolling statistics per phase/component.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Name -> {"count", "mean", "p50", "p95",
+            "p99"} with times in milliseconds.
+        """
+        result = {}
+        for name, samples in list(self._samples.items()):
+            values = np.array(samples) * 1000.0
+            if values.size == 0:
+                continue
+            p50, p95, p99 = np.percentile(values, [50, 95, 99]).tolist()
+            result[name] = {
+                "count": int(values.size),
+                "mean": float(values.mean()),
+                "p50": p50,
+                "p95": p95,
+                "p99": p99,
+            }
+        return result
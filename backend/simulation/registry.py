@@ -0,0 +1,78 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from .agents import Agent
+
+
+class AgentRegistry:
+    """
+    The live agents of an environment: a dense list plus an id -> index map.
+
+    Behaves like the plain list it replaces (iteration, `len`, indexing),
+    and adds O(1) lookups by id and O(D) removal of D agents: each removed
+    agent's slot is filled with the current last agent (swap-remove), so
+    iteration order changes after removals but no scan of the list is needed.
+
+    Agent ids must not change while an agent is registered.
+    """
+    def __init__(self):
+        self._agents: List[Agent] = []
+        self._index: Dict[Any, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._agents)
+
+    def __iter__(self) -> Iterator[Agent]:
+        return iter(self._agents)
+
+    def __getitem__(self, index):
+        return self._agents[index]
+
+    def __contains__(self, agent) -> bool:
+        return self._index.get(getattr(agent, "id", None)) is not None
+
+    def append(self, agent: Agent):
+        """Register an agent at the end of the iteration order."""
+        self._index[agent.id] = len(self._agents)
+        self._agents.append(agent)
+
+    def extend(self, agents: Iterable[Agent]):
+        """Register several agents at the end of the iteration order."""
+        start = len(self._agents)
+        self._agents.extend(agents)
+        for index in range(start, len(self._agents)):
+            self._index[self._agents[index].id] = index
+
+    def get(self, agent_id: Any) -> Optional[Agent]:
+        """The registered agent with this id, or None."""
+        index = self._index.get(agent_id)
+        return self._agents[index] if index is not None else None
+
+    def remove_ids(self, agent_ids: Iterable[Any]) -> List[Agent]:
+        """
+        Unregister agents by id.
+
+        Unknown ids are ignored. Slots are vacated from the highest index
+        down, so the resulting order only depends on which agents were
+        removed, not on the order of `agent_ids`.
+
+        Args:
+            agent_ids (Iterable[Any]): Ids to remove (duplicates allowed).
+
+        Returns:
+            List[Agent]: The agents that were removed.
+        """
+        indices = sorted({self._index[i] for i in agent_ids if i in self._index}, reverse=True)
+        agents = self._agents
+        removed = []
+        for index in indices:
+            agent = agents[index]
+            del self._index[agent.id]
+            last = agents.pop()
+            if last is not agent:
+                agents[index] = last
+                self._index[last.id] = index
+            removed.append(agent)
+        return removed
+
+    def clear(self):
+        self._agents = []
+        self._index = {}
@@ -0,0 +1,158 @@
+import zlib
+from typing import Any, Dict, Optional
+import numpy as np
+
+MASK64 = (1 << 64) - 1
+_GOLDEN = 0x9E3779B97F4A7C15
+_MIX1 = 0xBF58476D1CE4E5B9
+_MIX2 = 0x94D049BB133111EB
+_TO_UNIT = 2.0 ** -53
+
+# Independent streams. Per-agent streams are keyed by (agent, tick, slot);
+# sequential streams are plain counters (see RandomStreams.draw).
+STREAM_MOVEMENT = 1      # Slots 0-1: wander dx, dy
+STREAM_REPRODUCTION = 2  # Slots 0-2: chance roll, spawn angle, spawn distance
+STREAM_PLACEMENT = 3     # Sequential: initial population positions
+STREAM_COMMANDS = 4      # Sequential: client spawn commands
+
+# Draw slots per (agent, tick) in one stream
+SLOTS = 16
+
+# Entity key of sequential draws (never a real agent id)
+_SEQUENTIAL = MASK64
+
+
+def splitmix64(x: int) -> int:
+    """SplitMix64 finalizer: a bijective 64-bit hash."""
+    z = (x + _GOLDEN) & MASK64
+    z = ((z ^ (z >> 30)) * _MIX1) & MASK64
+    z = ((z ^ (z >> 27)) * _MIX2) & MASK64
+    return z ^ (z >> 31)
+
+
+def splitmix64_array(x: np.ndarray) -> np.ndarray:
+    """Vectorized splitmix64 over a uint64 array (bit-identical to the scalar version)."""
+    with np.errstate(over="ignore"):
+        z = x + np.uint64(_GOLDEN)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(_MIX1)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(_MIX2)
+        return z ^ (z >> np.uint64(31))
+
+
+def entity_key(agent_id: Any) -> int:
+    """64-bit stream key for an agent id (ints as is, legacy string ids hashed)."""
+    if isinstance(agent_id, int):
+        return agent_id & MASK64
+    return (zlib.crc32(str(agent_id).encode("utf-8")) | (1 << 48)) & MASK64
+
+
+class RandomStreams:
+    """
+    Counter-based random numbers derived from one seed.
+
+    A draw is a pure function of (seed, stream, entity, tick, slot), hashed
+    with splitmix64, so an agent's draws do not depend on how many other
+    agents drew before it or in which order agents are updated. The scalar
+    and NumPy paths produce bit-identical values, which keeps the object,
+    columnar, vectorized and parallel backends reproducible from a seed.
+
+    Attributes:
+        seed (int): The 64-bit root seed.
+    """
+    def __init__(self, seed: int, counters: Optional[Dict[int, int]] = None):
+        self.seed = seed & MASK64
+        self._stream_keys: Dict[int, int] = {}
+        # Sequential stream id -> number of values drawn (see draw)
+        self._counters: Dict[int, int] = {}
+        if counters:
+            self.set_counters(counters)
+
+    def counters(self) -> Dict[str, int]:
+        """Sequential stream positions, JSON-ready (stream id as a string key)."""
+        return {str(stream): count for stream, count in self._counters.items()}
+
+    def set_counters(self, counters: Dict[Any, int]):
+        """
+        Resume the sequential streams at saved positions (see `counters`).
+
+        Args:
+            counters (Dict[Any, int]): Stream id (int or numeric string) ->
+                number of values already drawn.
+        """
+        self._counters = {int(stream): int(count) for stream, count in counters.items()}
+
+    def _stream_key(self, stream: int) -> int:
+        key = self._stream_keys.get(stream)
+        if key is None:
+            key = splitmix64(self.seed ^ stream)
+            self._stream_keys[stream] = key
+        return key
+
+    def random(self, stream: int, entity: int, tick: int, slot: int = 0) -> float:
+        """
+        Uniform float in [0, 1) for one (entity, tick, slot) of a stream.
+
+        Args:
+            stream (int): Stream id (STREAM_*).
+            entity (int): Entity key, usually `entity_key(agent.id)`.
+            tick (int): Tick counter.
+            slot (int): Draw index within the tick (< SLOTS).
+
+        Returns:
+            float: The draw.
+        """
+        h = splitmix64(self._stream_key(stream) ^ entity)
+        h = splitmix64(h ^ ((tick * SLOTS + slot) & MASK64))
+        return (h >> 11) * _TO_UNIT
+
+    def uniform(self, a: float, b: float, stream: int, entity: int, tick: int, slot: int = 0) -> float:
+        """Uniform float in [a, b), computed like `random.uniform`."""
+        return a + (b - a) * self.random(stream, entity, tick, slot)
+
+    def random_array(self, stream: int, entities: np.ndarray, tick: int, slots: int) -> np.ndarray:
+        """
+        Batched `random()`: slots 0..slots-1 of the given tick for many entities.
+
+        Args:
+            stream (int): Stream id.
+            entities (np.ndarray): Entity keys (uint64).
+            tick (int): Tick counter.
+            slots (int): Number of slots per entity.
+
+        Returns:
+            np.ndarray: Draws of shape (len(entities), slots).
+        """
+        h = splitmix64_array(np.uint64(self._stream_key(stream)) ^ entities.astype(np.uint64))
+        counters = np.arange(slots, dtype=np.uint64) + np.uint64((tick * SLOTS) & MASK64)
+        keys = splitmix64_array(h[:, None] ^ counters[None, :])
+        return (keys >> np.uint64(11)).astype(np.float64) * _TO_UNIT
+
+    def draw(self, stream: int) -> float:
+        """Next value of a sequential stream (for one-off draws outside agent updates)."""
+        counter = self._counters.get(stream, 0)
+        self._counters[stream] = counter + 1
+        return self.random(stream, _SEQUENTIAL, counter)
+
+    def draw_array(self, stream: int, count: int) -> np.ndarray:
+        """
+        The next `count` values of a sequential stream, in one call.
+
+        Yields the same values as `count` successive `draw()` calls.
+
+        Args:
+            stream (int): Stream id.
+            count (int): Number of draws.
+
+        Returns:
+            np.ndarray: float64 draws, shape (count,).
+        """
+        counter = self._counters.get(stream, 0)
+        self._counters[stream] = counter + count
+        h = np.uint64(splitmix64(self._stream_key(stream) ^ _SEQUENTIAL))
+        ticks = (np.arange(counter, counter + count, dtype=np.uint64) * np.uint64(SLOTS))
+        keys = splitmix64_array(h ^ ticks)
+        return (keys >> np.uint64(11)).astype(np.float64) * _TO_UNIT
+
+    def randint(self, a: int, b: int, stream: int) -> int:
+        """Sequential integer in [a, b] (inclusive, like `random.randint`)."""
+        return a + min(int(self.draw(stream) * (b - a + 1)), b - a)
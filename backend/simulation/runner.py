@@ -1,8 +1,11 @@
 import asyncio
 import time
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from .environment import Environment
+from .broadcast import BroadcastHub
+from .commands import apply_command
+from .worker import ThreadWorker, ProcessWorker, profile_summary
 import config
 
 logger = logging.getLogger("SimulationRunner")
@@ -15,11 +18,20 @@ class SimulationRunner:
     ensuring the simulation continues running even if clients disconnect.
     It handles the tick rate (TPS) and synchronization.
 
+    In "async" mode the environment is ticked inside the event loop. In
+    "thread" and "process" mode a worker (see simulation.worker) owns the
+    environment: commands are queued to it with `submit()` and `get_state()`
+    returns the latest snapshot it published, so a slow tick never stalls
+    WebSocket traffic. In "process" mode `environment` is only the initial
+    copy the worker started from.
+
     Attributes:
         environment (Environment): The simulation environment instance.
         target_tps (float): The target ticks per second.
         actual_tps (float): The measured ticks per second.
         is_running (bool): Whether the simulation loop is active.
+        mode (str): "async", "thread" or "process" (config.RUNNER_MODE).
+        hub (BroadcastHub): Shared state broadcaster for WebSocket clients.
     """
     _instance = None
 
@@ -34,12 +46,17 @@ class SimulationRunner:
             return
         self._initialized = True
         
-        self.environment = Environment()
+        # The server's stats log lives in a fixed directory, reopened on restart
+        self.environment = Environment(history_directory=config.STATS_HISTORY_DIR)
         self.target_tps = 10.0
         self.actual_tps = 0.0
         self.is_running = False
         self._task: Optional[asyncio.Task] = None
         self._stop_event = asyncio.Event()
+        self.mode = config.RUNNER_MODE
+        self._worker = None
+        self.hub = BroadcastHub(self.get_state, self.live_environment)
+        self._broadcast_task: Optional[asyncio.Task] = None
 
     def start(self):
         """
@@ -47,11 +64,20 @@ class SimulationRunner:
         
         Creates a new asyncio Task for the loop.
         """
-        if self._task is None or self._task.done():
+        if self.mode in ("thread", "process"):
+            if self._worker is None or not self._worker.is_alive():
+                worker_cls = ThreadWorker if self.mode == "thread" else ProcessWorker
+                self._worker = worker_cls(self.environment, self.target_tps)
+                self._worker.start()
+                self.is_running = True
+                logger.info(f"Simulation worker started ({self.mode}).")
+        elif self._task is None or self._task.done():
             self._stop_event.clear()
             self.is_running = True
             self._task = asyncio.create_task(self._loop())
             logger.info("Simulation loop started.")
+        if self._broadcast_task is None or self._broadcast_task.done():
+            self._broadcast_task = asyncio.create_task(self.hub.run(config.BROADCAST_INTERVAL))
 
     def stop(self):
         """
@@ -64,6 +90,13 @@ class SimulationRunner:
         if self._task:
             self._task.cancel()
             logger.info("Simulation loop stopped.")
+        if self._worker is not None:
+            self._worker.stop()
+            self._worker = None
+            logger.info("Simulation worker stopped.")
+        if self._broadcast_task:
+            self._broadcast_task.cancel()
+        self.environment.close()
 
     async def _loop(self):
         """
@@ -121,17 +154,94 @@ class SimulationRunner:
             tps (float): The new target TPS.
         """
         self.target_tps = float(tps)
+        if self._worker is not None:
+            self._worker.submit({"type": "set_speed", "payload": {"speed": self.target_tps}})
         logger.info(f"Target TPS set to {self.target_tps}")
 
-    def get_state(self) -> Dict[str, Any]:
+    def submit(self, command: Dict[str, Any]):
+        """
+        Apply a client command (see simulation.commands.apply_command).
+
+        Applied immediately in "async" mode, queued to the worker otherwise.
+
+        Args:
+            command (Dict[str, Any]): The command message.
+        """
+        if self._worker is not None:
+            self._worker.submit(command)
+        else:
+            apply_command(self.environment, command)
+
+    def set_profiling(self, enabled: bool):
+        """Turn the environment's TickProfiler on or off."""
+        self.submit({"type": "set_profiling", "payload": {"enabled": enabled}})
+
+    def get_profile(self) -> Dict[str, Any]:
+        """
+        Rolling tick timings (see simulation.profiler.TickProfiler.summary).
+
+        With a worker the summary is taken on the worker between ticks (the
+        profiler's sample windows are only touched there). This call blocks
+        until it answers, so async callers should run it in a thread.
+
+        Returns:
+            Dict[str, Any]: {"enabled": bool, "phases": {name: stats}}.
+        """
+        if self._worker is not None:
+            return self._worker.query_profile()
+        return profile_summary(self.environment)
+
+    def query_history(self, start: Optional[int] = None, end: Optional[int] = None,
+                      species: Optional[List[str]] = None, points: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Stats history for a tick range (see simulation.stats_history.StatsHistory.query).
+
+        With a worker the query runs on the worker between ticks. This call
+        blocks until it answers, so async callers should run it in a thread.
+
+        Args:
+            start (Optional[int]): First tick (inclusive).
+            end (Optional[int]): Last tick (inclusive).
+            species (Optional[List[str]]): Columns to return (None = all).
+            points (Optional[int]): Downsample to at most this many samples.
+
+        Returns:
+            Dict[str, Any]: {"source", "time", "columns"}.
+        """
+        params = {"start": start, "end": end, "columns": species, "points": points}
+        if self._worker is not None:
+            return self._worker.query_history(**params)
+        return self.environment.history.query(**params)
+
+    def agent_count(self) -> int:
+        """Number of live agents (from the latest snapshot in "process" mode)."""
+        if self.mode == "process" and self._worker is not None:
+            return len(self._worker.snapshot["agents"]) if self._worker.snapshot else 0
+        return len(self.environment.agents)
+
+    def live_environment(self) -> Optional[Environment]:
+        """The environment, if it is ticked in this thread ("async" mode, no worker)."""
+        return self.environment if self._worker is None else None
+
+    def get_state(self, include_agents: bool = True) -> Dict[str, Any]:
         """
         Get the current state of the simulation.
 
+        Args:
+            include_agents (bool): Whether to build the agent list (ignored
+                with a worker, whose snapshots always carry it).
+
         Returns:
             Dict[str, Any]: A dictionary containing environment and agent data,
-            plus telemetry (actual_tps, target_tps).
+            plus telemetry (actual_tps, target_tps). With a worker, this is
+            the worker's latest snapshot and must not be mutated.
         """
-        state = self.environment.get_state()
+        if self._worker is not None:
+            if self._worker.snapshot is not None:
+                return self._worker.snapshot
+            # The worker has not published its first snapshot yet
+            return {"environment": {"actual_tps": 0.0, "target_tps": self.target_tps}, "agents": []}
+        state = self.environment.get_state(include_agents)
         state["environment"]["actual_tps"] = self.actual_tps
         state["environment"]["target_tps"] = self.target_tps
         return state
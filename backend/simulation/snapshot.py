@@ -0,0 +1,390 @@
+"""
+Binary environment snapshots.
+
+A snapshot stores the agents as typed column arrays and the terrain as a
+raw uint8 grid, instead of one JSON object per agent:
+
+    header      magic "PSNP", u8 version, 3 reserved bytes, u64 metadata length
+    metadata    UTF-8 JSON: the `to_dict()` header (size, globals, equipment),
+                the state key table and the location of every blob
+    blobs       64-byte aligned, each optionally compressed on its own
+
+Agent state keys are stored by kind: floats as float64 columns (NaN = key
+absent), integers as int64 columns (plus a presence mask if some agents
+lack the key), strings as int32 codes into a table (-1 = absent), and
+anything else as a JSON list. For a columnar environment the AgentStore
+columns and parameter columns are sliced as they are. Uncompressed blobs
+(the default) are read straight from a memory map of the file.
+
+Saving copies the state on the calling thread (a consistent snapshot
+between ticks) and compresses/writes it on a background thread.
+"""
+import json
+import mmap
+import os
+import struct
+import threading
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+import numpy as np
+import config
+from .agent_store import COLUMN_KEYS
+
+try:  # Optional: faster codecs when installed
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # pragma: no cover - depends on the environment
+    lz4_frame = None
+
+MAGIC = b"PSNP"
+VERSION = 1
+EXTENSION = ".psnap"
+
+CODEC_NONE = "none"
+CODEC_ZLIB = "zlib"
+CODEC_ZSTD = "zstd"
+CODEC_LZ4 = "lz4"
+
+_HEADER = struct.Struct("<4sBxxxQ")
+_ALIGN = 64
+
+# State key kinds
+KIND_FLOAT = "float"
+KIND_INT = "int"
+KIND_STR = "str"
+KIND_JSON = "json"
+
+_MISSING = object()
+
+
+def available_codecs() -> List[str]:
+    """Codecs usable in this interpreter, fastest first."""
+    codecs = []
+    if zstandard is not None:
+        codecs.append(CODEC_ZSTD)
+    if lz4_frame is not None:
+        codecs.append(CODEC_LZ4)
+    return codecs + [CODEC_ZLIB, CODEC_NONE]
+
+
+def resolve_codec(codec: str = config.SNAPSHOT_COMPRESSION) -> str:
+    """
+    Map a configured codec to one that is available ("auto" = no
+    compression, so loads are memory-mapped; zstd and lz4 fall back to zlib
+    when not installed).
+    """
+    if codec == "auto":
+        return CODEC_NONE
+    if codec in available_codecs():
+        return codec
+    return CODEC_ZLIB
+
+
+def _compress(codec: str, data: bytes) -> bytes:
+    if codec == CODEC_ZSTD:
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    if codec == CODEC_LZ4:
+        return lz4_frame.compress(data)
+    if codec == CODEC_ZLIB:
+        return zlib.compress(data, config.SNAPSHOT_ZLIB_LEVEL)
+    return data
+
+
+def _decompress(codec: str, data, raw_size: int):
+    if codec == CODEC_ZSTD:
+        return zstandard.ZstdDecompressor().decompress(data, max_output_size=raw_size)
+    if codec == CODEC_LZ4:
+        return lz4_frame.decompress(data)
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(data)
+    return data
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_int64(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and -2**63 <= value < 2**63
+
+
+def _encode_state(states: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], Dict[str, np.ndarray], Dict[str, Any]]:
+    """Split per-agent state dicts into typed columns (see module docstring)."""
+    keys = dict.fromkeys(key for state in states for key in state)
+    table, arrays, json_columns = {}, {}, {}
+    for key in keys:
+        values = [state.get(key, _MISSING) for state in states]
+        present = [v for v in values if v is not _MISSING]
+        if all(_is_int64(v) for v in present):
+            arrays["state." + key] = np.array([0 if v is _MISSING else v for v in values], dtype="<i8")
+            masked = len(present) < len(values)
+            if masked:
+                arrays["mask." + key] = np.array([v is not _MISSING for v in values], dtype="|b1")
+            table[key] = {"kind": KIND_INT, "masked": masked}
+        elif all(_is_number(v) for v in present):
+            arrays["state." + key] = np.array([np.nan if v is _MISSING else v for v in values], dtype="<f8")
+            table[key] = {"kind": KIND_FLOAT}
+        elif all(isinstance(v, str) for v in present):
+            strings = list(dict.fromkeys(present))
+            codes = {s: i for i, s in enumerate(strings)}
+            arrays["state." + key] = np.array([-1 if v is _MISSING else codes[v] for v in values], dtype="<i4")
+            table[key] = {"kind": KIND_STR, "values": strings}
+        else:
+            json_columns[key] = [None if v is _MISSING else v for v in values]
+            table[key] = {"kind": KIND_JSON, "absent": [v is _MISSING for v in values]}
+    return table, arrays, json_columns
+
+
+def capture(environment) -> Dict[str, Any]:
+    """
+    Copy the environment's persistent state into arrays.
+
+    Runs on the simulation thread; the result shares nothing with the
+    environment and can be written from any thread.
+
+    Args:
+        environment (Environment): The environment to capture.
+
+    Returns:
+        Dict[str, Any]: {"meta": JSON-serializable metadata, "arrays": {name: np.ndarray}}.
+    """
+    header = environment.to_dict(include_agents=False)
+    agents = list(environment.agents)
+    count = len(agents)
+    store = environment.store
+    if store is None:
+        table, arrays, json_columns = _encode_state([agent.state.copy() for agent in agents])
+        x = np.fromiter((agent.x for agent in agents), dtype="<f8", count=count)
+        y = np.fromiter((agent.y for agent in agents), dtype="<f8", count=count)
+    else:
+        # Only the keys outside the store columns go through per-agent dicts
+        rows = np.fromiter((agent._row for agent in agents), dtype=np.intp, count=count)
+        table, arrays, json_columns = _encode_state([agent.state.extra for agent in agents])
+        table["species"] = {"kind": KIND_STR, "values": list(store.species_names)}
+        arrays["state.species"] = store.species_id[rows].astype("<i4")
+        for key in COLUMN_KEYS:
+            table[key] = {"kind": KIND_FLOAT}
+            arrays["state." + key] = store.columns[key][rows]
+        for name, column in store.params.items():
+            arrays["param." + name] = column[rows]
+        x, y = store.x[rows], store.y[rows]
+
+    ids = [agent.id for agent in agents]
+    meta = dict(header)
+    meta.pop("terrain", None)
+    meta["agent_count"] = count
+    meta["state"] = table
+    meta["json_state"] = json_columns
+    if all(isinstance(i, int) for i in ids):
+        arrays["id"] = np.array(ids, dtype="<i8")
+    else:
+        meta["ids"] = ids  # Legacy string ids
+    arrays["x"] = x
+    arrays["y"] = y
+    arrays["terrain"] = environment.terrain_map.cells.copy()
+    return {"meta": meta, "arrays": arrays}
+
+
+def write(captured: Dict[str, Any], path: str, codec: str = config.SNAPSHOT_COMPRESSION):
+    """
+    Write a captured snapshot atomically (temporary file, then rename).
+
+    Args:
+        captured (Dict[str, Any]): Result of `capture()`.
+        path (str): Destination file.
+        codec (str): Compression codec (see `resolve_codec`).
+    """
+    codec = resolve_codec(codec)
+    blobs, index, offset = [], {}, 0
+    for name, array in captured["arrays"].items():
+        raw = np.ascontiguousarray(array).tobytes()
+        data = _compress(codec, raw)
+        index[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset,
+                       "length": len(data), "raw": len(raw), "codec": codec}
+        padding = b"\0" * (-len(data) % _ALIGN)
+        blobs.extend((data, padding))
+        offset += len(data) + len(padding)
+
+    meta = dict(captured["meta"], blobs=index)
+    metadata = json.dumps(meta).encode("utf-8")
+    metadata += b" " * (-(_HEADER.size + len(metadata)) % _ALIGN)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(metadata)))
+        f.write(metadata)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(temporary, path)
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_pending: Dict[str, Future] = {}
+_lock = threading.Lock()
+
+
+def save(environment, path: str, codec: str = config.SNAPSHOT_COMPRESSION, background: bool = True) -> Future:
+    """
+    Save a snapshot of `environment` to `path`.
+
+    The state is captured immediately; compression and the file write run
+    on a single background writer thread, in submission order.
+
+    Args:
+        environment (Environment): The environment to save.
+        path (str): Destination file.
+        codec (str): Compression codec.
+        background (bool): Write on the writer thread (False = write now).
+
+    Returns:
+        Future: Completes (or raises) when the file is written.
+    """
+    global _executor
+    captured = capture(environment)
+    if not background:
+        future = Future()
+        write(captured, path, codec)
+        future.set_result(path)
+        return future
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="snapshot-writer")
+        future = _executor.submit(lambda: (write(captured, path, codec), path)[1])
+        _pending[os.path.abspath(path)] = future
+    return future
+
+
+def wait_for_writes(path: Optional[str] = None):
+    """Block until pending background writes (of `path`, or all) are done."""
+    with _lock:
+        if path is None:
+            futures = list(_pending.values())
+        else:
+            futures = [f for f in (_pending.get(os.path.abspath(path)),) if f is not None]
+    for future in futures:
+        future.exception()  # Waits; errors are reported to the saver's future
+    with _lock:
+        for key in [k for k, f in _pending.items() if f.done()]:
+            del _pending[key]
+
+
+def read(path: str) -> Dict[str, Any]:
+    """
+    Load a snapshot, waiting for a pending write of the same file first.
+
+    Uncompressed blobs are zero-copy views into a read-only memory map of
+    the file; compressed blobs are decompressed from the mapping.
+
+    Args:
+        path (str): Snapshot file.
+
+    Returns:
+        Dict[str, Any]: {"meta": metadata, "arrays": {name: np.ndarray}}.
+
+    Raises:
+        ValueError: If the file is not a snapshot of this version.
+    """
+    wait_for_writes(path)
+    with open(path, "rb") as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, meta_len = _HEADER.unpack_from(mapping, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a version %d environment snapshot" % VERSION)
+    meta = json.loads(bytes(mapping[_HEADER.size:_HEADER.size + meta_len]))
+    base = _HEADER.size + meta_len
+    arrays = {}
+    for name, blob in meta["blobs"].items():
+        start = base + blob["offset"]
+        if blob["codec"] == CODEC_NONE:
+            count = int(np.prod(blob["shape"])) if blob["shape"] else 1
+            array = np.frombuffer(mapping, dtype=blob["dtype"], count=count, offset=start)
+        else:
+            data = _decompress(blob["codec"], memoryview(mapping)[start:start + blob["length"]], blob["raw"])
+            array = np.frombuffer(data, dtype=blob["dtype"])
+        arrays[name] = array.reshape(blob["shape"])
+    return {"meta": meta, "arrays": arrays}
+
+
+def numeric_column(snapshot: Dict[str, Any], key: str) -> Optional[np.ndarray]:
+    """
+    A numeric state key of a loaded snapshot as a float64 column.
+
+    Returns:
+        Optional[np.ndarray]: The values, NaN where an agent lacks the key;
+        None if the key is absent or not numeric.
+    """
+    spec = snapshot["meta"]["state"].get(key)
+    if spec is None or spec["kind"] not in (KIND_FLOAT, KIND_INT):
+        return None
+    column = snapshot["arrays"]["state." + key]
+    if spec["kind"] == KIND_INT:
+        column = column.astype(np.float64)
+        if spec.get("masked"):
+            column[~snapshot["arrays"]["mask." + key]] = np.nan
+    return column
+
+
+def param_columns(snapshot: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """AgentStore parameter columns saved with a loaded snapshot (columnar saves only)."""
+    return {name[len("param."):]: array for name, array in snapshot["arrays"].items()
+            if name.startswith("param.")}
+
+
+def agent_states(snapshot: Dict[str, Any], skip: Iterable[str] = ()) -> List[Dict[str, Any]]:
+    """
+    Rebuild the per-agent state dicts of a loaded snapshot.
+
+    Args:
+        snapshot (Dict[str, Any]): Result of `read()`.
+        skip (Iterable[str]): State keys to leave out (e.g. ones the caller
+            restores as whole columns).
+
+    Returns:
+        List[Dict[str, Any]]: One state dict per agent, in storage order.
+    """
+    meta, arrays = snapshot["meta"], snapshot["arrays"]
+    count = meta["agent_count"]
+    skip = set(skip)
+    states = [{} for _ in range(count)]
+    for key, spec in meta["state"].items():
+        if key in skip:
+            continue
+        kind = spec["kind"]
+        if kind == KIND_JSON:
+            for state, value, absent in zip(states, meta["json_state"][key], spec["absent"]):
+                if not absent:
+                    state[key] = value
+            continue
+        column = arrays["state." + key].tolist()
+        if kind == KIND_STR:
+            strings = spec["values"]
+            for state, code in zip(states, column):
+                if code >= 0:
+                    state[key] = strings[code]
+        elif kind == KIND_INT:
+            if spec.get("masked"):
+                for state, value, present in zip(states, column, arrays["mask." + key].tolist()):
+                    if present:
+                        state[key] = value
+            else:
+                for state, value in zip(states, column):
+                    state[key] = value
+        else:
+            for state, value in zip(states, column):
+                if value == value:  # Not NaN
+                    state[key] = value
+    return states
+
+
+def agent_ids(snapshot: Dict[str, Any]) -> List[Any]:
+    """Agent ids of a loaded snapshot, in storage order."""
+    if "id" in snapshot["arrays"]:
+        return snapshot["arrays"]["id"].tolist()
+    return snapshot["meta"]["ids"]
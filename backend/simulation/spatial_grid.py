@@ -1,43 +1,270 @@
-from typing import List, Dict, Tuple, Set
+from typing import List, Dict, Tuple, Set, Iterable
 from .agents import Agent
+import config
 
 class SpatialGrid:
+    """
+    Uniform grid bucketing agents by position for neighbor lookups.
+
+    The grid is maintained incrementally: agents are inserted/removed when
+    they enter/leave the environment and re-bucketed by `move()` only when
+    their cell changes, so per-tick upkeep scales with movers rather than
+    total population.
+
+    Alongside the buckets it keeps a density field: the number of agents of
+    each species per cell, updated by the same calls. An agent's species is
+    read when it is added, moved across cells or removed; changing
+    `state["species"]` of an indexed agent is not tracked.
+    """
     def __init__(self, width: int, height: int, cell_size: int = 50):
         self.width = width
         self.height = height
         self.cell_size = cell_size
-        self.grid: Dict[Tuple[int, int], List[Agent]] = {}
+        # Cell -> {agent id: agent}; dicts keep insertion order and O(1) removal
+        self.grid: Dict[Tuple[int, int], Dict[int, Agent]] = {}
+        self._agent_cells: Dict[int, Tuple[int, int]] = {}
+        # Cell -> {species: agents in the cell}
+        self.density: Dict[Tuple[int, int], Dict[str, int]] = {}
 
     def _get_cell_coords(self, x: float, y: float) -> Tuple[int, int]:
         return int(x // self.cell_size), int(y // self.cell_size)
 
+    def __len__(self) -> int:
+        return len(self._agent_cells)
+
+    def __contains__(self, agent: Agent) -> bool:
+        return agent.id in self._agent_cells
+
     def clear(self):
         self.grid.clear()
+        self._agent_cells.clear()
+        self.density.clear()
+
+    def _count(self, cell_coords: Tuple[int, int], agent: Agent, delta: int):
+        species = agent.state.get("species")
+        counts = self.density.get(cell_coords)
+        if counts is None:
+            counts = self.density[cell_coords] = {}
+        count = counts.get(species, 0) + delta
+        if count:
+            counts[species] = count
+        else:
+            del counts[species]
+            if not counts:
+                del self.density[cell_coords]
 
     def add(self, agent: Agent):
+        """Insert an agent into the cell containing its position."""
         cell_coords = self._get_cell_coords(agent.x, agent.y)
-        if cell_coords not in self.grid:
-            self.grid[cell_coords] = []
-        self.grid[cell_coords].append(agent)
+        bucket = self.grid.get(cell_coords)
+        if bucket is None:
+            bucket = self.grid[cell_coords] = {}
+        bucket[agent.id] = agent
+        self._agent_cells[agent.id] = cell_coords
+        self._count(cell_coords, agent, 1)
+
+    insert = add
+
+    def add_many(self, agents: Iterable[Agent]):
+        """Insert several agents (see `add`)."""
+        grid, agent_cells, density, size = self.grid, self._agent_cells, self.density, self.cell_size
+        for agent in agents:
+            cell_coords = (int(agent.x // size), int(agent.y // size))
+            bucket = grid.get(cell_coords)
+            if bucket is None:
+                bucket = grid[cell_coords] = {}
+            bucket[agent.id] = agent
+            agent_cells[agent.id] = cell_coords
+            counts = density.get(cell_coords)
+            if counts is None:
+                counts = density[cell_coords] = {}
+            species = agent.state.get("species")
+            counts[species] = counts.get(species, 0) + 1
+
+    def remove(self, agent: Agent):
+        """Remove an agent from the grid (no-op if it is not indexed)."""
+        cell_coords = self._agent_cells.pop(agent.id, None)
+        if cell_coords is None:
+            return
+        bucket = self.grid[cell_coords]
+        del bucket[agent.id]
+        if not bucket:
+            del self.grid[cell_coords]
+        self._count(cell_coords, agent, -1)
+
+    def move(self, agent: Agent):
+        """
+        Re-bucket an agent after its position changed.
+
+        Only touches the grid if the agent crossed into another cell. Agents
+        that are not indexed (e.g. still pending insertion) are ignored.
+        """
+        old_cell = self._agent_cells.get(agent.id)
+        if old_cell is None:
+            return
+        new_cell = self._get_cell_coords(agent.x, agent.y)
+        if new_cell == old_cell:
+            return
+        bucket = self.grid[old_cell]
+        del bucket[agent.id]
+        if not bucket:
+            del self.grid[old_cell]
+        bucket = self.grid.get(new_cell)
+        if bucket is None:
+            bucket = self.grid[new_cell] = {}
+        bucket[agent.id] = agent
+        self._agent_cells[agent.id] = new_cell
+        self._count(old_cell, agent, -1)
+        self._count(new_cell, agent, 1)
+
+    def rebuild(self, agents: Iterable[Agent]):
+        """Discard the index and re-insert every live agent."""
+        self.clear()
+        for agent in agents:
+            if agent.alive:
+                self.add(agent)
+
+    def resize(self, cell_size: int):
+        """Change the cell size and re-bucket every indexed agent."""
+        if cell_size == self.cell_size:
+            return
+        agents = [agent for bucket in self.grid.values() for agent in bucket.values()]
+        self.cell_size = cell_size
+        self.clear()
+        for agent in agents:
+            self.add(agent)
+
+    def density_bound(self, x: float, y: float, radius: float, species: str) -> int:
+        """
+        Upper bound on the indexed agents of `species` within `radius` of (x, y).
+
+        Sums the density field over the cells overlapped by the query circle's
+        bounding box, so the cost depends on radius / cell size only, not on
+        how many agents are there.
+        """
+        cs = self.cell_size
+        min_cx, min_cy = int((x - radius) // cs), int((y - radius) // cs)
+        max_cx, max_cy = int((x + radius) // cs), int((y + radius) // cs)
+        density = self.density
+        total = 0
+        if (max_cx - min_cx + 1) * (max_cy - min_cy + 1) > len(density):
+            # Huge radius: cheaper to walk the occupied cells
+            for (cx, cy), counts in density.items():
+                if min_cx <= cx <= max_cx and min_cy <= cy <= max_cy:
+                    total += counts.get(species, 0)
+            return total
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                counts = density.get((cx, cy))
+                if counts is not None:
+                    total += counts.get(species, 0)
+        return total
+
+    def count_species_within(self, x: float, y: float, radius: float, species: str,
+                             limit: int, exclude=None) -> int:
+        """
+        Count live agents of `species` within `radius` of (x, y), stopping
+        once `limit` are found.
+
+        Only cells whose density field holds the species are scanned, so
+        agents of other species only cost time in cells shared with it.
+
+        Args:
+            x (float): X coordinate.
+            y (float): Y coordinate.
+            radius (float): Search radius.
+            species (str): Species name.
+            limit (int): Count at which to stop.
+            exclude (Optional[Agent]): Agent not to count (e.g. the center agent).
+
+        Returns:
+            int: min(number of such agents, limit).
+        """
+        cs = self.cell_size
+        min_cx, min_cy = int((x - radius) // cs), int((y - radius) // cs)
+        max_cx, max_cy = int((x + radius) // cs), int((y + radius) // cs)
+        if (max_cx - min_cx + 1) * (max_cy - min_cy + 1) > len(self.density):
+            # Huge radius: cheaper to walk the occupied cells
+            cells = [cell for cell in self.density
+                     if min_cx <= cell[0] <= max_cx and min_cy <= cell[1] <= max_cy]
+        else:
+            cells = [(cx, cy) for cx in range(min_cx, max_cx + 1) for cy in range(min_cy, max_cy + 1)]
+        count = 0
+        for cell in cells:
+            counts = self.density.get(cell)
+            if counts is None or species not in counts:
+                continue
+            for other in self.grid[cell].values():
+                if other is exclude or not other.alive or other.state.get("species") != species:
+                    continue
+                if ((other.x - x) ** 2 + (other.y - y) ** 2) ** 0.5 <= radius:
+                    count += 1
+                    if count >= limit:
+                        return count
+        return count
 
     def get_nearby(self, x: float, y: float, radius: float) -> List[Agent]:
         """
-        Get agents from the cell containing (x, y) and its neighbors.
-        Note: This returns a superset of agents within radius. 
+        Get agents from every cell overlapped by the query circle's bounding box.
+        Note: This returns a superset of agents within radius.
         Precise distance checks should still be performed on this result.
         """
-        center_cell_x, center_cell_y = self._get_cell_coords(x, y)
-        # Check 3x3 grid of cells around the agent
-        # Radius might span multiple cells if it's large, but we assume radius <= cell_size for efficiency
-        # If radius > cell_size, we might need to check more cells. 
-        # For now, we assume cell_size (50) is > max sensing radius (usually ~5-20).
-        
+        cs = self.cell_size
+        min_cx, min_cy = int((x - radius) // cs), int((y - radius) // cs)
+        max_cx, max_cy = int((x + radius) // cs), int((y + radius) // cs)
+
         nearby_agents = []
-        
-        for dx in [-1, 0, 1]:
-            for dy in [-1, 0, 1]:
-                cell_coords = (center_cell_x + dx, center_cell_y + dy)
-                if cell_coords in self.grid:
-                    nearby_agents.extend(self.grid[cell_coords])
-                    
+        grid = self.grid
+
+        if (max_cx - min_cx + 1) * (max_cy - min_cy + 1) > len(grid):
+            # Huge radius: cheaper to walk the occupied cells
+            for (cx, cy), bucket in grid.items():
+                if min_cx <= cx <= max_cx and min_cy <= cy <= max_cy:
+                    nearby_agents.extend(bucket.values())
+            return nearby_agents
+
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                bucket = grid.get((cx, cy))
+                if bucket:
+                    nearby_agents.extend(bucket.values())
+
         return nearby_agents
+
+
+def suggest_cell_size(radii: Dict[float, float], agent_count: int, width: int, height: int,
+                      cell_cost: float = config.SPATIAL_GRID_CELL_COST) -> int:
+    """
+    Pick the cell size minimizing the expected cost of a radius query.
+
+    For a query of radius r on cells of size c, about (2r/c + 1)^2 cells are
+    visited (each costing `cell_cost` candidate-equivalents) and about
+    density * (2r + c)^2 candidates are distance-checked. The cost is
+    averaged over `radii` (radius -> weight, e.g. number of querying agents)
+    and minimized over integer cell sizes.
+
+    Args:
+        radii (Dict[float, float]): Query radius -> relative query frequency.
+        agent_count (int): Number of indexed agents.
+        width (int): World width.
+        height (int): World height.
+        cell_cost (float): Cost of visiting one cell relative to one candidate.
+
+    Returns:
+        int: Suggested cell size in pixels.
+    """
+    radii = {r: w for r, w in radii.items() if r > 0 and w > 0}
+    if not radii:
+        return config.SPATIAL_GRID_CELL_SIZE
+    density = max(agent_count, 1) / float(width * height)
+    total_weight = sum(radii.values())
+
+    def cost(c: int) -> float:
+        return sum(
+            w * (cell_cost * (2 * r / c + 1) ** 2 + density * (2 * r + c) ** 2)
+            for r, w in radii.items()
+        ) / total_weight
+
+    upper = max(8, min(max(width, height), int(2 * max(radii))))
+    lower = max(4, int(min(radii) / 4))
+    return min(range(lower, upper + 1), key=cost)
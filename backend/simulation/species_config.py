@@ -1,3 +1,4 @@
+from typing import List
 
 from .components import (
     StaticMovement, RandomMovement, TargetedMovement, Growth,
@@ -79,3 +80,27 @@ SPECIES_DB = {
         }
     }
 }
+
+
+def get_sensing_radii(species_name: str) -> List[float]:
+    """
+    Radii a species queries the spatial grid with each tick.
+
+    Covers TargetedMovement vision and the AsexualReproduction crowding check.
+
+    Args:
+        species_name (str): Key into SPECIES_DB.
+
+    Returns:
+        List[float]: Query radii in pixels (empty for unknown species).
+    """
+    entry = SPECIES_DB.get(species_name)
+    if entry is None:
+        return []
+    radii = []
+    for component_cls, kwargs in entry["components"]:
+        if issubclass(component_cls, TargetedMovement):
+            radii.append(entry["params"].get("vision_radius", 100.0))
+        elif issubclass(component_cls, AsexualReproduction):
+            radii.append(config.NEIGHBOR_RADIUS)
+    return radii
@@ -0,0 +1,439 @@
+import json
+import os
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+import numpy as np
+import config
+
+TIME = "time"
+
+def bucket_means(times: np.ndarray, columns: Dict[str, np.ndarray],
+                 ticks: int) -> Tuple[np.ndarray, Dict[str, np.ndarray], np.ndarray]:
+    """
+    Average samples over fixed tick buckets.
+
+    Args:
+        times (np.ndarray): Sorted sample times (ticks).
+        columns (Dict[str, np.ndarray]): Values aligned with `times`.
+        ticks (int): Bucket width in ticks; bucket k covers [k*ticks, (k+1)*ticks).
+
+    Returns:
+        Tuple: (bucket start times, column means, samples per bucket).
+    """
+    if times.size == 0:
+        return times.astype(np.int64), {name: np.zeros(0, np.float32) for name in columns}, np.zeros(0, np.int64)
+    keys = times // ticks
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    counts = np.diff(np.r_[starts, times.size])
+    means = {
+        name: (np.add.reduceat(values.astype(np.float64), starts) / counts).astype(np.float32)
+        for name, values in columns.items()
+    }
+    return keys[starts] * ticks, means, counts
+
+
+def _select(samples: Tuple[np.ndarray, Dict[str, np.ndarray]], lo: int, hi: int):
+    """Restrict (times, columns) to lo <= time <= hi."""
+    times, columns = samples
+    i, j = np.searchsorted(times, lo, side="left"), np.searchsorted(times, hi, side="right")
+    return times[i:j], {name: column[i:j] for name, column in columns.items()}
+
+
+class _Ring:
+    """Fixed-capacity columnar ring buffer of (time, values) samples."""
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.times = np.zeros(capacity, dtype=np.int64)
+        self.columns: Dict[str, np.ndarray] = {}
+        self.start = 0
+        self.count = 0
+
+    def append(self, time: int, values: Dict[str, float]):
+        if self.count < self.capacity:
+            pos = (self.start + self.count) % self.capacity
+            self.count += 1
+        else:
+            pos = self.start
+            self.start = (self.start + 1) % self.capacity
+        self.times[pos] = time
+        for name in values.keys() - self.columns.keys():
+            self.columns[name] = np.zeros(self.capacity, dtype=np.float32)
+        for name, column in self.columns.items():
+            column[pos] = values.get(name, 0.0)
+
+    def _order(self) -> np.ndarray:
+        return (self.start + np.arange(self.count)) % self.capacity
+
+    def first_time(self) -> Optional[int]:
+        return int(self.times[self.start]) if self.count else None
+
+    def ordered(self, names: Sequence[str]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Samples oldest first."""
+        order = self._order()
+        zeros = np.zeros(self.count, dtype=np.float32)
+        return self.times[order], {n: self.columns[n][order] if n in self.columns else zeros for n in names}
+
+    def drop_from(self, time: int):
+        """Drop the newest samples, those at or after `time`."""
+        times = self.times[self._order()]
+        self.count = int(np.searchsorted(times, time, side="left"))
+
+    def clear(self):
+        self.columns = {}
+        self.start = 0
+        self.count = 0
+
+
+class _Tier:
+    """A downsampled resolution: bucket means kept in a ring, plus the open bucket."""
+    def __init__(self, ticks: int, capacity: int):
+        self.ticks = ticks
+        self.ring = _Ring(capacity)
+        self._bucket: Optional[int] = None
+        self._sums: Dict[str, float] = {}
+        self._samples = 0
+
+    def add(self, time: int, values: Dict[str, float], samples: int = 1):
+        """Accumulate a sample (or the mean of `samples` samples)."""
+        bucket = time // self.ticks
+        if self._bucket is not None and bucket != self._bucket:
+            self._close_bucket()
+        self._bucket = bucket
+        for name, value in values.items():
+            self._sums[name] = self._sums.get(name, 0.0) + value * samples
+        self._samples += samples
+
+    def _close_bucket(self):
+        self.ring.append(self._bucket * self.ticks, self._means())
+        self._sums = {}
+        self._samples = 0
+
+    def _means(self) -> Dict[str, float]:
+        return {name: total / self._samples for name, total in self._sums.items()}
+
+    def first_time(self) -> Optional[int]:
+        first = self.ring.first_time()
+        if first is None and self._bucket is not None:
+            first = self._bucket * self.ticks
+        return first
+
+    def ordered(self, names: Sequence[str]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Closed buckets plus the open one (mean so far), oldest first."""
+        times, columns = self.ring.ordered(names)
+        if self._samples:
+            means = self._means()
+            times = np.append(times, self._bucket * self.ticks)
+            columns = {n: np.append(c, np.float32(means.get(n, 0.0))) for n, c in columns.items()}
+        return times, columns
+
+    def drop_from(self, time: int):
+        """Drop buckets starting at or after `time`, and the open bucket."""
+        self.ring.drop_from(time)
+        self._bucket = None
+        self._sums = {}
+        self._samples = 0
+
+    def clear(self):
+        self.ring.clear()
+        self._bucket = None
+        self._sums = {}
+        self._samples = 0
+
+
+class _ColumnLog:
+    """
+    Append-only columnar log in a directory: `time.i64` plus one `col_<i>.f32`
+    per column (raw little-endian arrays) and `columns.json` naming them.
+    Read back through memory maps, so range queries do not load the file.
+    """
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.columns: List[str] = []
+        meta = self._path("columns.json")
+        if os.path.exists(meta):
+            with open(meta) as f:
+                self.columns = json.load(f)["columns"]
+        files = [self._path("time.i64")] + [self._column_path(i) for i in range(len(self.columns))]
+        itemsizes = [8] + [4] * len(self.columns)
+        # A crash may leave columns of different lengths; keep the common prefix
+        self.length = min(os.path.getsize(p) // size if os.path.exists(p) else 0
+                          for p, size in zip(files, itemsizes))
+        for path, size in zip(files, itemsizes):
+            with open(path, "ab") as f:
+                f.truncate(self.length * size)
+        self._handles = [open(path, "ab") for path in files]
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _column_path(self, index: int) -> str:
+        return self._path(f"col_{index}.f32")
+
+    def _add_column(self, name: str):
+        path = self._column_path(len(self.columns))
+        with open(path, "wb") as f:
+            f.write(np.zeros(self.length, dtype="<f4").tobytes())
+        self.columns.append(name)
+        self._handles.append(open(path, "ab"))
+        with open(self._path("columns.json"), "w") as f:
+            json.dump({"columns": self.columns}, f)
+
+    def append(self, time: int, values: Dict[str, float]):
+        for name in values:
+            if name not in self.columns:
+                self._add_column(name)
+        self._handles[0].write(np.int64(time).astype("<i8").tobytes())
+        row = np.array([values.get(name, 0.0) for name in self.columns], dtype="<f4")
+        for handle, value in zip(self._handles[1:], row):
+            handle.write(value.tobytes())
+        self.length += 1
+
+    def flush(self):
+        for handle in self._handles:
+            handle.flush()
+
+    def read(self, names: Sequence[str]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Memory-mapped (time, columns) views of the whole log."""
+        self.flush()
+        if self.length == 0:
+            return np.zeros(0, np.int64), {name: np.zeros(0, np.float32) for name in names}
+        times = np.memmap(self._path("time.i64"), dtype="<i8", mode="r", shape=(self.length,))
+        columns = {}
+        for name in names:
+            if name in self.columns:
+                columns[name] = np.memmap(self._column_path(self.columns.index(name)), dtype="<f4",
+                                          mode="r", shape=(self.length,))
+            else:
+                columns[name] = np.zeros(self.length, dtype=np.float32)
+        return times, columns
+
+    def count_before(self, time: int) -> int:
+        """Number of records older than `time`."""
+        times, _ = self.read(())
+        return int(np.searchsorted(times, time, side="left"))
+
+    def truncate(self, length: int):
+        """Keep the first `length` records."""
+        self.flush()
+        for handle, size in zip(self._handles, [8] + [4] * len(self.columns)):
+            handle.truncate(length * size)
+        self.length = length
+
+    def close(self):
+        for handle in self._handles:
+            handle.close()
+        self._handles = []
+
+
+class StatsHistory:
+    """
+    Population statistics over time, with bounded memory.
+
+    Records are dicts with a "time" (total ticks) and numeric columns (one
+    per species). Three stores are fed on every `append`:
+
+    - a fixed-size ring buffer of full-resolution records (the hot window),
+    - downsampled tiers (bucket means, e.g. per minute and per hour),
+    - optionally, an append-only columnar log in `directory` holding the
+      full-resolution history; it survives restarts and is re-read into the
+      ring and tiers when reopened. The log belongs to this object: `rewind`
+      and `clear` truncate it, so two live histories must not share a
+      directory. A directory that does not exist yet is created by the
+      first record.
+
+    The object also behaves like the list of recent records it replaces
+    (`len`, indexing, iteration over the ring buffer).
+
+    Attributes:
+        capacity (int): Records kept at full resolution in memory.
+        tiers (List[_Tier]): Downsampled resolutions, finest first.
+        directory (Optional[str]): Location of the columnar log (None = memory only).
+    """
+    def __init__(self, capacity: int = config.STATS_HISTORY_CAPACITY,
+                 tiers: Sequence[Tuple[int, int]] = config.STATS_HISTORY_TIERS,
+                 directory: Optional[str] = None):
+        self.capacity = capacity
+        self.ring = _Ring(capacity)
+        self.tiers = [_Tier(ticks, size) for ticks, size in tiers]
+        self.directory = directory
+        self._log = _ColumnLog(directory) if directory and os.path.isdir(directory) else None
+        self._first_time: Optional[int] = None
+        self._last_time: Optional[int] = None
+        if self._log is not None and self._log.length:
+            self._restore()
+
+    def _restore(self):
+        """Rebuild the ring and tiers from the log."""
+        times, columns = self._log.read(self._log.columns)
+        self._first_time, self._last_time = int(times[0]), int(times[-1])
+        tail = max(0, times.size - self.capacity)
+        recent = {name: column[tail:].tolist() for name, column in columns.items()}
+        for i, time in enumerate(times[tail:].tolist()):
+            self.ring.append(time, {name: values[i] for name, values in recent.items()})
+        for tier in self.tiers:
+            starts, means, counts = bucket_means(times, columns, tier.ticks)
+            for i in range(max(0, starts.size - tier.ring.capacity - 1), starts.size):
+                tier.add(int(starts[i]), {n: float(m[i]) for n, m in means.items()}, int(counts[i]))
+
+    @property
+    def columns(self) -> List[str]:
+        """Every column name recorded so far."""
+        names = dict.fromkeys(self._log.columns if self._log is not None else [])
+        names.update(dict.fromkeys(self.ring.columns))
+        for tier in self.tiers:
+            names.update(dict.fromkeys(tier.ring.columns))
+            names.update(dict.fromkeys(tier._sums))
+        return list(names)
+
+    def append(self, record: Dict[str, Any]):
+        """
+        Add one record.
+
+        Times are expected to increase: when the simulation goes back in
+        time, `rewind` it first (Environment does on reset and load).
+        Out-of-order records are kept as given.
+
+        Args:
+            record (Dict[str, Any]): {"time": ticks, column: value, ...}.
+        """
+        time = int(record[TIME])
+        values = {name: float(value) for name, value in record.items() if name != TIME}
+        self.ring.append(time, values)
+        for tier in self.tiers:
+            tier.add(time, values)
+        if self._log is None and self.directory:
+            self._log = _ColumnLog(self.directory)
+        if self._log is not None:
+            self._log.append(time, values)
+        if self._first_time is None:
+            self._first_time = time
+        self._last_time = time
+
+    @property
+    def last_time(self) -> Optional[int]:
+        """Time of the latest record (None if there is none)."""
+        return self._last_time
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def __len__(self) -> int:
+        return self.ring.count
+
+    def _record(self, pos: int) -> Dict[str, Any]:
+        record = {TIME: int(self.ring.times[pos])}
+        for name, column in self.ring.columns.items():
+            value = float(column[pos])
+            record[name] = int(value) if value.is_integer() else value
+        return record
+
+    def __getitem__(self, index):
+        positions = (self.ring.start + np.arange(self.ring.count)) % max(self.capacity, 1)
+        if isinstance(index, slice):
+            return [self._record(pos) for pos in positions[index].tolist()]
+        return self._record(int(positions[index]))
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def rewind(self, time: int):
+        """
+        Drop every record at or after `time`, including from the log.
+
+        With a log the ring and tiers are rebuilt from it; without one,
+        tier buckets starting before `time` are kept as they are.
+        """
+        if self._log is not None:
+            self._log.truncate(self._log.count_before(time))
+            self.ring.clear()
+            for tier in self.tiers:
+                tier.clear()
+            self._first_time = self._last_time = None
+            if self._log.length:
+                self._restore()
+            return
+        self.ring.drop_from(time)
+        for tier in self.tiers:
+            tier.drop_from(time)
+        if self.ring.count:
+            self._last_time = int(self.ring.ordered(())[0][-1])
+        else:
+            self._first_time = self._last_time = None
+
+    def clear(self):
+        """Drop all history, including the on-disk log."""
+        self.ring.clear()
+        for tier in self.tiers:
+            tier.clear()
+        if self._log is not None:
+            self._log.truncate(0)
+        self._first_time = self._last_time = None
+
+    def flush(self):
+        if self._log is not None:
+            self._log.flush()
+
+    def close(self):
+        """Close the log; later records are kept in memory only."""
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        self.directory = None
+
+    def _sources(self):
+        """(name, first time, reader) from finest to coarsest resolution."""
+        sources = [("ring", self.ring.first_time(), self.ring.ordered)]
+        if self._log is not None:
+            sources.append(("log", self._first_time, self._log.read))
+        for tier in self.tiers:
+            sources.append((f"tier_{tier.ticks}", tier.first_time(), tier.ordered))
+        return sources
+
+    def query(self, start: Optional[int] = None, end: Optional[int] = None,
+              columns: Optional[Sequence[str]] = None, points: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Read history for a tick range.
+
+        Picks the coarsest store that covers the range with at least
+        `points` samples (the finest covering store without `points`), then
+        averages down to at most `points` samples.
+
+        Args:
+            start (Optional[int]): First tick (inclusive, None = beginning).
+            end (Optional[int]): Last tick (inclusive, None = latest).
+            columns (Optional[Sequence[str]]): Columns to return (None = all).
+            points (Optional[int]): Maximum number of samples to return.
+
+        Returns:
+            Dict[str, Any]: {"source": store name, "time": np.ndarray,
+            "columns": {name: np.ndarray}}.
+        """
+        names = list(columns) if columns is not None else self.columns
+        if self._first_time is None:
+            return {"source": "ring", TIME: np.zeros(0, np.int64),
+                    "columns": {name: np.zeros(0, np.float32) for name in names}}
+        lo = self._first_time if start is None else max(start, self._first_time)
+        hi = self._last_time if end is None else end
+
+        covering = [s for s in self._sources() if s[1] is not None and s[1] <= lo]
+        if not covering:
+            covering = [self._sources()[-1]]
+        chosen = None
+        for source, _, reader in reversed(covering) if points else ():
+            times, data = _select(reader(names), lo, hi)
+            if times.size >= points:
+                chosen = source
+                break
+        if chosen is None:
+            chosen = covering[0][0]
+            times, data = _select(covering[0][2](names), lo, hi)
+
+        if points and times.size > points:
+            origin = int(times[0])
+            width = -(-(int(times[-1]) - origin + 1) // points)
+            times, data, _ = bucket_means(times - origin, data, width)
+            times = times + origin
+        # Copies, so results stay valid if the log is truncated later
+        return {"source": chosen, TIME: np.array(times, dtype=np.int64),
+                "columns": {n: np.array(c, dtype=np.float32) for n, c in data.items()}}
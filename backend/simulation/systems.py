@@ -0,0 +1,178 @@
+from typing import Tuple, List, Optional, Callable
+import time
+import numpy as np
+from .components import Component, Locomotion, Growth, Photosynthesis, Heterotrophy
+from .agent_store import AgentStore
+
+# Component types whose per-agent update() is replaced by MetabolismSystem.
+# Exact types only: subclasses may override update() and keep the object path.
+VECTORIZED_COMPONENTS: Tuple[type, ...] = (Growth, Photosynthesis, Heterotrophy)
+
+# Base-class update() implementations that do nothing (e.g. StaticMovement)
+_NOOP_UPDATES = (Component.update, Locomotion.update)
+
+
+class MetabolismSystem:
+    """
+    System-level pass updating Growth, Photosynthesis and Heterotrophy for all
+    agents at once with NumPy column operations.
+
+    Reproduces the per-object `update()` arithmetic exactly (same float64
+    operations), in the order the species configs list them: Growth, then
+    Photosynthesis / Heterotrophy. Parameters are read from the AgentStore
+    parameter columns published by `Component.bind_store`.
+
+    Attributes:
+        store (AgentStore): The columnar store holding the agents.
+    """
+    def __init__(self, store: AgentStore):
+        self.store = store
+        # Row -> (agent, pre updates, post updates); see _plan()
+        self._plans: List[Optional[tuple]] = []
+
+    def update_agents(self, environment: 'Environment', profiler: Optional['TickProfiler'] = None):
+        """
+        Phased update of every attached agent.
+
+        Each agent's components are split around the vectorized block:
+        components listed before it run per object first, then this system
+        updates every agent at once, then the remaining components run per
+        object. This keeps the per-agent component order of the object path
+        (movement, growth/metabolism, reproduction), but not its interleaving
+        across agents: every agent moves (and eats) before any agent's
+        metabolism, and every agent's metabolism runs before any reproduction.
+        Per-agent arithmetic is unchanged; a tick differs from the object path
+        only where agents interact within it:
+
+        - An agent eaten this tick never reproduces in it, while in the object
+          path a prey updated before its predator may reproduce first.
+        - Agents that starve this tick stay visible as targets until the
+          metabolism pass, instead of disappearing before the agents after
+          them in update order move.
+        - Reproduction crowding checks see the population after all eating.
+
+        Without such interactions (e.g. predators eating plants that are
+        below their reproduction threshold) both paths give identical
+        trajectories.
+
+        Args:
+            environment (Environment): The simulation environment.
+            profiler (Optional[TickProfiler]): Times each component class and
+                the system pass ("system.metabolism") when given.
+        """
+        if profiler is not None:
+            self._update_agents_profiled(environment, profiler)
+            return
+
+        alive = self.store.alive
+        for agent in environment.agents:
+            row = agent._row
+            if alive.item(row):
+                for update in self._plan(row)[1]:
+                    update(environment)
+
+        self.update(environment)
+
+        for agent in environment.agents:
+            row = agent._row
+            if alive.item(row):
+                for update in self._plan(row)[2]:
+                    update(environment)
+
+    def _update_agents_profiled(self, environment: 'Environment', profiler: 'TickProfiler'):
+        perf_counter = time.perf_counter
+        alive = self.store.alive
+        for phase in (1, 2):
+            if phase == 2:
+                start = perf_counter()
+                self.update(environment)
+                profiler.record("system.metabolism", perf_counter() - start)
+            for agent in environment.agents:
+                row = agent._row
+                if alive.item(row):
+                    for update in self._plan(row)[phase]:
+                        start = perf_counter()
+                        update(environment)
+                        profiler.record("component." + update.__self__.__class__.__name__,
+                                        perf_counter() - start)
+
+    def _plan(self, row: int) -> tuple:
+        """Return the cached (agent, pre, post) bound update methods for a row."""
+        if row >= len(self._plans):
+            self._plans.extend([None] * (self.store.capacity - len(self._plans)))
+        agent = self.store.agents[row]
+        plan = self._plans[row]
+        if plan is None or plan[0] is not agent:
+            pre: List[Callable] = []
+            post: List[Callable] = []
+            target = pre
+            for component in agent.components:
+                if type(component) in VECTORIZED_COMPONENTS:
+                    target = post
+                elif type(component).update not in _NOOP_UPDATES:
+                    target.append(component.update)
+            plan = (agent, pre, post)
+            self._plans[row] = plan
+        return plan
+
+    def update(self, environment: 'Environment'):
+        """
+        Run the three component passes over every live agent.
+
+        Args:
+            environment (Environment): The simulation environment.
+        """
+        self._update_growth()
+        self._update_photosynthesis(environment.light_level)
+        self._update_heterotrophy(environment)
+
+    def _rows_with(self, param: str) -> np.ndarray:
+        store = self.store
+        column = store.params.get(param)
+        if column is None:
+            return np.zeros(0, dtype=np.intp)
+        end = store.end
+        return np.flatnonzero(store.alive[:end] & ~np.isnan(column[:end]))
+
+    def _update_growth(self):
+        store = self.store
+        rows = self._rows_with("growth.rate")
+        if rows.size == 0:
+            return
+        rate = store.params["growth.rate"][rows]
+        max_size = store.params["growth.max_size"][rows]
+        cost = store.params["growth.energy_cost"][rows]
+        size = store.size[rows]
+        energy = np.nan_to_num(store.energy[rows], nan=0.0)
+
+        grows = (size < max_size) & ~((cost > 0) & (energy < cost))
+        rows = rows[grows]
+        store.size[rows] = np.minimum(max_size[grows], size[grows] + rate[grows])
+
+        paying = cost[grows] > 0
+        store.energy[rows[paying]] -= cost[grows][paying]
+
+    def _update_photosynthesis(self, light_level: float):
+        if light_level <= 0.3:
+            return
+        store = self.store
+        rows = self._rows_with("photosynthesis.rate")
+        if rows.size == 0:
+            return
+        gain = store.params["photosynthesis.rate"][rows] * light_level
+        store.energy[rows] = np.minimum(store.max_energy[rows], store.energy[rows] + gain)
+
+    def _update_heterotrophy(self, environment: 'Environment'):
+        store = self.store
+        rows = self._rows_with("heterotrophy.decay_rate")
+        if rows.size == 0:
+            return
+        decay = store.params["heterotrophy.decay_rate"][rows]
+        store.energy[rows] -= decay
+        store.hunger[rows] += decay
+
+        dead = rows[(store.energy[rows] <= 0) | (store.hunger[rows] >= 100)]
+        for row in dead.tolist():
+            agent = store.agents[row]
+            agent.alive = False  # Through the setter: keeps PopulationCounters in sync
+            environment.remove_agent(agent.id)
@@ -0,0 +1,173 @@
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+from .agents import Agent
+from .components import TargetedMovement, CompiledCriteria
+
+try:  # Optional: a real KD-tree when SciPy is installed
+    from scipy.spatial import cKDTree
+except ImportError:  # pragma: no cover - exercised when SciPy is absent
+    cKDTree = None
+
+# Queriers per brute-force distance block in the NumPy fallback
+_BRUTE_FORCE_CHUNK = 256
+
+
+class _TargetBatch:
+    """
+    Targets matching one criteria set, plus the answers to every hungry
+    TargetedMovement agent's nearest-target query, computed in one call.
+    """
+    def __init__(self, targets: List[Agent]):
+        self.targets = targets
+        self.positions = np.array([(t.x, t.y) for t in targets], dtype=float).reshape(-1, 2)
+        self.tree = cKDTree(self.positions) if cKDTree is not None and targets else None
+        # Querier id -> index into targets (-1 = nothing within radius)
+        self.answers: Dict[Any, int] = {}
+
+    def solve(self, queriers: List[Agent], radii: np.ndarray):
+        """Answer all queriers' nearest-target lookups at once."""
+        if not queriers:
+            return
+        points = np.array([(q.x, q.y) for q in queriers], dtype=float)
+        if not self.targets:
+            nearest = np.full(len(queriers), -1)
+        elif self.tree is not None:
+            nearest = self._solve_tree(queriers, points, radii)
+        else:
+            nearest = self._solve_brute_force(queriers, points, radii)
+        for querier, index in zip(queriers, nearest.tolist()):
+            self.answers[querier.id] = index
+
+    def _self_index(self, queriers: List[Agent]) -> np.ndarray:
+        """Index of each querier inside targets (-1 if it is not a target itself)."""
+        position = {id(t): i for i, t in enumerate(self.targets)}
+        return np.array([position.get(id(q), -1) for q in queriers])
+
+    def _solve_tree(self, queriers, points, radii) -> np.ndarray:
+        n = len(self.targets)
+        k = min(2, n)
+        dist, idx = self.tree.query(points, k=k, distance_upper_bound=float(radii.max()))
+        dist, idx = dist.reshape(len(points), k), idx.reshape(len(points), k)
+        # Skip the querier itself when it matches its own criteria
+        first_is_self = idx[:, 0] == self._self_index(queriers)
+        if k == 1:
+            best_idx, best_dist = idx[:, 0], dist[:, 0]
+            valid = ~first_is_self
+        else:
+            best_idx = np.where(first_is_self, idx[:, 1], idx[:, 0])
+            best_dist = np.where(first_is_self, dist[:, 1], dist[:, 0])
+            valid = np.ones(len(points), dtype=bool)
+        valid &= (best_idx < n) & (best_dist <= radii)
+        return np.where(valid, best_idx, -1)
+
+    def _solve_brute_force(self, queriers, points, radii) -> np.ndarray:
+        self_idx = self._self_index(queriers)
+        nearest = np.full(len(points), -1)
+        for start in range(0, len(points), _BRUTE_FORCE_CHUNK):
+            stop = start + _BRUTE_FORCE_CHUNK
+            delta = points[start:stop, None, :] - self.positions[None, :, :]
+            d2 = np.einsum("ijk,ijk->ij", delta, delta)
+            rows = np.arange(d2.shape[0])
+            own = self_idx[start:stop]
+            d2[rows[own >= 0], own[own >= 0]] = np.inf
+            best = d2.argmin(axis=1)
+            ok = d2[rows, best] <= radii[start:stop] ** 2
+            nearest[start:stop] = np.where(ok, best, -1)
+        return nearest
+
+    def query_one(self, agent: Agent, radius: float) -> Optional[Agent]:
+        """Nearest live target within radius of one agent (slow path)."""
+        if not self.targets:
+            return None
+        delta = self.positions - (agent.x, agent.y)
+        d2 = np.einsum("ij,ij->i", delta, delta)
+        within = np.flatnonzero(d2 <= radius * radius)
+        for i in within[np.argsort(d2[within], kind="stable")].tolist():
+            target = self.targets[i]
+            if target.alive and target is not agent:
+                return target
+        return None
+
+
+class TargetIndex:
+    """
+    Batched nearest-matching-target queries for TargetedMovement.
+
+    On the first lookup for a criteria set in a tick, the matching targets are
+    indexed once (KD-tree when SciPy is available, chunked NumPy distance
+    blocks otherwise) and every hungry TargetedMovement agent with that
+    criteria gets its answer from a single vectorized call. Later lookups in
+    the same tick are dictionary hits; if the precomputed target was eaten in
+    the meantime, only that agent falls back to a single query.
+
+    Target positions are snapshotted at build time, which is exact for static
+    prey (plants) and approximate within one tick for mobile prey.
+    """
+    def __init__(self, environment: 'Environment'):
+        self.environment = environment
+        self._tick = None
+        self._batches: Dict[Tuple, _TargetBatch] = {}
+
+    def find(self, agent: Agent, criteria: CompiledCriteria, radius: float) -> Tuple[Optional[Agent], float]:
+        """
+        Find the nearest live agent matching criteria within radius.
+
+        Args:
+            agent (Agent): The searching agent.
+            criteria (CompiledCriteria): Compiled TargetedMovement criteria.
+            radius (float): Search radius.
+
+        Returns:
+            Tuple[Optional[Agent], float]: The target (or None) and its distance.
+        """
+        if self._tick != self.environment.total_ticks:
+            self._tick = self.environment.total_ticks
+            self._batches = {}
+
+        batch = self._batches.get(criteria.key)
+        if batch is None:
+            batch = self._build(criteria)
+            self._batches[criteria.key] = batch
+
+        index = batch.answers.get(agent.id)
+        if index is None:
+            target = batch.query_one(agent, radius)
+        elif index < 0:
+            target = None
+        else:
+            target = batch.targets[index]
+            if not target.alive:
+                target = batch.query_one(agent, radius)
+
+        if target is None:
+            return None, float('inf')
+        dist = ((target.x - agent.x)**2 + (target.y - agent.y)**2)**0.5
+        return target, dist
+
+    def _build(self, criteria: CompiledCriteria) -> _TargetBatch:
+        store = self.environment.store
+        # Pure capability criteria on a columnar store: one bitmask test over the tags column
+        vectorized = store is not None and not criteria.state_items
+        if vectorized:
+            end = store.end
+            rows = np.flatnonzero(store.alive[:end] & (store.tags[:end] & criteria.mask == criteria.mask))
+            targets = [store.agents[row] for row in rows.tolist()]
+        else:
+            targets = []
+
+        queriers = []
+        radii = []
+        for other in self.environment.agents:
+            if not other.alive:
+                continue
+            if not vectorized and criteria.matches(other):
+                targets.append(other)
+            movement = other.get_component(TargetedMovement)
+            if (movement is not None and other.state.get("hunger", 0) > 20
+                    and movement.compiled_criteria.key == criteria.key):
+                queriers.append(other)
+                radii.append(other.state.get("vision_radius", 100))
+
+        batch = _TargetBatch(targets)
+        batch.solve(queriers, np.array(radii, dtype=float))
+        return batch
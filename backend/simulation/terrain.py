@@ -0,0 +1,175 @@
+from typing import Any, List, Optional, Tuple, Union
+import numpy as np
+import config
+
+# Habitat codes used by the batched checks (index into TerrainMap.masks)
+HABITAT_NONE = 0  # No habitat constraint
+HABITAT_CODES = {
+    config.HABITAT_AQUATIC: 1,
+    config.HABITAT_TERRESTRIAL: 2,
+    config.HABITAT_AMPHIBIOUS: 3,
+}
+
+
+def habitat_code(habitat: Optional[str]) -> int:
+    """Code of a habitat name (unknown or missing habitats are unconstrained)."""
+    return HABITAT_CODES.get(habitat, HABITAT_NONE)
+
+
+class TerrainMap:
+    """
+    The terrain raster: one uint8 terrain type (config.TERRAIN_*) per cell.
+
+    Keeps a boolean passability mask per habitat code, rebuilt whenever the
+    cells change, so checking a position is one clamped array lookup and
+    checking N positions is one fancy-indexing call (`validate_positions`).
+
+    Attributes:
+        cells (np.ndarray): uint8 terrain types, shape (grid_height, grid_width).
+        masks (np.ndarray): bool, shape (len(HABITAT_CODES) + 1, grid_height,
+            grid_width); masks[code] is True where that habitat may stand.
+        version (int): Bumped whenever the cells are replaced or edited.
+    """
+    def __init__(self, grid_width: int, grid_height: int, fill: int = config.TERRAIN_SOIL):
+        self.version = 0
+        self._list = None
+        self._list_version = None
+        self.set(np.full((grid_height, grid_width), fill, dtype=np.uint8))
+
+    @property
+    def grid_width(self) -> int:
+        return self.cells.shape[1]
+
+    @property
+    def grid_height(self) -> int:
+        return self.cells.shape[0]
+
+    def set(self, cells: Union[np.ndarray, List[List[int]]]):
+        """
+        Replace the whole raster.
+
+        Args:
+            cells (Union[np.ndarray, List[List[int]]]): Terrain types, [y][x].
+        """
+        cells = np.array(cells, dtype=np.uint8)
+        self.cells = cells if cells.ndim == 2 else cells.reshape(len(cells), -1 if cells.size else 0)
+        self._rebuild_masks()
+
+    def set_cell(self, grid_x: int, grid_y: int, terrain_type: int):
+        """Change the terrain type of one cell."""
+        self.cells[grid_y, grid_x] = terrain_type
+        self._rebuild_masks()
+
+    def _rebuild_masks(self):
+        water = self.cells == config.TERRAIN_WATER
+        masks = np.ones((len(HABITAT_CODES) + 1,) + self.cells.shape, dtype=bool)
+        masks[HABITAT_CODES[config.HABITAT_AQUATIC]] = water
+        masks[HABITAT_CODES[config.HABITAT_TERRESTRIAL]] = ~water
+        self.masks = masks
+        self.version += 1
+
+    def to_list(self) -> List[List[int]]:
+        """The raster as nested lists (cached until the next change; do not mutate)."""
+        if self._list_version != self.version:
+            self._list = self.cells.tolist()
+            self._list_version = self.version
+        return self._list
+
+    def _cell(self, x: float, y: float):
+        grid_x = int(x // config.TERRAIN_GRID_SIZE)
+        grid_y = int(y // config.TERRAIN_GRID_SIZE)
+        height, width = self.cells.shape
+        if grid_x < 0:
+            grid_x = 0
+        elif grid_x >= width:
+            grid_x = width - 1
+        if grid_y < 0:
+            grid_y = 0
+        elif grid_y >= height:
+            grid_y = height - 1
+        return grid_y, grid_x
+
+    def type_at(self, x: float, y: float) -> int:
+        """Terrain type at pixel coordinates (clamped to the raster)."""
+        return self.cells.item(self._cell(x, y))
+
+    def is_passable(self, habitat: Optional[str], x: float, y: float) -> bool:
+        """
+        Whether an agent of `habitat` may stand at pixel coordinates (x, y).
+
+        Args:
+            habitat (Optional[str]): config.HABITAT_* name (None = unconstrained).
+            x (float): X coordinate.
+            y (float): Y coordinate.
+
+        Returns:
+            bool: True if the terrain there suits the habitat.
+        """
+        code = HABITAT_CODES.get(habitat, HABITAT_NONE)
+        if code == HABITAT_NONE:
+            return True
+        return self.masks[code].item(self._cell(x, y))
+
+    def validate_positions(self, habitats: Any, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """
+        Batched `is_passable` for N candidate positions.
+
+        Args:
+            habitats (Any): One habitat name (or None) for every position, or
+                an integer array of habitat codes (see `habitat_code`), one
+                per position.
+            xs (np.ndarray): X coordinates, shape (N,).
+            ys (np.ndarray): Y coordinates, shape (N,).
+
+        Returns:
+            np.ndarray: bool, shape (N,); True where the position is valid.
+        """
+        height, width = self.cells.shape
+        grid_x = np.clip(np.floor_divide(xs, config.TERRAIN_GRID_SIZE).astype(np.int64), 0, width - 1)
+        grid_y = np.clip(np.floor_divide(ys, config.TERRAIN_GRID_SIZE).astype(np.int64), 0, height - 1)
+        if habitats is None or isinstance(habitats, str):
+            return self.masks[habitat_code(habitats)][grid_y, grid_x]
+        return self.masks[np.asarray(habitats, dtype=np.int64), grid_y, grid_x]
+
+    def sample_positions(self, habitat: Optional[str], draws: np.ndarray,
+                         region: Tuple[float, float, float, float]) -> Optional[np.ndarray]:
+        """
+        Map uniform draws to positions spread uniformly over the part of
+        `region` where `habitat` is passable.
+
+        Each position picks a passable cell with probability proportional to
+        its overlap with the region, then a uniform point inside that overlap.
+        Positions beyond the raster belong to its edge cells, as in `type_at`.
+
+        Args:
+            habitat (Optional[str]): config.HABITAT_* name (None = unconstrained).
+            draws (np.ndarray): Uniform [0, 1) draws, shape (N, 3).
+            region (Tuple[float, float, float, float]): (x_min, y_min, x_max, y_max).
+
+        Returns:
+            Optional[np.ndarray]: Positions, shape (N, 2); None if no passable
+            area intersects the region.
+        """
+        x_min, y_min, x_max, y_max = region
+        size = config.TERRAIN_GRID_SIZE
+        height, width = self.cells.shape
+
+        def overlaps(count, low, high):
+            edges = np.arange(count + 1, dtype=np.float64) * size
+            edges[0], edges[-1] = -np.inf, np.inf
+            lo = np.maximum(edges[:-1], low)
+            return lo, np.maximum(np.minimum(edges[1:], high) - lo, 0.0)
+
+        x_lo, x_span = overlaps(width, x_min, x_max)
+        y_lo, y_span = overlaps(height, y_min, y_max)
+        weights = (self.masks[habitat_code(habitat)] * np.outer(y_span, x_span)).ravel()
+        cumulative = np.cumsum(weights)
+        if cumulative.size == 0 or cumulative[-1] <= 0:
+            return None
+        cells = np.searchsorted(cumulative, draws[:, 0] * cumulative[-1], side="right")
+        cells = np.minimum(cells, cumulative.size - 1)
+        grid_y, grid_x = np.divmod(cells, width)
+        positions = np.empty((len(draws), 2))
+        positions[:, 0] = x_lo[grid_x] + draws[:, 1] * x_span[grid_x]
+        positions[:, 1] = y_lo[grid_y] + draws[:, 2] * y_span[grid_y]
+        return positions
@@ -0,0 +1,266 @@
+import itertools
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from typing import Dict, Any, Callable, Optional
+from .environment import Environment
+from .commands import apply_command
+from .stats_history import StatsHistory
+import config
+
+logger = logging.getLogger("SimulationWorker")
+
+
+def snapshot(environment: Environment, actual_tps: float, target_tps: float) -> Dict[str, Any]:
+    """
+    Build the broadcast snapshot (`get_state()` plus TPS telemetry).
+
+    The returned dict is never mutated afterwards, so it can be handed to
+    other threads or pickled to another process as is.
+    """
+    state = environment.get_state()
+    state["environment"]["actual_tps"] = actual_tps
+    state["environment"]["target_tps"] = target_tps
+    return state
+
+
+def profile_summary(environment: Environment) -> Dict[str, Any]:
+    """The environment's profiler state: {"enabled": bool, "phases": {name: stats}}."""
+    return {"enabled": environment.profiler.enabled, "phases": environment.profiler.summary()}
+
+
+def tick_loop(environment: Environment, commands, publish: Callable[[Dict[str, Any]], None],
+              stop, target_tps: float, publish_interval: float = config.BROADCAST_INTERVAL, replies=None):
+    """
+    Blocking simulation loop shared by the thread and process workers.
+
+    Each iteration drains the command queue, ticks the environment, and
+    publishes a snapshot at most every `publish_interval` seconds.
+
+    Args:
+        environment (Environment): The environment owned by the worker.
+        commands: Queue of command dicts (see commands.apply_command);
+            `{"type": "set_speed", ...}` changes the target TPS and
+            `{"type": "query_history", "id": ..., "payload": {...}}` answers
+            a StatsHistory.query() and `{"type": "query_profile", "id": ...}`
+            a TickProfiler summary on `replies`.
+        publish (Callable): Receives each new snapshot.
+        stop: threading/multiprocessing Event that ends the loop.
+        target_tps (float): Initial target ticks per second (0 = paused).
+        publish_interval (float): Minimum seconds between snapshots.
+        replies: Queue receiving `(id, result)` answers to queries.
+    """
+    try:
+        _run_ticks(environment, commands, publish, stop, target_tps, publish_interval, replies)
+    finally:
+        environment.close()
+
+
+def _run_ticks(environment, commands, publish, stop, target_tps, publish_interval, replies):
+    actual_tps = 0.0
+    last_publish = None
+    while not stop.is_set():
+        loop_start = time.perf_counter()
+
+        while True:
+            try:
+                command = commands.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                if command.get("type") == "set_speed":
+                    target_tps = float(command["payload"]["speed"])
+                elif command.get("type") == "query_history":
+                    replies.put((command["id"], environment.history.query(**command["payload"])))
+                elif command.get("type") == "query_profile":
+                    replies.put((command["id"], profile_summary(environment)))
+                else:
+                    apply_command(environment, command)
+            except Exception as e:
+                logger.error(f"Error applying command {command.get('type')}: {e}")
+
+        if target_tps > 0:
+            try:
+                environment.update()
+            except Exception as e:
+                logger.error(f"Error in simulation update: {e}")
+                import traceback
+                logger.error(traceback.format_exc())
+            frame_time = 1.0 / target_tps
+        else:
+            # Paused
+            frame_time = 0.1
+
+        now = time.perf_counter()
+        if last_publish is None or now - last_publish >= publish_interval:
+            publish(snapshot(environment, actual_tps, target_tps))
+            last_publish = now
+
+        sleep_time = frame_time - (time.perf_counter() - loop_start)
+        if sleep_time > 0:
+            stop.wait(sleep_time)
+
+        total_duration = time.perf_counter() - loop_start
+        actual_tps = 1.0 / total_duration if total_duration > 0 else 0.0
+
+
+_request_ids = itertools.count()
+
+
+def _request(commands, replies, lock: threading.Lock, kind: str, payload: Dict[str, Any], timeout: float):
+    """Send a query command to a worker's tick loop and wait for its answer."""
+    request_id = next(_request_ids)
+    with lock:
+        commands.put({"type": kind, "id": request_id, "payload": payload})
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"No answer to {kind} within {timeout}s")
+            try:
+                reply_id, result = replies.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            if reply_id == request_id:
+                return result
+            # Late answer to an earlier request that timed out
+
+
+class ThreadWorker:
+    """
+    Runs `tick_loop` in a daemon thread.
+
+    Snapshots are handed off by replacing a single attribute (an atomic
+    reference swap), so readers never block the simulation.
+
+    Attributes:
+        environment (Environment): The environment, owned by the worker thread
+            while it runs.
+        snapshot (Optional[Dict[str, Any]]): The latest published snapshot.
+    """
+    def __init__(self, environment: Environment, target_tps: float):
+        self.environment = environment
+        self.snapshot: Optional[Dict[str, Any]] = None
+        self._commands = queue.SimpleQueue()
+        self._replies = queue.SimpleQueue()
+        self._query_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=tick_loop, name="simulation-worker", daemon=True,
+            args=(environment, self._commands, self._publish, self._stop, target_tps),
+            kwargs={"replies": self._replies})
+
+    def _publish(self, state: Dict[str, Any]):
+        self.snapshot = state
+
+    def start(self):
+        self._thread.start()
+
+    def submit(self, command: Dict[str, Any]):
+        """Queue a command for the next tick."""
+        self._commands.put(command)
+
+    def query_history(self, timeout: float = 5.0, **params) -> Dict[str, Any]:
+        """Run `environment.history.query(**params)` on the worker thread, between ticks."""
+        return _request(self._commands, self._replies, self._query_lock, "query_history", params, timeout)
+
+    def query_profile(self, timeout: float = 5.0) -> Dict[str, Any]:
+        """Summarize the environment's profiler on the worker thread, between ticks."""
+        return _request(self._commands, self._replies, self._query_lock, "query_profile", {}, timeout)
+
+    def stop(self, timeout: float = 2.0):
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def is_alive(self) -> bool:
+        return self._thread.is_alive()
+
+
+def _process_main(environment_data, modes, history_directory, commands, snapshots, replies, stop, target_tps):
+    """Entry point of the worker process."""
+    logging.basicConfig(level=getattr(logging, config.LOG_LEVEL.upper(), logging.INFO))
+    environment = Environment(environment_data["width"], environment_data["height"], **modes)
+    # Continue the parent's stats log (the parent stops ticking)
+    environment.history = StatsHistory(directory=history_directory)
+    environment.from_dict(environment_data)
+    # Do not block process exit on snapshots the parent never read
+    snapshots.cancel_join_thread()
+
+    def publish(state):
+        try:
+            snapshots.put_nowait(state)
+        except queue.Full:
+            pass  # The parent still has an unread snapshot; skip this one
+
+    tick_loop(environment, commands, publish, stop, target_tps, replies=replies)
+
+
+class ProcessWorker:
+    """
+    Runs `tick_loop` in a separate process, so ticks do not compete with
+    the event loop for the GIL.
+
+    The process starts from a copy of the given environment (via
+    `to_dict`/`from_dict`) and takes its stats history log over; afterwards
+    the parent only sees snapshots, read
+    from a size-1 queue by a background thread, and sends commands over a
+    queue. The parent's environment object is not updated.
+
+    Attributes:
+        snapshot (Optional[Dict[str, Any]]): The latest received snapshot.
+    """
+    def __init__(self, environment: Environment, target_tps: float):
+        context = multiprocessing.get_context("spawn")
+        environment.history.flush()
+        self.snapshot: Optional[Dict[str, Any]] = None
+        self._commands = context.Queue()
+        self._snapshots = context.Queue(maxsize=1)
+        self._replies = context.Queue()
+        self._query_lock = threading.Lock()
+        self._stop = context.Event()
+        self._process = context.Process(
+            target=_process_main, name="simulation-worker", daemon=True,
+            args=(environment.to_dict(),
+                  {"columnar": environment.store is not None,
+                   "vectorized": environment.metabolism_system is not None,
+                   "parallel": environment.parallel_system is not None},
+                  environment.history.directory,
+                  self._commands, self._snapshots, self._replies, self._stop, target_tps))
+        self._reader = threading.Thread(target=self._read_snapshots, name="snapshot-reader", daemon=True)
+
+    def _read_snapshots(self):
+        while not self._stop.is_set():
+            try:
+                self.snapshot = self._snapshots.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+
+    def start(self):
+        self._process.start()
+        self._reader.start()
+
+    def submit(self, command: Dict[str, Any]):
+        """Queue a command for the worker's next tick."""
+        self._commands.put(command)
+
+    def query_history(self, timeout: float = 5.0, **params) -> Dict[str, Any]:
+        """Run `history.query(**params)` in the worker process, between ticks."""
+        return _request(self._commands, self._replies, self._query_lock, "query_history", params, timeout)
+
+    def query_profile(self, timeout: float = 5.0) -> Dict[str, Any]:
+        """Summarize the profiler in the worker process, between ticks."""
+        return _request(self._commands, self._replies, self._query_lock, "query_profile", {}, timeout)
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._process.join(timeout)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._reader.join(timeout)
+
+    def is_alive(self) -> bool:
+        return self._process.is_alive()
@@ -1,4 +1,13 @@
+import atexit
+import shutil
+import tempfile
 import pytest
+import config
+
+# Keep the server runner's stats log out of the source tree
+config.STATS_HISTORY_DIR = tempfile.mkdtemp(prefix="stats_history_")
+atexit.register(shutil.rmtree, config.STATS_HISTORY_DIR, True)
+
 from httpx import AsyncClient, ASGITransport
 from main import app
 
@@ -0,0 +1,87 @@
+import random
+import numpy as np
+from simulation import Environment
+from simulation.agent_store import AgentStore
+from simulation.factory import AgentFactory
+from simulation.headless import populate
+
+def test_attach_turns_agent_into_view():
+    store = AgentStore(capacity=2)
+    fern = AgentFactory.create("Fern", 10, 20)
+    expected = fern.to_dict()
+    row = store.attach(fern)
+
+    assert fern.to_dict() == expected
+    assert "hunger" not in fern.state
+
+    fern.x = 42.0
+    fern.state["energy"] = 55.0
+    fern.state["color"] = "#000000"
+    assert store.x[row] == 42.0
+    assert store.energy[row] == 55.0
+    assert fern.state.get("color") == "#000000"
+    assert store.species_names[store.species_id[row]] == "Fern"
+
+def test_store_grows_and_reuses_rows():
+    store = AgentStore(capacity=1)
+    agents = [AgentFactory.create("Frog", i, i) for i in range(5)]
+    for a in agents:
+        store.attach(a)
+    assert store.capacity >= 5
+    assert [a.x for a in agents] == [0, 1, 2, 3, 4]
+
+    freed_row = agents[2]._row
+    store.detach(agents[2])
+    assert agents[2].x == 2
+    assert agents[2].state["hunger"] == 0.0
+    assert len(store) == 4
+
+    new_agent = AgentFactory.create("Fern", 7, 7)
+    assert store.attach(new_agent) == freed_row
+    assert list(store.rows_for_species("Frog")) == sorted(a._row for a in agents if a is not agents[2])
+
+def test_attach_many_matches_repeated_attach():
+    stores = [AgentStore(capacity=2), AgentStore(capacity=2)]
+    for store in stores:
+        first = [AgentFactory.create("Frog", i, i) for i in range(4)]
+        for agent in first:
+            store.attach(agent)
+        store.detach(first[1])
+        store.detach(first[3])
+    batch = [AgentFactory.create(species, i, 2 * i) for i, species in enumerate(["Fern", "Frog", "Fish"] * 2)]
+    rows = stores[0].attach_many(batch)
+    single = [AgentFactory.create(species, i, 2 * i) for i, species in enumerate(["Fern", "Frog", "Fish"] * 2)]
+    assert list(rows) == [stores[1].attach(agent) for agent in single]
+    assert [a.to_dict()["state"] for a in batch] == [a.to_dict()["state"] for a in single]
+    columns = ["x", "y", "alive", "species_id", "tags", "energy", "hunger", "size", "max_energy"]
+    for store in stores:
+        assert store.count == 8
+    for name in columns:
+        assert np.array_equal(getattr(stores[0], name)[rows], getattr(stores[1], name)[rows], equal_nan=True)
+    assert stores[0].params.keys() == stores[1].params.keys()
+    for name, column in stores[0].params.items():
+        assert np.array_equal(column[rows], stores[1].params[name][rows], equal_nan=True)
+
+def test_columnar_environment_matches_dict_environment():
+    def run(columnar):
+        random.seed(11)
+        env = Environment(columnar=columnar)
+        populate(env, {"Fern": 60, "Frog": 8, "Fish": 4, "Lizard": 4})
+        for _ in range(200):
+            env.update()
+        return sorted((a.state["species"], round(a.x, 9), round(a.y, 9), round(a.state["energy"], 9)) for a in env.agents)
+
+    assert run(columnar=True) == run(columnar=False)
+
+def test_columnar_removal_detaches_agents():
+    env = Environment(100, 100, columnar=True)
+    fern = AgentFactory.create("Fern", 50, 50)
+    env.add_agent(fern)
+    env.update()
+    assert len(env.store) == 1
+
+    env.remove_agent(fern.id)
+    env.update()
+    assert len(env.store) == 0
+    assert fern._store is None
+    assert fern.state["species"] == "Fern"
@@ -0,0 +1,31 @@
+from benchmarks import bench_suite
+
+def test_population_for_splits_exactly():
+    counts = bench_suite.population_for(1001, bench_suite.MIXES["balanced"])
+    assert sum(counts.values()) == 1001
+    assert set(counts) == {"Fern", "Frog", "Fish", "Lizard"}
+
+def test_run_produces_records_per_benchmark():
+    results = bench_suite.run(sizes=[50], mixes=["balanced"], modes=["object"], ticks=2)
+    benchmarks = {r["benchmark"] for r in results}
+    assert benchmarks == set(bench_suite.BENCHMARKS)
+    tick = next(r for r in results if r["benchmark"] == "tick")
+    assert tick["params"] == {"population": 50, "mix": "balanced", "mode": "object"}
+    assert tick["metrics"]["ticks_per_second"] > 0
+    memory = [r for r in results if r["benchmark"] == "memory"]
+    assert {r["params"]["species"] for r in memory} == {"Fern", "Frog", "Fish", "Lizard"}
+    assert all(r["metrics"]["bytes_per_agent"] > 0 for r in memory)
+
+def test_compare_flags_regressions_by_direction():
+    def record(tps, ms):
+        return {"benchmark": "tick", "params": {"population": 10},
+                "metrics": {"ticks_per_second": tps, "tick_p50_ms": ms, "final_agents": 10}}
+
+    rows = bench_suite.compare([record(100.0, 10.0)], [record(80.0, 10.5)], threshold=0.15)
+    by_metric = {row["metric"]: row for row in rows}
+    assert set(by_metric) == {"ticks_per_second", "tick_p50_ms"}
+    assert by_metric["ticks_per_second"]["regression"]
+    assert not by_metric["tick_p50_ms"]["regression"]
+
+    faster = bench_suite.compare([record(100.0, 10.0)], [record(150.0, 5.0)])
+    assert not any(row["regression"] for row in faster)
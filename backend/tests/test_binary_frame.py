@@ -0,0 +1,67 @@
+import json
+import pytest
+from simulation import Environment
+from simulation.binary_frame import BinaryFrameEncoder, decode_frame
+from simulation.headless import populate
+
+def _env():
+    env = Environment()
+    populate(env, {"Fern": 40, "Frog": 5, "Fish": 5})
+    env.update()
+    return env
+
+def test_roundtrip_preserves_render_fields():
+    env = _env()
+    state = env.get_state()
+    decoded = decode_frame(BinaryFrameEncoder().encode(state))
+
+    assert decoded["environment"] == json.loads(json.dumps(state["environment"]))
+    assert len(decoded["agents"]) == len(state["agents"])
+    for original, agent in zip(state["agents"], decoded["agents"]):
+        assert agent["type"] == original["type"]
+        assert agent["state"]["species"] == original["state"]["species"]
+        assert agent["state"]["color"] == original["state"]["color"]
+        assert agent["state"]["size"] == pytest.approx(original["state"]["size"], rel=1e-6)
+        assert agent["position"]["x"] == pytest.approx(original["position"]["x"], rel=1e-6)
+
+def _state(ids):
+    agents = [{"id": i, "type": "plant", "position": {"x": 1.0, "y": 2.0},
+               "state": {"species": "Fern", "color": "#00ff00", "size": 3.0}} for i in ids]
+    return {"environment": {"terrain": []}, "agents": agents}
+
+def test_indices_are_stable_and_reused():
+    encoder = BinaryFrameEncoder()
+    first = [a["id"] for a in decode_frame(encoder.encode(_state(["a", "b", "c"])))["agents"]]
+    second = [a["id"] for a in decode_frame(encoder.encode(_state(["c", "d", "a"])))["agents"]]
+
+    assert first == [0, 1, 2]
+    assert second == [2, 1, 0]  # "d" takes over the index freed by "b"
+
+def test_terrain_is_optional_and_frame_is_compact():
+    env = _env()
+    state = env.get_state()
+    encoder = BinaryFrameEncoder()
+    keyframe = encoder.encode(state)
+    frame = encoder.encode(state, include_terrain=False)
+
+    view = decode_frame(keyframe)
+    assert decode_frame(frame, view)["environment"]["terrain"] == state["environment"]["terrain"]
+    state["environment"].pop("terrain")
+    assert len(frame) < len(json.dumps(state)) / 3
+
+def test_store_frames_match_snapshot_frames():
+    env = Environment(columnar=True, seed=4)
+    populate(env, {"Fern": 40, "Frog": 5, "Fish": 5})
+    encoder = BinaryFrameEncoder()
+    for tick in range(30):
+        env.update()
+        if tick == 20:
+            env.agents[0].state["color"] = "#123456"
+        from_store = decode_frame(encoder.encode(env.get_state(include_agents=False), environment=env))
+        from_dicts = decode_frame(BinaryFrameEncoder().encode(env.get_state()))
+        assert from_store["environment"] == from_dicts["environment"]
+        rows = sorted((a["type"], a["position"]["x"], a["position"]["y"], sorted(a["state"].items()))
+                      for a in from_store["agents"])
+        assert rows == sorted((a["type"], a["position"]["x"], a["position"]["y"], sorted(a["state"].items()))
+                              for a in from_dicts["agents"])
+    assert len({a["id"] for a in from_store["agents"]}) == len(env.agents)
@@ -0,0 +1,101 @@
+import json
+from simulation import Environment
+from simulation.broadcast import BroadcastHub
+from simulation.delta import apply_frame, PROTOCOL_FULL, PROTOCOL_DELTA
+from simulation.factory import AgentFactory
+
+def _hub():
+    env = Environment(200, 200)
+    env.add_agent(AgentFactory.create("Frog", 50, 50))
+    env.update()
+    calls = []
+    def provider():
+        calls.append(1)
+        return env.get_state()
+    return env, BroadcastHub(provider), calls
+
+async def test_one_snapshot_and_encoding_per_frame():
+    env, hub, calls = _hub()
+    subs = [hub.subscribe(PROTOCOL_FULL) for _ in range(5)]
+    hub.publish()
+    frames = [await s.get() for s in subs]
+    assert len(calls) == 1
+    assert all(f is frames[0] for f in frames)
+
+async def test_slow_client_is_coalesced_without_blocking_others():
+    env, hub, _ = _hub()
+    fast, slow = hub.subscribe(PROTOCOL_FULL), hub.subscribe(PROTOCOL_FULL)
+    for _ in range(3):
+        env.update()
+        hub.publish()
+        await fast.get()
+    assert slow.dropped == 2
+    assert json.loads(await slow.get())["environment"]["time"] == env.time
+    assert await slow.get(timeout=0.01) is None
+
+async def test_lagging_delta_client_resyncs_with_keyframe():
+    env, hub, _ = _hub()
+    fast, slow = hub.subscribe(PROTOCOL_DELTA), hub.subscribe(PROTOCOL_DELTA)
+    hub.publish()
+    assert json.loads(await fast.get())["type"] == "keyframe"
+    view = apply_frame(None, json.loads(await slow.get()))
+
+    env.update()
+    hub.publish()
+    env.add_agent(AgentFactory.create("Frog", 80, 80))
+    env.update()
+    hub.publish()
+    await fast.get()
+
+    # The slow client missed a delta, so it is handed a keyframe instead
+    message = json.loads(await slow.get())
+    assert message["type"] == "keyframe"
+    view = apply_frame(view, message)
+    assert len(view["agents"]) == len(env.agents)
+    assert await fast.get(timeout=0.01) is None
+
+async def test_unsubscribe_stops_delivery():
+    _, hub, calls = _hub()
+    sub = hub.subscribe(PROTOCOL_FULL)
+    hub.unsubscribe(sub)
+    hub.publish()
+    assert len(hub) == 0
+    assert calls == []
+
+async def test_binary_subscribers_get_terrain_on_join_only():
+    from simulation.binary_frame import decode_frame, ENCODING_BINARY
+    env, hub, _ = _hub()
+    sub = hub.subscribe(PROTOCOL_FULL, ENCODING_BINARY)
+    hub.publish()
+    view = decode_frame(await sub.get())
+    hub.publish()
+    frame = await sub.get()
+    assert isinstance(frame, bytes)
+    assert decode_frame(frame, view)["environment"]["terrain"] == env.terrain
+    assert decode_frame(frame)["environment"]["terrain"] is None
+
+async def test_columnar_hub_encodes_from_the_store():
+    from simulation.binary_frame import decode_frame, ENCODING_BINARY
+    env = Environment(200, 200, columnar=True)
+    for x in (50, 80, 110):
+        env.add_agent(AgentFactory.create("Frog", x, 50))
+    env.update()
+    calls = []
+    def provider(include_agents=True):
+        calls.append(include_agents)
+        return env.get_state(include_agents)
+    hub = BroadcastHub(provider, lambda: env)
+    delta, binary = hub.subscribe(PROTOCOL_DELTA), hub.subscribe(PROTOCOL_FULL, ENCODING_BINARY)
+    hub.publish()
+    view = apply_frame(None, json.loads(await delta.get()))
+    assert len(decode_frame(await binary.get())["agents"]) == 3
+
+    env.update()
+    hub.publish()
+    view = apply_frame(view, json.loads(await delta.get()))
+    assert {a["id"]: a for a in view["agents"]} == {a["id"]: a for a in json.loads(json.dumps(env.get_state()))["agents"]}
+    assert calls == [False, False]
+
+    hub.subscribe(PROTOCOL_FULL)
+    hub.publish()
+    assert calls[-1] is True
@@ -0,0 +1,56 @@
+import pytest
+from simulation import Environment
+from simulation.agents import Agent
+from simulation.factory import AgentFactory
+from simulation.components import (
+    Component, Locomotion, TargetedMovement, StaticMovement, Photosynthesis, Heterotrophy,
+    CompiledCriteria, component_bit, component_mask
+)
+
+def test_factory_tags_match_component_list():
+    fern = AgentFactory.create("Fern", 0, 0)
+    assert fern.tags == component_mask(c.__class__.__name__ for c in fern.components)
+    assert fern.tags & component_bit("Photosynthesis")
+    assert not fern.tags & component_bit("Heterotrophy")
+
+def test_get_component_by_type_and_base_type():
+    frog = AgentFactory.create("Frog", 0, 0)
+    movement = frog.get_component(TargetedMovement)
+    assert isinstance(movement, TargetedMovement)
+    assert frog.get_component(Locomotion) is movement
+    assert frog.get_component(Component) is frog.components[0]
+    assert frog.get_component(Photosynthesis) is None
+
+def test_manually_composed_agent_gets_tags():
+    agent = Agent(0, 0, "Custom")
+    agent.add_component(StaticMovement(agent))
+    agent.add_component(Heterotrophy(agent))
+    assert agent.tags == component_mask(["StaticMovement", "Heterotrophy"])
+    assert agent.get_component(Locomotion) is agent.components[0]
+
+@pytest.mark.parametrize("criteria, fern, frog", [
+    ({"has_component": ["Photosynthesis"]}, True, False),
+    ({"has_component": ["Photosynthesis", "Growth"]}, True, False),
+    ({"has_component": ["Locomotion"]}, False, False),  # exact class names only
+    ({"species": "Frog"}, False, True),
+    ({"species": "Frog", "has_component": ["Heterotrophy"]}, False, True),
+    ({"unknown_key": 1}, False, False),
+])
+def test_compiled_criteria(criteria, fern, frog):
+    compiled = CompiledCriteria(criteria)
+    assert compiled.matches(AgentFactory.create("Fern", 0, 0)) is fern
+    assert compiled.matches(AgentFactory.create("Frog", 0, 0)) is frog
+
+def test_columnar_target_lookup_uses_tag_column():
+    env = Environment(200, 200, columnar=True)
+    fern = AgentFactory.create("Fern", 60, 50)
+    frog = AgentFactory.create("Frog", 50, 50)
+    env.add_agent(fern)
+    env.add_agent(frog)
+    env.update()
+    frog.state["hunger"] = 50.0
+
+    assert env.store.tags[fern._row] == fern.tags
+    target, dist = env.find_target(frog, {"has_component": ["Photosynthesis"]}, 100)
+    assert target is fern
+    assert dist == pytest.approx(10.0)
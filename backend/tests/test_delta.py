@@ -0,0 +1,96 @@
+import json
+import random
+import pytest
+from simulation import Environment
+from simulation.components import RandomMovement
+from simulation.delta import DeltaEncoder, apply_frame
+from simulation.headless import populate
+
+def _by_id(state):
+    return {a["id"]: a for a in state["agents"]}
+
+def test_deltas_reconstruct_every_snapshot():
+    random.seed(9)
+    env = Environment()
+    populate(env, {"Fern": 40, "Frog": 6, "Fish": 4, "Lizard": 4})
+    for agent in env.new_agents:
+        agent.state["energy"] = 100.0
+    encoder = DeltaEncoder(keyframe_interval=0)
+    view = None
+    kinds = set()
+    for _ in range(300):
+        env.update()
+        state = env.get_state()
+        message = json.loads(json.dumps(encoder.encode(state)))
+        kinds.add(message["type"])
+        view = apply_frame(view, message)
+        assert _by_id(view) == _by_id(json.loads(json.dumps(state)))
+        assert view["environment"]["terrain"] == state["environment"]["terrain"]
+    assert kinds == {"keyframe", "delta"}
+
+def test_delta_omits_unchanged_terrain_and_static_agents():
+    env = Environment(200, 200)
+    populate(env, {"Fern": 10})
+    env.update()
+    encoder = DeltaEncoder()
+    keyframe = encoder.encode(env.get_state())
+    assert keyframe["type"] == "keyframe"
+    assert "terrain" in keyframe["environment"]
+
+    env.light_level = 0.0  # No photosynthesis: ferns only grow in size
+    delta = encoder.encode(env.get_state())
+    assert delta["type"] == "delta"
+    assert "terrain" not in delta["environment"]
+    assert delta["spawned"] == [] and delta["removed"] == []
+    assert all("position" not in change for change in delta["updated"])
+
+    env.from_dict(env.to_dict())
+    assert "terrain" in encoder.encode(env.get_state())["environment"]
+
+def test_keyframe_interval_and_reset():
+    env = Environment(200, 200)
+    encoder = DeltaEncoder(keyframe_interval=2)
+    types = [encoder.encode(env.get_state())["type"] for _ in range(5)]
+    assert types == ["keyframe", "delta", "delta", "keyframe", "delta"]
+    encoder.reset()
+    assert encoder.encode(env.get_state())["type"] == "keyframe"
+
+def test_delta_is_smaller_than_full_snapshot():
+    random.seed(1)
+    env = Environment()
+    populate(env, {"Fern": 300, "Frog": 20})
+    env.update()
+    encoder = DeltaEncoder()
+    encoder.encode(env.get_state())
+    env.update()
+    state = env.get_state()
+    assert len(json.dumps(encoder.encode(state))) * 3 < len(json.dumps(state))
+
+@pytest.mark.parametrize("from_store", [False, True])
+def test_structural_changes_and_store_diffs_reconstruct(from_store):
+    env = Environment(seed=9, columnar=True)
+    populate(env, {"Fern": 40, "Frog": 6, "Fish": 4, "Lizard": 4})
+    for agent in env.new_agents:
+        agent.state["energy"] = 100.0
+    encoder = DeltaEncoder(keyframe_interval=0)
+    view = None
+    for tick in range(120):
+        env.update()
+        if tick == 50:
+            frog = next(a for a in env.agents if a.state["species"] == "Frog")
+            frog.state["visual_tag"] = "predator"
+            frog.add_component(RandomMovement(frog))
+        if tick == 60:
+            del next(a for a in env.agents if a.state["species"] == "Lizard").state["max_energy"]
+        state = env.get_state()
+        if from_store:
+            message = encoder.encode(env.get_state(include_agents=False), env)
+        else:
+            message = encoder.encode(state)
+        message = json.loads(json.dumps(message))
+        if tick == 50:
+            change = next(c for c in message["updated"] if c["id"] == frog.id)
+            assert change["type"] == "predator"
+            assert change["components"][-1] == "RandomMovement"
+        view = apply_frame(view, message)
+        assert _by_id(view) == _by_id(json.loads(json.dumps(state)))
@@ -33,6 +33,28 @@ def test_add_remove_agent():
     assert len(env.agents) == 0
     assert len(env.dead_agents) == 0
 
+def test_duplicate_removal_and_swap_remove():
+    env = Environment(100, 100)
+    agents = [AgentFactory.create("Fern", 10 * i, 50) for i in range(6)]
+    for agent in agents:
+        env.add_agent(agent)
+    env.update()
+
+    # Eaten twice in one tick
+    env.remove_agent(agents[1].id)
+    env.remove_agent(agents[1].id)
+    env.remove_agent(agents[3].id)
+    assert len(env.dead_agents) == 2
+
+    env.update()
+    assert len(env.agents) == 4
+    assert {a.id for a in env.agents} == {agents[i].id for i in (0, 2, 4, 5)}
+    for i, agent in enumerate(env.agents):
+        assert env.agents.get(agent.id) is agent
+        assert env.agents[i] is agent
+    assert env.agents.get(agents[1].id) is None
+    assert len(env.spatial_grid.get_nearby(10, 50, 100)) == 4
+
 def test_reset():
     env = Environment(100, 100)
     agent = AgentFactory.create("Fern", 50, 50)
@@ -77,3 +99,32 @@ def test_stats_history_limit():
     
     assert len(env.stats_history) == 10000
     assert env.stats_history[-1]["time"] == env.total_ticks
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_spawn_batch_places_agents_on_their_habitat(columnar):
+    env = Environment(1000, 800, columnar=columnar, seed=3)
+    fish = env.spawn_batch("Fish", 300)
+    lizards = env.spawn_batch("Lizard", 300)
+    assert len(env.agents) == len(env.spatial_grid) == 600
+    assert all(env.get_terrain_at(a.x, a.y) == config.TERRAIN_WATER for a in fish)
+    assert all(env.get_terrain_at(a.x, a.y) != config.TERRAIN_WATER for a in lizards)
+    assert len({a.id for a in fish + lizards}) == 600
+    assert env._calculate_stats() == {"Fish": 300, "Lizard": 300}
+    if columnar:
+        assert len(env.store) == 600
+
+def test_spawn_batch_region():
+    env = Environment(1000, 800, seed=3)
+    ferns = env.spawn_batch("Fern", 200, region=(100, 100, 150, 130))
+    assert all(100 <= a.x < 150 and 100 <= a.y < 130 for a in ferns)
+    # Lizards cannot live in an all-water region; unknown species spawn nothing
+    assert env.spawn_batch("Lizard", 10, region=(0, 0, 300, 800)) == []
+    assert env.spawn_batch("Dragon", 10) == []
+    assert len(env.agents) == 200
+
+def test_spawn_batch_command_respects_habitat():
+    from simulation.commands import apply_command
+    env = Environment(1000, 800, seed=3)
+    apply_command(env, {"type": "spawn_batch", "payload": {"type": "Fish", "count": 50}})
+    assert len(env.agents) == 50
+    assert all(env.get_terrain_at(a.x, a.y) == config.TERRAIN_WATER for a in env.agents)
@@ -0,0 +1,81 @@
+import pytest
+from simulation import Environment
+from simulation.agents import Agent
+from simulation.components import Growth
+from simulation.factory import AgentFactory, compile_species, _component_fields
+from simulation.species_config import SPECIES_DB
+
+def _constructed(species, x, y):
+    """An agent built through the component constructors (the pre-template path)."""
+    agent = Agent(x, y, species)
+    agent.state.update(SPECIES_DB[species]["params"])
+    for component_cls, kwargs in SPECIES_DB[species]["components"]:
+        agent.add_component(component_cls(agent, **kwargs))
+    return agent
+
+@pytest.mark.parametrize("species", sorted(SPECIES_DB))
+def test_clones_match_constructed_agents(species):
+    clone, reference = AgentFactory.create(species, 12, 34), _constructed(species, 12, 34)
+    assert (clone.x, clone.y, clone.alive) == (12, 34, True)
+    assert clone.state == reference.state
+    assert clone.tags == reference.tags
+    assert [type(c) for c in clone.components] == [type(c) for c in reference.components]
+    def attributes(component):
+        return {k: getattr(v, "key", v) for k, v in _component_fields(component)}
+    for mine, theirs in zip(clone.components, reference.components):
+        assert mine.agent is clone
+        assert attributes(mine) == attributes(theirs)
+    assert clone.get_component(Growth) is next((c for c in clone.components if isinstance(c, Growth)), None)
+
+def test_clones_are_independent():
+    a, b = AgentFactory.create("Frog", 0, 0), AgentFactory.create("Frog", 0, 0)
+    a.state["energy"] = 1.0
+    a.components[0].speed = 99.0
+    assert b.state["energy"] != 1.0 and b.components[0].speed != 99.0
+    assert AgentFactory.create("Frog", 0, 0).state == b.state
+    assert a.id != b.id
+
+def test_invalid_definitions_are_rejected():
+    with pytest.raises(ValueError):
+        compile_species({"Blob": {"params": {}, "components": [(dict, {})]}})
+    with pytest.raises(ValueError):
+        compile_species({"Blob": {"params": {}, "components": [(Growth, {"no_such_argument": 1})]}})
+
+def test_removed_agents_are_recycled_when_opted_in():
+    env = Environment(200, 200, seed=1, agent_pool_size=8)
+    frog = env.spawn_batch("Frog", 1)[0]
+    frog.state["energy"] = 3.0
+    old_id = frog.id
+    env.remove_agent(frog.id)
+    env.update()
+    assert frog not in env.agents
+
+    # Another environment's pool is separate
+    assert AgentFactory.create("Frog", 5, 6, Environment(200, 200, seed=2, agent_pool_size=8).agent_pool) is not frog
+    reused = AgentFactory.create("Frog", 5, 6, env.agent_pool)
+    assert reused is frog
+    assert reused.id != old_id and reused.alive and (reused.x, reused.y) == (5, 6)
+    assert reused.state == AgentFactory.templates["Frog"].state
+    assert all(c.agent is reused for c in reused.components)
+
+def test_held_dead_agents_are_not_revived():
+    env = Environment(200, 200, seed=1)
+    assert env.agent_pool is None
+    frog = env.spawn_batch("Frog", 1)[0]
+    frog.state["energy"] = 3.0
+    env.remove_agent(frog.id)
+    env.update()
+    held = (frog.id, frog.x, frog.y, frog.alive, dict(frog.state))
+
+    env.spawn_batch("Frog", 5)
+    env.update()
+    assert all(AgentFactory.create("Frog", 1, 1) is not frog for _ in range(5))
+    assert all(agent is not frog for agent in env.agents)
+    assert (frog.id, frog.x, frog.y, frog.alive, dict(frog.state)) == held
+
+def test_agents_and_components_are_slotted():
+    frog = AgentFactory.create("Frog", 0, 0)
+    assert not hasattr(frog, "__dict__")
+    assert not any(hasattr(c, "__dict__") for c in frog.components)
+    with pytest.raises(AttributeError):
+        frog.nickname = "Kermit"
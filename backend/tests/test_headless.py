@@ -0,0 +1,39 @@
+import pytest
+from simulation import Environment
+from simulation.headless import run_headless, parse_population, main
+
+def test_run_headless_report():
+    report = run_headless(20, seed=1, population={"Fern": 10, "Frog": 2})
+    assert report["ticks"] == 20
+    assert report["ticks_per_second"] > 0
+    assert report["stats"]["Fern"] >= 1
+    assert report["agent_count"] == sum(report["stats"].values())
+
+def test_run_headless_is_reproducible():
+    a = run_headless(100, seed=7, population={"Fern": 30, "Frog": 5, "Fish": 5})
+    b = run_headless(100, seed=7, population={"Fern": 30, "Frog": 5, "Fish": 5})
+    assert a["stats"] == b["stats"]
+
+def test_run_headless_uses_given_environment():
+    env = Environment(200, 200, seed=11)
+    report = run_headless(5, seed=3, population={"Fern": 4}, environment=env)
+    assert env.total_ticks == 5
+    assert len(env.agents) >= 4
+    assert report["seed"] == 11
+
+def test_run_headless_closes_only_its_own_environment(monkeypatch):
+    closed = []
+    monkeypatch.setattr(Environment, "close", lambda self: closed.append(self))
+    report = run_headless(3, population={"Fern": 2})
+    assert len(closed) == 1 and report["seed"] == closed[0].seed
+    run_headless(3, environment=Environment(200, 200))
+    assert len(closed) == 1
+
+def test_parse_population():
+    assert parse_population("Fern=200, Frog=20") == {"Fern": 200, "Frog": 20}
+    with pytest.raises(ValueError):
+        parse_population("Dragon=3")
+
+def test_cli(capsys):
+    assert main(["--ticks", "3", "--seed", "1", "--population", "Fern=5", "--json"]) == 0
+    assert '"ticks": 3' in capsys.readouterr().out
@@ -5,3 +5,60 @@ async def test_root(async_client):
     response = await async_client.get("/")
     assert response.status_code == 200
     assert response.json() == {"message": "Paludarium Simulation API"}
+
+def test_websocket_delta_protocol():
+    import json
+    from fastapi.testclient import TestClient
+    from main import app
+
+    with TestClient(app) as client:
+        with client.websocket_connect("/ws?protocol=delta") as ws:
+            assert json.loads(ws.receive_text())["type"] == "keyframe"
+            assert json.loads(ws.receive_text())["type"] == "delta"
+
+def test_websocket_binary_encoding():
+    from fastapi.testclient import TestClient
+    from main import app
+    from simulation.binary_frame import decode_frame
+
+    with TestClient(app) as client:
+        with client.websocket_connect("/ws?encoding=binary") as ws:
+            frame = decode_frame(ws.receive_bytes())
+            assert frame["environment"]["terrain"]
+
+@pytest.mark.asyncio
+async def test_profile_endpoint(async_client):
+    from main import runner
+    response = await async_client.post("/api/profile", params={"enabled": True})
+    assert response.json() == {"enabled": True}
+    runner.environment.update()
+    profile = (await async_client.get("/api/profile")).json()
+    assert profile["enabled"]
+    assert "total" in profile["phases"]
+    await async_client.post("/api/profile", params={"enabled": False})
+    assert (await async_client.get("/api/profile")).json() == {"enabled": False, "phases": {}}
+
+@pytest.mark.asyncio
+async def test_history_export(async_client):
+    from main import runner
+    from simulation.history_export import decode_columnar
+    runner.environment.stats_history = [{"time": t * 10, "Fern": t, "Frog": 1} for t in range(100)]
+    try:
+        records = (await async_client.get("/api/history", params={"start": 100, "end": 190})).json()
+        assert [r["time"] for r in records] == list(range(100, 191, 10))
+        assert records[0] == {"time": 100, "Fern": 10, "Frog": 1}
+
+        csv = (await async_client.get("/api/history", params={"format": "csv", "species": "Fern", "points": 10})).text
+        lines = csv.strip().split("\n")
+        assert lines[0] == "time,Fern"
+        assert len(lines) == 11
+
+        blob = (await async_client.get("/api/history", params={"format": "columnar", "species": "Frog"})).content
+        result = decode_columnar(blob)
+        assert list(result["columns"]) == ["Frog"]
+        assert result["time"].size == 100
+
+        assert (await async_client.get("/api/history", params={"format": "xml"})).status_code == 400
+        assert len((await async_client.get("/history")).json()) == 100
+    finally:
+        runner.environment.history.clear()
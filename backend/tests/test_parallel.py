@@ -0,0 +1,113 @@
+import random
+import numpy as np
+import pytest
+from simulation import Environment, parallel
+from simulation.components import TargetedMovement
+from simulation.factory import AgentFactory
+from simulation.headless import populate
+
+def _run(ticks=150, workers=1, tile_size=200.0, inline_threshold=2000):
+    random.seed(11)
+    env = Environment(parallel=True)
+    system = env.parallel_system
+    system.workers, system.tile_size, system.inline_threshold = workers, tile_size, inline_threshold
+    populate(env, {"Fern": 150, "Frog": 20, "Fish": 20, "Lizard": 20})
+    for agent in env.new_agents:
+        if agent.state.get("hunger") is not None:
+            agent.state["hunger"] = 40.0
+        else:
+            agent.state["energy"] = 100.0
+    try:
+        for _ in range(ticks):
+            env.update()
+    finally:
+        system.close()
+    return sorted((a.state["species"], a.x, a.y, a.state.get("energy")) for a in env.agents)
+
+def test_results_do_not_depend_on_tiling():
+    assert _run(tile_size=100.0) == _run(tile_size=1000.0)
+
+def test_process_pool_matches_inline_decide():
+    assert _run(ticks=40, workers=2, tile_size=250.0, inline_threshold=0) == _run(ticks=40)
+
+def test_results_do_not_depend_on_worker_count():
+    # The guarantee for a seed (the serial mode gives different trajectories)
+    reference = _run(ticks=30, workers=1, tile_size=150.0)
+    assert _run(ticks=30, workers=3, tile_size=150.0, inline_threshold=0) == reference
+    assert _run(ticks=30, workers=4, tile_size=150.0, inline_threshold=0) == reference
+
+def test_contested_target_goes_to_closest_eater():
+    env = Environment(200, 200, parallel=True)
+    fern = AgentFactory.create("Fern", 100, 100)
+    far = AgentFactory.create("Frog", 103, 100)
+    near = AgentFactory.create("Frog", 98, 100)
+    for agent in (fern, far, near):
+        env.add_agent(agent)
+    env.update()
+    for frog in (far, near):
+        frog.state["hunger"] = 50.0
+        frog.state["energy"] = 50.0
+    far_pos = (far.x, far.y)
+
+    env.update()
+    assert not fern.alive
+    assert near.state["hunger"] < far.state["hunger"]
+    assert near.state["energy"] > far.state["energy"]
+    assert (far.x, far.y) == far_pos  # The loser holds still this tick
+
+@pytest.mark.parametrize("modes, chases", [({"parallel": True}, True), ({"vectorized": True}, False), ({}, False)])
+def test_decisions_read_the_tick_start_snapshot(modes, chases):
+    # The documented divergence from the serial modes: there the far frog
+    # already sees the fern eaten by the frog updated before it
+    env = Environment(200, 200, seed=4, **modes)
+    near = AgentFactory.create("Frog", 98, 100)
+    fern = AgentFactory.create("Fern", 100, 100)
+    far = AgentFactory.create("Frog", 130, 100)
+    for agent in (near, fern, far):
+        env.add_agent(agent)
+    env.update()
+    for frog in (near, far):
+        frog.state["hunger"] = 50.0
+
+    env.update()
+    env.close()
+    assert not fern.alive
+    # Chasing moves the far frog straight at the fern's tick-start position
+    assert ((far.x, far.y) == (130 - far.get_component(TargetedMovement).speed, 100)) is chases
+
+def test_tree_kernels_match_brute_force():
+    rng = np.random.default_rng(2)
+    # Lattice positions: many exact ties and points exactly on the radius
+    cand_xy = rng.integers(0, 40, size=(600, 2)).astype(float)
+    cand_tags = rng.integers(0, 4, size=600)
+    cand_species = rng.integers(0, 3, size=600)
+    own = np.concatenate([rng.choice(600, 300, replace=False), np.full(100, -1)])
+    points = np.concatenate([cand_xy[own[:300]], rng.integers(0, 40, size=(100, 2)).astype(float)])
+    radii = rng.choice([0.0, 1.0, 5.0, 12.0], size=400)
+    masks = rng.integers(1, 4, size=400)
+    species = np.where(own >= 0, cand_species[own], rng.integers(0, 3, size=400))
+
+    tree = parallel._nearest(points, radii, masks, own, cand_xy, cand_tags)
+    brute = parallel._nearest_brute_force(points, radii, masks, own, cand_xy, cand_tags)
+    assert tree[0].tolist() == brute[0].tolist()
+    assert tree[1].tolist() == brute[1].tolist()
+    for radius in (0.0, 3.0, 10.0):
+        assert (parallel._crowding(points, species, own, cand_xy, cand_species, radius).tolist()
+                == parallel._crowding_brute_force(points, species, own, cand_xy, cand_species, radius).tolist())
+
+def test_close_releases_the_pool():
+    env = Environment(parallel=True, seed=1)
+    system = env.parallel_system
+    system.workers, system.tile_size, system.inline_threshold = 2, 250.0, 0
+    populate(env, {"Fern": 60, "Frog": 10})
+    env.update()
+    for agent in env.agents:
+        if "hunger" in agent.state:
+            agent.state["hunger"] = 40.0
+    env.update()
+    assert system._pool is not None
+    env.reset()
+    assert system._pool is None
+    env.update()
+    env.close()
+    assert system._pool is None
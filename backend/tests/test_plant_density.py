@@ -32,7 +32,7 @@ def test_density_control():
     initial_count = len(env.agents)
     
     # Mock random to ensure it tries to reproduce (chance is 0.01)
-    with patch('random.random', return_value=0.0):
+    with patch.object(env.rng, 'random', return_value=0.0):
         env.update()
         
     # Should NOT have spawned a new agent
@@ -50,7 +50,7 @@ def test_reproduction_success_when_uncrowded():
     initial_count = len(env.agents)
     
     # Mock random to ensure reproduction
-    with patch('random.random', return_value=0.0):
+    with patch.object(env.rng, 'random', return_value=0.0):
         env.update()
         
     # Should have spawned
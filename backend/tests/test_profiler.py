@@ -0,0 +1,39 @@
+import pytest
+from simulation import Environment
+from simulation.headless import populate
+from simulation.profiler import TickProfiler
+
+def test_rolling_percentiles():
+    profiler = TickProfiler(enabled=True, window=100)
+    for i in range(200):
+        profiler.begin_tick()
+        profiler.record("phase", (i % 100 + 1) / 1000.0)
+        profiler.end_tick()
+    stats = profiler.summary()["phase"]
+    assert stats["count"] == 100
+    assert stats["p50"] == pytest.approx(50.5)
+    assert stats["p99"] == pytest.approx(99.01)
+    assert stats["p50"] <= stats["p95"] <= stats["p99"]
+
+@pytest.mark.parametrize("modes", [{}, {"vectorized": True}])
+def test_environment_reports_phases_and_components(modes):
+    env = Environment(seed=3, **modes)
+    populate(env, {"Fern": 30, "Frog": 5})
+    env.update()
+    env.profiler.enabled = True
+    for _ in range(20):
+        env.update()
+
+    profile = env.get_state()["environment"]["profile"]
+    for name in ("equipment", "agents", "buffers", "grid", "stats", "total",
+                 "component.TargetedMovement", "component.AsexualReproduction"):
+        assert profile[name]["count"] == 20
+    assert ("system.metabolism" in profile) == bool(modes)
+    assert profile["agents"]["p50"] <= profile["total"]["p99"]
+
+def test_disabled_profiler_records_nothing():
+    env = Environment(seed=3)
+    populate(env, {"Fern": 5})
+    env.update()
+    assert env.profiler.summary() == {}
+    assert "profile" not in env.get_state()["environment"]
@@ -57,7 +57,7 @@ def test_animal_reproduction():
     env.update() # Flush buffer
     
     # Mock random to return 0.0 (always reproduce)
-    with patch('random.random', return_value=0.0):
+    with patch.object(env.rng, 'random', return_value=0.0):
         env.update()
         
     assert len(env.agents) == 2
@@ -75,7 +75,7 @@ def test_plant_reproduction():
     env.update() # Flush buffer
     
     # Mock random to return 0.0 (always reproduce)
-    with patch('random.random', return_value=0.0):
+    with patch.object(env.rng, 'random', return_value=0.0):
         env.update()
         
     assert len(env.agents) == 2
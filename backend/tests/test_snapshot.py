@@ -0,0 +1,102 @@
+import os
+import numpy as np
+import pytest
+from simulation import Environment, snapshot
+from simulation.factory import AgentFactory
+from simulation.headless import populate
+
+def _agents(env):
+    return sorted((a.id, a.x, a.y, sorted(a.state.items())) for a in env.agents)
+
+@pytest.mark.parametrize("codec", snapshot.available_codecs())
+@pytest.mark.parametrize("modes", [{}, {"columnar": True}])
+def test_round_trip(tmp_path, codec, modes):
+    env = Environment(seed=3, **modes)
+    populate(env, {"Fern": 30, "Frog": 5, "Fish": 5})
+    for _ in range(5):
+        env.update()
+    env.time, env.light_level = 123, 0.25
+    path = str(tmp_path / "save.psnap")
+    snapshot.save(env, path, codec=codec).result()
+
+    loaded = Environment(seed=0, **modes)
+    loaded.load_snapshot(snapshot.read(path))
+    assert _agents(loaded) == _agents(env)
+    assert loaded.terrain == env.terrain
+    assert (loaded.time, loaded.light_level, loaded.seed) == (123, 0.25, 3)
+    assert loaded._calculate_stats() == env._calculate_stats()
+
+def test_unusual_state_and_ids(tmp_path):
+    env = Environment(seed=1)
+    populate(env, {"Fern": 3})
+    env.update()
+    agents = list(env.agents)
+    agents[0].state["genome"] = [1, 2]   # Stored as JSON
+    agents[1].state["generation"] = 4    # Int column, absent for the others
+    path = str(tmp_path / "save.psnap")
+    snapshot.save(env, path, background=False)
+
+    loaded = Environment(seed=1)
+    loaded.load_snapshot(snapshot.read(path))
+    by_id = {a.id: a.state for a in loaded.agents}
+    assert by_id[agents[0].id]["genome"] == [1, 2]
+    assert by_id[agents[1].id]["generation"] == 4
+    assert isinstance(by_id[agents[1].id]["generation"], int)
+    assert "generation" not in by_id[agents[2].id]
+    assert "genome" not in by_id[agents[2].id]
+
+def test_int_keys_are_exact_and_default_loads_are_mapped(tmp_path):
+    env = Environment(seed=1)
+    populate(env, {"Fern": 3})
+    env.update()
+    agents = list(env.agents)
+    agents[0].state["genome_id"] = 2**62 + 1  # Not representable as float64
+    path = str(tmp_path / "save.psnap")
+    snapshot.save(env, path, background=False)
+
+    data = snapshot.read(path)
+    assert snapshot.resolve_codec("auto") == snapshot.CODEC_NONE
+    assert not data["arrays"]["x"].flags.owndata  # A view of the mapping
+    assert data["arrays"]["state.genome_id"].dtype == np.dtype("<i8")
+    loaded = Environment(seed=1)
+    loaded.load_snapshot(data)
+    by_id = {a.id: a.state for a in loaded.agents}
+    assert by_id[agents[0].id]["genome_id"] == 2**62 + 1
+    assert "genome_id" not in by_id[agents[1].id]
+
+def test_columnar_load_restores_columns_in_order(tmp_path):
+    env = Environment(seed=5, columnar=True)
+    populate(env, {"Fern": 20, "Frog": 4})
+    env.update()
+    frog = next(a for a in env.agents if a.state["species"] == "Frog")
+    del frog.state["max_energy"]
+    env.store.param_column("heterotrophy.decay_rate")[frog._row] = 0.5
+    path = str(tmp_path / "save.psnap")
+    snapshot.save(env, path, background=False)
+
+    loaded = Environment(seed=0, columnar=True)
+    loaded.load_snapshot(snapshot.read(path))
+    assert [a.to_dict() for a in loaded.agents] == [a.to_dict() for a in env.agents]
+    restored = loaded.agents.get(frog.id)
+    assert "max_energy" not in restored.state
+    assert loaded.store.params["heterotrophy.decay_rate"][restored._row] == 0.5
+    loaded.add_agent(AgentFactory.create("Fern", 1, 1))
+    assert loaded.new_agents[0].id == max(a.id for a in env.agents) + 1
+
+def test_save_to_file_formats(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    env = Environment(seed=2)
+    populate(env, {"Fern": 10, "Lizard": 2})
+    env.update()
+    pending = env.save_to_file("slot", "snapshot")
+    loaded = Environment(seed=0)
+    loaded.load_from_file("slot")  # Waits for the background write
+    assert pending.done()
+    assert _agents(loaded) == _agents(env)
+
+    # JSON saves still load, and the newest file wins
+    env.update()
+    env.save_to_file("slot", "json")
+    os.utime("saves/slot.psnap", (0, 0))
+    loaded.load_from_file("slot")
+    assert loaded.total_ticks == env.total_ticks
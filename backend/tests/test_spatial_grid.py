@@ -0,0 +1,123 @@
+import random
+import pytest
+from simulation import Environment
+from simulation.factory import AgentFactory
+from simulation.headless import populate
+from simulation.spatial_grid import SpatialGrid, suggest_cell_size
+import config
+
+def test_move_only_rebuckets_on_cell_change():
+    grid = SpatialGrid(200, 200, cell_size=50)
+    agent = AgentFactory.create("Frog", 10, 10)
+    grid.add(agent)
+
+    agent.x = 40
+    grid.move(agent)
+    assert list(grid.grid) == [(0, 0)]
+
+    agent.x = 60
+    grid.move(agent)
+    assert list(grid.grid) == [(1, 0)]
+    assert grid.get_nearby(60, 10, 5) == [agent]
+
+    grid.remove(agent)
+    assert len(grid) == 0
+    assert grid.grid == {}
+
+def test_move_ignores_unindexed_agents():
+    grid = SpatialGrid(200, 200)
+    agent = AgentFactory.create("Frog", 10, 10)
+    grid.move(agent)
+    grid.remove(agent)
+    assert len(grid) == 0
+
+def _cells(grid):
+    return {agent_id: cell for cell, bucket in grid.grid.items() for agent_id in bucket}
+
+def _density(grid):
+    density = {}
+    for cell, bucket in grid.grid.items():
+        for agent in bucket.values():
+            counts = density.setdefault(cell, {})
+            counts[agent.state["species"]] = counts.get(agent.state["species"], 0) + 1
+    return density
+
+def test_incremental_grid_matches_full_rebuild():
+    random.seed(2)
+    env = Environment()
+    populate(env, {"Fern": 80, "Frog": 10, "Fish": 10, "Lizard": 10})
+    for _ in range(150):
+        env.update()
+        rebuilt = SpatialGrid(env.width, env.height, env.spatial_grid.cell_size)
+        rebuilt.rebuild(env.agents)
+        assert _cells(env.spatial_grid) == _cells(rebuilt)
+        assert env.spatial_grid.density == _density(env.spatial_grid)
+
+def test_removed_agents_leave_grid():
+    env = Environment(100, 100)
+    fern = AgentFactory.create("Fern", 50, 50)
+    env.add_agent(fern)
+    env.update()
+    assert fern in env.spatial_grid
+
+    env.remove_agent(fern.id)
+    env.update()
+    assert fern not in env.spatial_grid
+
+@pytest.mark.parametrize("cell_size", [7, 25, 50, 200])
+@pytest.mark.parametrize("radius", [5, 30, 60, 100, 400])
+def test_get_nearby_covers_radius(cell_size, radius):
+    rng = random.Random(cell_size * 1000 + radius)
+    grid = SpatialGrid(1000, 800, cell_size)
+    agents = [AgentFactory.create("Fern", rng.uniform(0, 1000), rng.uniform(0, 800)) for _ in range(300)]
+    grid.rebuild(agents)
+    for _ in range(20):
+        x, y = rng.uniform(0, 1000), rng.uniform(0, 800)
+        candidates = {a.id for a in grid.get_nearby(x, y, radius)}
+        expected = {a.id for a in agents if (a.x - x) ** 2 + (a.y - y) ** 2 <= radius ** 2}
+        assert expected <= candidates
+
+def test_suggested_cell_size_shrinks_with_density():
+    sparse = suggest_cell_size({30: 1.0, 100: 1.0}, 100, 1000, 800)
+    dense = suggest_cell_size({30: 1.0, 100: 1.0}, 50000, 1000, 800)
+    assert dense < sparse
+    assert suggest_cell_size({}, 100, 1000, 800) == config.SPATIAL_GRID_CELL_SIZE
+
+def test_environment_retunes_grid_on_population_change():
+    env = Environment()
+    for _ in range(2000):
+        env.add_agent(AgentFactory.create("Fern", random.uniform(0, 1000), random.uniform(0, 800)))
+    env.update()
+    assert env.spatial_grid.cell_size == suggest_cell_size(
+        {config.NEIGHBOR_RADIUS: 2000}, 2000, env.width, env.height)
+    assert len(env.spatial_grid) == 2000
+
+def test_density_field_bounds_exact_crowding():
+    rng = random.Random(4)
+    env = Environment(400, 400, seed=4)
+    for _ in range(300):
+        env.add_agent(AgentFactory.create(rng.choice(["Fern", "Frog"]), rng.uniform(0, 400), rng.uniform(0, 400)))
+    env.update()
+    for cell_size in (10, 50, 200):
+        env.spatial_grid.resize(cell_size)
+        assert env.spatial_grid.density == _density(env.spatial_grid)
+        for agent in list(env.agents)[:100]:
+            species = agent.state["species"]
+            exact = [n for n in env.get_nearby_agents(agent, config.NEIGHBOR_RADIUS)
+                     if n.state["species"] == species]
+            assert env.local_density(agent.x, agent.y, species) >= len(exact) + 1  # Includes itself
+            for limit in (1, 3, config.MAX_NEIGHBORS):
+                assert env.is_crowded(agent, limit=limit) == (len(exact) >= limit)
+
+def test_crowding_only_counts_the_same_species():
+    env = Environment(400, 400, seed=1)
+    fern = AgentFactory.create("Fern", 110, 110)
+    # A lone fern among many frogs is not crowded
+    others = [AgentFactory.create("Frog", 100 + i * 0.1, 110) for i in range(300)]
+    others += [AgentFactory.create("Fern", 115 + i, 110) for i in range(3)]
+    for agent in [fern] + others:
+        env._assign_id(agent)
+    env._insert_agents([fern] + others)
+    assert not env.is_crowded(fern, limit=4)
+    assert env.is_crowded(fern, limit=3)
+    assert env.spatial_grid.count_species_within(110, 110, 30, "Fern", 2, exclude=fern) == 2
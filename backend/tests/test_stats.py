@@ -36,3 +36,44 @@ def test_stats_calculation():
     # Note: agents[0] is the first Fern
     assert stats["Fern"] == 1
     assert stats["Frog"] == 1
+
+def _scan(env):
+    counts = {}
+    for agent in env.agents:
+        if agent.alive:
+            counts[agent.state["species"]] = counts.get(agent.state["species"], 0) + 1
+    return counts
+
+@pytest.mark.parametrize("modes", [{}, {"vectorized": True}, {"parallel": True}])
+def test_incremental_counters_match_full_scan(modes):
+    from simulation.headless import populate
+    env = Environment(seed=5, **modes)
+    populate(env, {"Fern": 80, "Frog": 15, "Fish": 10, "Lizard": 10})
+    for i, agent in enumerate(env.new_agents):
+        if agent.state["species"] != "Fern":
+            agent.state["energy"] = 1.0 + i % 7  # Staggered starvation
+    initial = None
+    try:
+        for _ in range(150):
+            env.update()
+            assert env._calculate_stats() == _scan(env)
+            initial = initial or env._calculate_stats()
+    finally:
+        if env.parallel_system is not None:
+            env.parallel_system.close()
+
+    assert env._calculate_stats() != initial
+    aggregates = env.species_aggregates()
+    assert {s: a["count"] for s, a in aggregates.items()} == _scan(env)
+    fern_energy = sum(a.state.get("energy", 0.0) for a in env.agents if a.state["species"] == "Fern")
+    assert aggregates["Fern"]["energy"] == pytest.approx(fern_energy)
+    assert env.species_aggregates() is aggregates  # Cached within a tick
+
+def test_counters_survive_reset_and_load():
+    env = Environment(seed=1)
+    env._populate_default_agents()
+    data = env.to_dict()
+    env.reset()
+    assert env._calculate_stats() == {}
+    env.from_dict(data)
+    assert env._calculate_stats() == _scan(env)
@@ -0,0 +1,103 @@
+import os
+import numpy as np
+import pytest
+import config
+from simulation.stats_history import StatsHistory, bucket_means
+
+def _fill(history, records):
+    for t in range(records):
+        history.append({"time": t * 10, "Fern": t, "Frog": 2})
+
+def test_ring_buffer_keeps_latest_records():
+    history = StatsHistory(capacity=5, tiers=(), directory=None)
+    _fill(history, 12)
+    assert len(history) == 5
+    assert [r["time"] for r in history] == [70, 80, 90, 100, 110]
+    assert history[-1] == {"time": 110, "Fern": 11, "Frog": 2}
+
+def test_tiers_hold_bucket_means():
+    history = StatsHistory(capacity=5, tiers=((100, 50),), directory=None)
+    _fill(history, 30)  # times 0..290, buckets of 10 records
+    result = history.query(start=0, points=3)
+    assert result["source"] == "tier_100"
+    assert result["time"].tolist() == [0, 100, 200]
+    assert result["columns"]["Fern"].tolist() == pytest.approx([4.5, 14.5, 24.5])
+    assert result["columns"]["Frog"].tolist() == pytest.approx([2, 2, 2])
+
+def test_query_prefers_finest_covering_store():
+    history = StatsHistory(capacity=100, tiers=((100, 50),), directory=None)
+    _fill(history, 30)
+    result = history.query(start=50, end=120, columns=["Fern"])
+    assert result["source"] == "ring"
+    assert result["time"].tolist() == list(range(50, 121, 10))
+    assert set(result["columns"]) == {"Fern"}
+
+    downsampled = history.query(points=4)
+    assert len(downsampled["time"]) <= 4
+    assert downsampled["columns"]["Fern"].mean() == pytest.approx(14.5)
+
+def test_columnar_log_survives_restart(tmp_path):
+    history = StatsHistory(capacity=5, tiers=((100, 50),), directory=str(tmp_path))
+    _fill(history, 20)
+    history.append({"time": 200, "Fern": 20, "Frog": 2, "Fish": 7})  # new column
+    history.close()
+
+    reopened = StatsHistory(capacity=5, tiers=((100, 50),), directory=str(tmp_path))
+    assert [r["time"] for r in reopened] == [160, 170, 180, 190, 200]
+    full = reopened.query(start=0)
+    assert full["source"] == "log"
+    assert full["time"].tolist() == list(range(0, 201, 10))
+    assert full["columns"]["Fish"].tolist() == [0.0] * 20 + [7.0]
+
+    reopened.append({"time": 210, "Fern": 21, "Frog": 2})
+    assert reopened.query(start=0, points=3)["source"] == "tier_100"
+    reopened.clear()
+    assert StatsHistory(capacity=5, tiers=(), directory=str(tmp_path)).query()["time"].size == 0
+
+def test_bucket_means():
+    times, means, counts = bucket_means(np.array([0, 5, 10, 25]), {"a": np.array([1.0, 3.0, 5.0, 7.0])}, 10)
+    assert times.tolist() == [0, 10, 20]
+    assert means["a"].tolist() == [2.0, 5.0, 7.0]
+    assert counts.tolist() == [2, 1, 1]
+
+@pytest.mark.parametrize("with_log", [False, True])
+def test_going_back_in_time_rewinds(tmp_path, with_log):
+    history = StatsHistory(capacity=50, tiers=((100, 50),), directory=str(tmp_path) if with_log else None)
+    _fill(history, 30)
+    history.append({"time": 150, "Fern": -1, "Frog": 0})
+    times = history.query(start=0)["time"].tolist()
+    assert times == list(range(0, 141, 10)) + [150]
+    assert history[-1]["Fern"] == -1
+
+def test_environments_log_only_when_given_a_directory(tmp_path, monkeypatch):
+    from simulation import Environment
+    monkeypatch.chdir(tmp_path)
+    env = Environment(seed=1)
+    for _ in range(30):
+        env.update()
+    env.close()
+    assert env.history.directory is None and os.listdir(tmp_path) == []
+
+    directory = str(tmp_path / "log")
+    first = Environment(seed=1, history_directory=directory)
+    for _ in range(30):
+        env.update()
+        first.update()
+    state = first.to_dict()
+    first.update()
+    first.time = 9
+    first.update()  # Records tick 32, beyond the saved state
+    first.from_dict(state)
+    assert first.history.query()["time"].tolist() == [10, 20, 30]
+    first.close()
+
+    # A restarted server reopens the log and continues after it
+    restarted = Environment(seed=2, history_directory=directory)
+    assert restarted.history.query()["time"].tolist() == [10, 20, 30]
+    assert restarted.total_ticks == 31
+    for _ in range(10):
+        restarted.update()
+    assert restarted.history.query()["time"].tolist() == [10, 20, 30, 41]
+    restarted.reset()
+    assert restarted.history.query()["time"].size == 0
+    restarted.close()
@@ -0,0 +1,74 @@
+import random
+import pytest
+import simulation.target_index
+from simulation import Environment
+from simulation.factory import AgentFactory
+
+CRITERIA = {"has_component": ["Photosynthesis"]}
+
+def _tank(seed):
+    rng = random.Random(seed)
+    env = Environment()
+    for _ in range(400):
+        env.add_agent(AgentFactory.create("Fern", rng.uniform(0, 1000), rng.uniform(0, 800)))
+    frogs = []
+    for _ in range(60):
+        frog = AgentFactory.create("Frog", rng.uniform(0, 1000), rng.uniform(0, 800))
+        frog.state["hunger"] = 50.0
+        frogs.append(frog)
+        env.add_agent(frog)
+    env.update()
+    for frog in frogs:
+        frog.state["hunger"] = 50.0
+    return env, frogs
+
+def _scalar_distances(env, frogs):
+    index, env.target_index = env.target_index, None
+    try:
+        return [env.find_target(f, CRITERIA, f.state["vision_radius"])[1] for f in frogs]
+    finally:
+        env.target_index = index
+
+@pytest.mark.parametrize("use_tree", [True, False])
+def test_batched_lookup_matches_scalar_scan(use_tree, monkeypatch):
+    if not use_tree:
+        monkeypatch.setattr(simulation.target_index, "cKDTree", None)
+    elif simulation.target_index.cKDTree is None:
+        pytest.skip("SciPy not installed")
+
+    env, frogs = _tank(4)
+    expected = _scalar_distances(env, frogs)
+    found = [env.find_target(f, CRITERIA, f.state["vision_radius"]) for f in frogs]
+
+    assert [d for _, d in found] == pytest.approx(expected)
+    assert any(t is not None for t, _ in found)
+    assert all(t is None or "Photosynthesis" in [c.__class__.__name__ for c in t.components] for t, _ in found)
+
+def test_eaten_target_falls_back_to_next_nearest():
+    env = Environment(200, 200)
+    near = AgentFactory.create("Fern", 52, 50)
+    far = AgentFactory.create("Fern", 60, 50)
+    frog = AgentFactory.create("Frog", 50, 50)
+    for agent in (near, far, frog):
+        env.add_agent(agent)
+    env.update()
+    frog.state["hunger"] = 50.0
+
+    assert env.find_target(frog, CRITERIA, 100)[0] is near
+    near.alive = False
+    target, dist = env.find_target(frog, CRITERIA, 100)
+    assert target is far
+    assert dist == pytest.approx(10.0)
+
+def test_querier_does_not_target_itself():
+    env = Environment(200, 200)
+    frog = AgentFactory.create("Frog", 50, 50)
+    other = AgentFactory.create("Frog", 70, 50)
+    env.add_agent(frog)
+    env.add_agent(other)
+    env.update()
+    frog.state["hunger"] = 50.0
+
+    target, dist = env.find_target(frog, {"species": "Frog"}, 100)
+    assert target is other
+    assert dist == pytest.approx(20.0)
@@ -1,6 +1,8 @@
 import pytest
 from simulation import Environment
+import numpy as np
 import config
+from simulation.terrain import habitat_code
 
 def test_terrain_initialization():
     env = Environment(width=100, height=100)
@@ -25,3 +27,41 @@ def test_terrain_initialization():
     assert row[water_limit - 1] == config.TERRAIN_WATER
     assert row[water_limit] == config.TERRAIN_SOIL
     assert row[-1] == config.TERRAIN_SOIL
+
+def test_terrain_is_a_uint8_raster():
+    env = Environment()
+    cells = env.terrain_map.cells
+    assert cells.dtype == np.uint8
+    assert cells.shape == (env.grid_height, env.grid_width)
+    assert env.terrain == cells.tolist()
+
+def test_passability_masks_follow_terrain_changes():
+    env = Environment(400, 400)  # 10x10 cells, columns 0-3 water
+    version = env.terrain_version
+    aquatic = habitat_code(config.HABITAT_AQUATIC)
+    assert env.terrain_map.masks[aquatic][0, 0]
+    assert not env.terrain_map.masks[aquatic][0, 9]
+
+    env.terrain_map.set_cell(9, 0, config.TERRAIN_WATER)
+    assert env.terrain_version > version
+    assert env.terrain_map.masks[aquatic][0, 9]
+    assert env.terrain[0][9] == config.TERRAIN_WATER
+
+    env.terrain = [[config.TERRAIN_ROCK] * 10 for _ in range(10)]
+    assert not env.terrain_map.masks[aquatic].any()
+    assert env.terrain_map.is_passable(config.HABITAT_TERRESTRIAL, 5, 5)
+
+def test_validate_positions_matches_scalar_check():
+    env = Environment(1000, 800)
+    rng = np.random.default_rng(0)
+    xs = rng.uniform(-50, 1050, 500)
+    ys = rng.uniform(-50, 850, 500)
+    habitats = [None, config.HABITAT_AQUATIC, config.HABITAT_TERRESTRIAL, config.HABITAT_AMPHIBIOUS]
+    codes = np.array([habitat_code(habitats[i % 4]) for i in range(500)])
+
+    batched = env.validate_positions(codes, xs, ys)
+    expected = [env.terrain_map.is_passable(habitats[i % 4], x, y) for i, (x, y) in enumerate(zip(xs, ys))]
+    assert batched.tolist() == expected
+
+    single = env.validate_positions(config.HABITAT_AQUATIC, xs, ys)
+    assert single.tolist() == [env.get_terrain_at(x, y) == config.TERRAIN_WATER for x, y in zip(xs, ys)]
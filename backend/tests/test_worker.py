@@ -0,0 +1,61 @@
+import time
+import pytest
+from simulation import Environment
+from simulation.commands import apply_command
+from simulation.worker import ThreadWorker, ProcessWorker
+
+def _wait_for(predicate, timeout=20.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+def test_apply_command():
+    env = Environment(200, 200)
+    assert apply_command(env, {"type": "spawn_batch", "payload": {"type": "plant", "count": 3}})
+    assert apply_command(env, {"type": "set_light_mode", "payload": {"mode": "always_on"}})
+    assert not apply_command(env, {"type": "unknown", "payload": {}})
+    assert len(env.agents) == 3
+    assert env.equipment["lights"].mode == "always_on"
+
+@pytest.mark.parametrize("worker_cls", [ThreadWorker, ProcessWorker])
+def test_worker_ticks_and_applies_commands(worker_cls):
+    worker = worker_cls(Environment(200, 200), target_tps=50.0)
+    worker.start()
+    try:
+        assert _wait_for(lambda: worker.snapshot is not None)
+        worker.submit({"type": "spawn_batch", "payload": {"type": "plant", "count": 4}})
+        worker.submit({"type": "set_speed", "payload": {"speed": 20.0}})
+        assert _wait_for(lambda: len(worker.snapshot["agents"]) >= 4)
+        assert _wait_for(lambda: worker.snapshot["environment"]["target_tps"] == 20.0)
+        ticks = worker.snapshot["environment"]["total_ticks"]
+        assert _wait_for(lambda: worker.snapshot["environment"]["total_ticks"] > ticks)
+    finally:
+        worker.stop()
+    assert not worker.is_alive()
+
+@pytest.mark.parametrize("worker_cls", [ThreadWorker, ProcessWorker])
+def test_worker_answers_history_queries(worker_cls):
+    worker = worker_cls(Environment(200, 200), target_tps=200.0)
+    worker.start()
+    try:
+        assert _wait_for(lambda: worker.snapshot is not None and worker.snapshot["environment"]["total_ticks"] >= 30)
+        result = worker.query_history(timeout=10.0, start=None, end=None, columns=None, points=2)
+        assert 1 <= result["time"].size <= 2
+    finally:
+        worker.stop()
+
+@pytest.mark.parametrize("worker_cls", [ThreadWorker, ProcessWorker])
+def test_worker_answers_profile_queries(worker_cls):
+    worker = worker_cls(Environment(200, 200), target_tps=200.0)
+    worker.start()
+    try:
+        worker.submit({"type": "set_profiling", "payload": {"enabled": True}})
+        assert _wait_for(lambda: worker.snapshot is not None and "profile" in worker.snapshot["environment"])
+        profile = worker.query_profile(timeout=10.0)
+        assert profile["enabled"]
+        assert profile["phases"]["total"]["count"] >= 1
+    finally:
+        worker.stop()
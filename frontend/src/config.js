@@ -1,5 +1,7 @@
 export const config = {
     API_URL: 'http://localhost:8000',
+    WS_PROTOCOL: 'delta', // 'full' snapshots or 'delta' (keyframe + changes)
+    WS_ENCODING: 'json', // 'json' text frames or 'binary' packed frames
     CANVAS_WIDTH: 1000,
     CANVAS_HEIGHT: 800,
     TERRAIN_GRID_SIZE: 40,
@@ -1,6 +1,8 @@
 import { useState, useEffect, useRef, useCallback } from 'react';
 import Logger from '../utils/Logger';
 import { config } from '../config';
+import { applyFrame } from '../utils/deltaState';
+import { decodeFrame } from '../utils/binaryFrame';
 
 /**
  * Custom hook to manage the simulation state and WebSocket connection.
@@ -28,6 +30,7 @@ export const useSimulation = () => {
     const reconnectAttemptRef = useRef(0);
     const reconnectTimeoutRef = useRef(null);
     const isMountedRef = useRef(true);
+    const viewRef = useRef(null); // Reconstructed snapshot (delta protocol)
 
     /**
      * Establishes the WebSocket connection.
@@ -36,7 +39,11 @@ export const useSimulation = () => {
         if (ws.current?.readyState === WebSocket.OPEN) return;
 
         Logger.info(`Attempting to connect... (Attempt ${reconnectAttemptRef.current + 1})`);
-        ws.current = new WebSocket(config.WS_URL || 'ws://localhost:8000/ws');
+        const protocol = config.WS_PROTOCOL || 'full';
+        const encoding = config.WS_ENCODING || 'json';
+        ws.current = new WebSocket(`${config.WS_URL || 'ws://localhost:8000/ws'}?protocol=${protocol}&encoding=${encoding}`);
+        ws.current.binaryType = 'arraybuffer';
+        viewRef.current = null;
 
         ws.current.onopen = () => {
             if (!isMountedRef.current) return;
@@ -48,12 +55,27 @@ export const useSimulation = () => {
         ws.current.onmessage = (event) => {
             if (!isMountedRef.current) return;
             try {
-                const data = JSON.parse(event.data);
+                let data;
+                if (event.data instanceof ArrayBuffer) {
+                    viewRef.current = decodeFrame(event.data, viewRef.current);
+                    data = viewRef.current;
+                } else {
+                    data = JSON.parse(event.data);
+                }
 
                 if (data.type === 'heartbeat') {
                     return;
                 }
 
+                if (data.type === 'keyframe' || data.type === 'delta') {
+                    viewRef.current = applyFrame(viewRef.current, data);
+                    if (!viewRef.current) {
+                        ws.current.send(JSON.stringify({ type: 'request_keyframe', payload: {} }));
+                        return;
+                    }
+                    data = viewRef.current;
+                }
+
                 if (data.agents) {
                     setAgents(data.agents);
                 }
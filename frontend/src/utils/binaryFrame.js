@@ -0,0 +1,60 @@
+const FLAG_TERRAIN = 0x01;
+const HEADER_SIZE = 16;
+
+/**
+ * Decodes the backend's packed binary frames (`/ws?encoding=binary`,
+ * see backend/simulation/binary_frame.py).
+ *
+ * Layout (little-endian): "PSIM", u8 version, u8 flags, u16 reserved,
+ * u32 agent count N, u32 metadata length M, M bytes of JSON metadata,
+ * then u32 index[N], f32 x[N], f32 y[N], f32 size[N], u8 species[N],
+ * u8 type[N], u8 color[N].
+ *
+ * @param {ArrayBuffer} buffer - The binary WebSocket message.
+ * @param {Object|null} view - The previous snapshot (supplies the terrain
+ *   when the frame does not carry it).
+ * @returns {Object} The snapshot ({ environment, agents }).
+ */
+export const decodeFrame = (buffer, view) => {
+    const header = new DataView(buffer);
+    const flags = header.getUint8(5);
+    const count = header.getUint32(8, true);
+    const metaLength = header.getUint32(12, true);
+
+    const metaBytes = new Uint8Array(buffer, HEADER_SIZE, metaLength);
+    const metadata = JSON.parse(new TextDecoder().decode(metaBytes).replace(/\0+$/, ''));
+
+    let offset = HEADER_SIZE + metaLength;
+    const take = (ArrayType) => {
+        const array = new ArrayType(buffer, offset, count);
+        offset += array.byteLength;
+        return array;
+    };
+    const index = take(Uint32Array);
+    const x = take(Float32Array);
+    const y = take(Float32Array);
+    const size = take(Float32Array);
+    const species = take(Uint8Array);
+    const type = take(Uint8Array);
+    const color = take(Uint8Array);
+
+    const environment = metadata.environment;
+    if (!(flags & FLAG_TERRAIN)) {
+        environment.terrain = view ? view.environment.terrain : null;
+    }
+
+    const agents = new Array(count);
+    for (let i = 0; i < count; i++) {
+        agents[i] = {
+            id: index[i],
+            type: metadata.types[type[i]],
+            position: { x: x[i], y: y[i] },
+            state: {
+                species: metadata.species[species[i]],
+                color: metadata.colors[color[i]],
+                size: size[i],
+            },
+        };
+    }
+    return { environment, agents };
+};
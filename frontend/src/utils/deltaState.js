@@ -0,0 +1,40 @@
+/**
+ * Rebuilds full simulation snapshots from the backend's delta protocol
+ * (`/ws?protocol=delta`, see backend/simulation/delta.py).
+ *
+ * @param {Object|null} view - The previously reconstructed snapshot.
+ * @param {Object} message - A 'keyframe' or 'delta' message.
+ * @returns {Object|null} The snapshot ({ environment, agents }), or null if a
+ *   delta arrived before any keyframe (caller should request one).
+ */
+export const applyFrame = (view, message) => {
+    if (message.type === 'keyframe') {
+        return { environment: message.environment, agents: message.agents };
+    }
+    if (!view) return null;
+
+    const environment = { ...message.environment };
+    if (environment.terrain === undefined) {
+        environment.terrain = view.environment.terrain;
+    }
+
+    const removed = new Set(message.removed);
+    const agents = new Map();
+    for (const agent of view.agents) {
+        if (!removed.has(agent.id)) agents.set(agent.id, agent);
+    }
+    for (const change of message.updated) {
+        const agent = { ...agents.get(change.id) };
+        if (change.position) agent.position = change.position;
+        if (change.type !== undefined) agent.type = change.type;
+        if (change.components !== undefined) agent.components = change.components;
+        if (change.state) {
+            agent.state = change.replace_state ? change.state : { ...agent.state, ...change.state };
+        }
+        agents.set(change.id, agent);
+    }
+    for (const agent of message.spawned) {
+        agents.set(agent.id, agent);
+    }
+    return { environment, agents: Array.from(agents.values()) };
+};
@@ -0,0 +1,48 @@
+import { describe, it, expect } from 'vitest';
+import { applyFrame } from './deltaState';
+
+const keyframe = {
+    type: 'keyframe',
+    environment: { time: 0, terrain: [[0]] },
+    agents: [
+        { id: 'a', type: 'Fern', position: { x: 1, y: 1 }, state: { energy: 5 }, components: [] },
+        { id: 'b', type: 'Frog', position: { x: 2, y: 2 }, state: { energy: 9 }, components: [] },
+    ],
+};
+
+describe('applyFrame', () => {
+    it('returns null for a delta before any keyframe', () => {
+        expect(applyFrame(null, { type: 'delta', environment: {}, removed: [], updated: [], spawned: [] })).toBeNull();
+    });
+
+    it('applies removals, merged state and spawns, keeping the terrain', () => {
+        const view = applyFrame(null, keyframe);
+        const next = applyFrame(view, {
+            type: 'delta',
+            environment: { time: 1 },
+            removed: ['b'],
+            updated: [{ id: 'a', position: { x: 3, y: 1 }, state: { hunger: 1 } }],
+            spawned: [{ id: 'c', type: 'Fern', position: { x: 0, y: 0 }, state: {}, components: [] }],
+        });
+        expect(next.environment).toEqual({ time: 1, terrain: [[0]] });
+        expect(next.agents.map((agent) => agent.id)).toEqual(['a', 'c']);
+        expect(next.agents[0].position).toEqual({ x: 3, y: 1 });
+        expect(next.agents[0].state).toEqual({ energy: 5, hunger: 1 });
+    });
+
+    it('copies type and components from a revised row', () => {
+        const view = applyFrame(null, keyframe);
+        const next = applyFrame(view, {
+            type: 'delta',
+            environment: { time: 1 },
+            removed: [],
+            updated: [{ id: 'a', type: 'Moss', components: ['Photosynthesis'], state: { energy: 2 }, replace_state: true }],
+            spawned: [],
+        });
+        const agent = next.agents.find((candidate) => candidate.id === 'a');
+        expect(agent.type).toBe('Moss');
+        expect(agent.components).toEqual(['Photosynthesis']);
+        expect(agent.state).toEqual({ energy: 2 });
+        expect(view.agents[0].type).toBe('Fern');
+    });
+});